@@ -0,0 +1,71 @@
+"""
+가사 정렬(Needleman-Wunsch) 벤치마크.
+
+    python benchmarks/bench_alignment.py [--sizes 100 300 1000] [--repeat 3]
+
+현재 구현(analyzer.alignment.needleman_wunsch)과 순수 파이썬 구현(needleman_wunsch_naive)을
+긴 가사 세트에서 비교하고, 두 결과가 같은지도 확인합니다.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from analyzer.alignment import needleman_wunsch, needleman_wunsch_naive
+
+RESULT_JSON = os.path.join(os.path.dirname(__file__), "../src/analyzer/result.json")
+
+
+def load_vocab():
+    with open(RESULT_JSON, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    return sorted({lyric["word"] for lyric in result["Lyrics"]})
+
+
+def make_lyric_set(rng, vocab, n):
+    org = [{"word": rng.choice(vocab), "phase": i // 6} for i in range(n)]
+    pred = []
+    for w in org:
+        r = rng.random()
+        if r < 0.1:
+            continue
+        word = rng.choice(vocab) if r < 0.2 else w["word"]
+        pred.append({"word": word, "start": 0.0, "end": 0.0})
+    return org, pred
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = load_vocab()
+
+    print(f"{'words':>8} {'naive (s)':>12} {'numpy (s)':>12} {'speedup':>9} same")
+    for n in args.sizes:
+        org, pred = make_lyric_set(rng, vocab, n)
+        naive_time, naive_result = best_of(lambda: needleman_wunsch_naive(org, pred), args.repeat)
+        fast_time, fast_result = best_of(lambda: needleman_wunsch(org, pred), args.repeat)
+        print(f"{n:>8} {naive_time:>12.4f} {fast_time:>12.4f} {naive_time / fast_time:>8.1f}x {naive_result == fast_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+가사-음정 매칭(_align_music_features) 벤치마크.
+
+    python benchmarks/bench_feature_join.py [--lyrics 300] [--pitches 1000 5000 20000]
+
+MusicAI Vocal pitch처럼 촘촘한 음정 이벤트를 만들어, 모든 쌍을 비교하는 기존 방식과
+analyzer.alignment.interval_join을 비교하고 결과가 같은지 확인합니다.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from analyzer.alignment import interval_join
+from utils.util import check_include
+
+
+def all_pairs_join(spans, events):
+    matches = [[] for _ in spans]
+    for e, (ps, pe) in enumerate(events):
+        for s, (ls, le) in enumerate(spans):
+            if check_include(ls, le, ps, pe):
+                matches[s].append(e)
+    return matches
+
+
+def make_song(rng, n_lyrics, n_pitches, duration):
+    """가사 단어는 순서대로 이어지고, 음정 이벤트는 곡 전체에 촘촘히 깔립니다."""
+    word_len = duration / n_lyrics
+    spans = []
+    for i in range(n_lyrics):
+        start = i * word_len + rng.uniform(0, word_len * 0.2)
+        spans.append((start, start + word_len * rng.uniform(0.5, 1.0)))
+    events = []
+    for _ in range(n_pitches):
+        start = rng.uniform(0, duration)
+        events.append((start, start + rng.uniform(0.02, 0.5)))
+    events.sort()
+    return spans, events
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lyrics", type=int, default=300)
+    parser.add_argument("--pitches", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--duration", type=float, default=240.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'pitches':>8} {'all pairs (s)':>14} {'sweep (s)':>10} {'speedup':>9} same")
+    for n in args.pitches:
+        spans, events = make_song(rng, args.lyrics, n, args.duration)
+
+        start = time.perf_counter()
+        expected = all_pairs_join(spans, events)
+        naive_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = interval_join(spans, events)
+        fast_time = time.perf_counter() - start
+
+        print(f"{n:>8} {naive_time:>14.4f} {fast_time:>10.4f} {naive_time / fast_time:>8.1f}x {actual == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+MusicAnalyzer 전체 파이프라인 오프라인 벤치마크.
+
+    python benchmarks/bench_pipeline.py [--scenarios short medium long] [--beat-backends madmom librosa grid]
+                                        [--skip-beats] [--streaming] [--update-golden]
+
+MusicAI 대신 fake_musicai.FakeMusicAiClient를 쓰고, synthetic.py로 만든 합성 음원/가사를 분석한 뒤
+MusicAnalyzer.get_timings()의 단계별(decode, beat, pitch, fetch, alignment, feature join) 시간을 출력합니다.
+비트 추출 방식(--beat-backends)마다 따로 실행해 방식별 비용(beat 열)을 비교할 수 있습니다.
+결과는 benchmarks/golden/<scenario>-<pitch tier>[-<beat backend>].json과 비교하며, 분석 결과가 의도적으로 바뀌었다면
+--update-golden으로 다시 저장합니다. 네트워크와 API 키 없이 어떤 리눅스 환경에서도 돌아갑니다.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from analyzer.beats import BEAT_BACKENDS
+from analyzer.music import MusicAnalyzer
+from analyzer.musicai import JobTracker
+from analyzer.vis_codec import decode_vis_data, encode_vis_data
+from fake_musicai import ArtifactServer, FakeMusicAiClient
+from synthetic import make_artifacts, make_lyric_set, synth_song
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+
+# name: (duration seconds, lyric words)
+SCENARIOS = {
+    "short": (30, 60),
+    "medium": (180, 250),
+    "long": (600, 1000),
+}
+
+# 허용 오차: 부동소수점/라이브러리 버전 차이로 흔들릴 수 있는 값
+TIME_TOLERANCE = 1e-3
+PITCH_MISMATCH_TOLERANCE = 0.01
+
+
+def run_scenario(name, beat_backend, pitch_tier, seed, streaming=False):
+    duration, n_words = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{name}.wav")
+        notes = synth_song(path, duration, seed=seed)
+        original, lyrics = make_lyric_set(n_words, duration, seed=seed)
+
+        with ArtifactServer() as server:
+            client = FakeMusicAiClient(server, make_artifacts(notes, lyrics))
+            tracker = JobTracker(client, min_interval=0.01)
+            la = MusicAnalyzer(path, original, pitch_tier=pitch_tier, client=client, streaming=streaming, tracker=tracker,
+                               beat_backend=beat_backend)
+
+            if beat_backend is None:
+                la._get_beat_amplitudes = lambda: None
+            la.analyze(concurrent=False)
+            tracker.shutdown()
+
+        record = la.get_timings()
+        timings = {stage: values["wall_seconds"] for stage, values in record["stages"].items()}
+        timings["total"] = record["total_seconds"]
+        timings["peak_rss_mb"] = record["peak_rss_mb"]
+        timings["beat_cpu"] = record["stages"].get("beat", {}).get("cpu_seconds", 0.0)
+        return la.get_final_format(), timings
+
+
+def compare(golden, result, skip_beats):
+    """골든 결과와 다른 점을 문자열 목록으로 반환합니다 (빈 목록이면 통과)."""
+    problems = []
+    for key in ("BPM", "Instruments", "Emotions"):
+        if golden[key] != result[key]:
+            problems.append(f"{key}: {golden[key]!r} != {result[key]!r}")
+
+    if len(golden["Lyrics"]) != len(result["Lyrics"]):
+        problems.append(f"Lyrics: {len(golden['Lyrics'])} words != {len(result['Lyrics'])}")
+    else:
+        for i, (g, r) in enumerate(zip(golden["Lyrics"], result["Lyrics"])):
+            if g["word"] != r["word"] or g["phase"] != r["phase"] or len(g["pitch"]) != len(r["pitch"]):
+                problems.append(f"Lyrics[{i}]: {g['word']!r}/{len(g['pitch'])} != {r['word']!r}/{len(r['pitch'])}")
+                break
+            if abs(g["start"] - r["start"]) > TIME_TOLERANCE or abs(g["end"] - r["end"]) > TIME_TOLERANCE:
+                problems.append(f"Lyrics[{i}] timing: {g['start']}-{g['end']} != {r['start']}-{r['end']}")
+                break
+
+    if not skip_beats and golden["Beat_amplitude"]:
+        g_times = np.array([b["time"] for b in golden["Beat_amplitude"]])
+        r_times = np.array([b["time"] for b in result["Beat_amplitude"]])
+        if len(g_times) != len(r_times) or np.abs(g_times - r_times).max(initial=0) > 0.02:
+            problems.append(f"Beat_amplitude: {len(g_times)} beats != {len(r_times)}")
+
+    g_pitch = np.array([p["pitch"] for p in golden["Pitch"]])
+    r_pitch = np.array([p["pitch"] for p in result["Pitch"]])
+    if len(g_pitch) != len(r_pitch):
+        problems.append(f"Pitch: {len(g_pitch)} frames != {len(r_pitch)}")
+    elif len(g_pitch) and np.mean(g_pitch != r_pitch) > PITCH_MISMATCH_TOLERANCE:
+        problems.append(f"Pitch: {np.mean(g_pitch != r_pitch):.1%} of frames differ")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=["short", "medium"])
+    parser.add_argument("--pitch-tier", default="full")
+    parser.add_argument("--beat-backends", nargs="+", choices=BEAT_BACKENDS, default=list(BEAT_BACKENDS))
+    parser.add_argument("--skip-beats", action="store_true", help="비트 단계를 건너뜁니다")
+    parser.add_argument("--streaming", action="store_true", help="블록 단위 스트리밍 분석 (골든 결과와 같아야 합니다)")
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = [None] if args.skip_beats else args.beat_backends
+    if "madmom" in backends and importlib.util.find_spec("madmom") is None:
+        print("madmom is not installed; skipping the madmom beat backend")
+        backends = [b for b in backends if b != "madmom"] or [None]
+
+    stage_names = ["decode", "beat", "beat_cpu", "pitch", "waveform", "fetch", "alignment", "feature_join", "total", "peak_rss_mb"]
+    print(f"{'scenario':>16} " + " ".join(f"{s:>12}" for s in stage_names) + "  golden")
+    failed = False
+    for name, backend in ((name, backend) for name in args.scenarios for backend in backends):
+        result, timings = run_scenario(name, backend, args.pitch_tier, args.seed, args.streaming)
+        suffix = f"-{backend}" if backend else ""
+        golden_path = os.path.join(GOLDEN_DIR, f"{name}-{args.pitch_tier}{suffix}.json")
+
+        if args.update_golden:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(golden_path, "w", encoding="utf-8") as f:
+                json.dump(encode_vis_data(result), f, ensure_ascii=False)
+            verdict = "updated"
+        elif not os.path.exists(golden_path):
+            verdict = "missing"
+        else:
+            with open(golden_path, "r", encoding="utf-8") as f:
+                problems = compare(decode_vis_data(json.load(f)), result, skip_beats=backend is None)
+            verdict = "ok" if not problems else "FAIL: " + "; ".join(problems)
+            failed = failed or bool(problems)
+
+        label = f"{name}/{backend or 'no beats'}"
+        print(f"{label:>16} " + " ".join(f"{timings.get(s, 0.0):>12.4f}" for s in stage_names) + f"  {verdict}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+MusicAI 없이 MusicAnalyzer를 돌리기 위한 로컬 대역.
+
+ArtifactServer는 127.0.0.1에서 JSON 결과물을 HTTP로 제공하고, FakeMusicAiClient는
+MusicAiClient와 같은 메서드(upload_file, create_job, get_job, wait_for_job_completion ...)로
+미리 준비한 결과물의 URL을 돌려줍니다.
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ArtifactServer:
+    def __init__(self):
+        self.artifacts = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.artifacts.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def publish(self, path, data):
+        self.artifacts[path] = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        return self.base_url + path
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FakeMusicAiClient:
+    """
+    artifacts: {'BPM': str, 'Music metadata': dict, 'Lyrics': list, 'Vocal pitch': list}
+    remote_delay: wait_for_job_completion이 원격 작업 시간을 흉내 내어 기다리는 시간 (초)
+    """
+
+    def __init__(self, server: ArtifactServer, artifacts, remote_delay=0.0):
+        self.server = server
+        self.artifacts = artifacts
+        self.remote_delay = remote_delay
+        self.uploads = []
+        self.jobs = {}
+        self._ids = itertools.count()
+
+    def get_application_info(self):
+        return {"name": "fake-musicai"}
+
+    def upload_file(self, file_path):
+        self.uploads.append(file_path)
+        return f"{self.server.base_url}/uploads/{len(self.uploads)}"
+
+    def create_job(self, job_name, workflow_id, params):
+        job_id = f"job-{next(self._ids)}"
+        result = {"BPM": self.artifacts["BPM"]}
+        for name in ("Music metadata", "Lyrics", "Vocal pitch"):
+            if name in self.artifacts:
+                result[name] = self.server.publish(f"/{job_id}/{name.replace(' ', '_')}.json", self.artifacts[name])
+        self.jobs[job_id] = {
+            "id": job_id,
+            "name": job_name,
+            "workflow": workflow_id,
+            "params": params,
+            "result": result,
+            "ready_at": time.monotonic() + self.remote_delay,
+        }
+        return {"id": job_id}
+
+    def get_job_status(self, job_id):
+        job = self.jobs[job_id]
+        status = "SUCCEEDED" if time.monotonic() >= job["ready_at"] else "STARTED"
+        return {"id": job_id, "status": status}
+
+    def get_job(self, job_id):
+        job = self.jobs[job_id]
+        status = self.get_job_status(job_id)["status"]
+        return {"id": job_id, "status": status, "result": job["result"] if status == "SUCCEEDED" else None}
+
+    def wait_for_job_completion(self, id):
+        while self.get_job_status(id)["status"] != "SUCCEEDED":
+            time.sleep(min(0.05, self.remote_delay))
+        return self.get_job(id)
+
+    def delete_job(self, job_id):
+        return self.jobs.pop(job_id, None)
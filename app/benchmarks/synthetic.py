@@ -0,0 +1,84 @@
+"""
+벤치마크용 합성 음원과 가사 세트.
+
+synth_song: 비트마다 클릭이 들어간 사인파 멜로디 (길이 자유)
+make_lyric_set: result.json의 단어로 만든 원본 가사와, 일부 단어가 틀린 MusicAI식 전사 결과
+"""
+
+import json
+import os
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+RESULT_JSON = os.path.join(os.path.dirname(__file__), "../src/analyzer/result.json")
+NOTE_POOL = [60, 62, 64, 65, 67, 69, 71, 72]
+
+
+def load_result():
+    with open(RESULT_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def synth_song(path, duration, sr=44100, bpm=105, seed=0):
+    """합성 음원을 path에 쓰고 멜로디 음표 [(start, end, midi)]를 반환합니다."""
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    y = np.zeros(n, dtype=np.float32)
+    beat = 60.0 / bpm
+
+    notes = []
+    for start in np.arange(0, duration, beat):
+        end = min(start + beat, duration)
+        midi = int(rng.choice(NOTE_POOL))
+        a, b = int(start * sr), int(end * sr)
+        t = np.arange(b - a) / sr
+        envelope = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.02) if b > a else t
+        y[a:b] += (0.3 * envelope * np.sin(2 * np.pi * librosa.midi_to_hz(midi) * t)).astype(np.float32)
+        notes.append((float(start), float(end), midi))
+
+        # 비트마다 30 ms 감쇠 노이즈 클릭
+        click = min(int(0.03 * sr), n - a)
+        y[a:a + click] += (0.5 * rng.standard_normal(click) * np.exp(-np.arange(click) / (0.005 * sr))).astype(np.float32)
+
+    sf.write(path, np.clip(y, -1, 1), sr)
+    return notes
+
+
+def make_lyric_set(n_words, duration, seed=0):
+    """(원본 가사 문자열, MusicAI 'Lyrics' 결과물)을 만듭니다. 단어는 곡 전체에 고르게 배치됩니다."""
+    rng = np.random.default_rng(seed)
+    vocab = sorted({lyric["word"] for lyric in load_result()["Lyrics"]})
+    words = [vocab[i] for i in rng.integers(0, len(vocab), n_words)]
+
+    lines = [" ".join(words[i:i + 6]) for i in range(0, n_words, 6)]
+    original = "\n".join(lines)
+
+    slot = duration / max(n_words, 1)
+    phases = []
+    for i in range(0, n_words, 6):
+        phase_words = []
+        for j, word in enumerate(words[i:i + 6], start=i):
+            r = rng.random()
+            if r < 0.08:
+                continue  # MusicAI가 놓친 단어
+            if r < 0.16:
+                word = vocab[rng.integers(0, len(vocab))]  # 잘못 들린 단어
+            phase_words.append({"word": word, "start": j * slot, "end": j * slot + slot * 0.9})
+        phases.append({"words": phase_words})
+    return original, phases
+
+
+def make_artifacts(notes, lyrics, bpm=105):
+    """MusicAI 'synthesizer' 워크플로 결과물 형태로 묶습니다."""
+    result = load_result()
+    return {
+        "BPM": str(bpm),
+        "Music metadata": {"instrumentTags": result["Instruments"], "moodTags": result["Emotions"]},
+        "Lyrics": lyrics,
+        "Vocal pitch": [
+            {"note_name": librosa.midi_to_note(midi, unicode=False), "midi_note": midi, "start": start, "end": end}
+            for start, end, midi in notes
+        ],
+    }
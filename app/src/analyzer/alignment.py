@@ -0,0 +1,175 @@
+import numpy as np
+
+from utils.util import check_include
+
+# traceback directions
+DIAG = 0
+UP = 1
+LEFT = 2
+
+GAP = -1  # index used for a gap in align_indices output
+
+
+def _intern(words1, words2):
+    vocab = {}
+    ids1 = np.fromiter((vocab.setdefault(w, len(vocab)) for w in words1), dtype=np.int64, count=len(words1))
+    ids2 = np.fromiter((vocab.setdefault(w, len(vocab)) for w in words2), dtype=np.int64, count=len(words2))
+    return ids1, ids2
+
+
+def _fill_directions(ids1, ids2, match, mismatch, gap):
+    """
+    Fill the score matrix row by row and keep only the traceback directions.
+    Within a row, the left-gap recurrence score[j] = max(cand[j], score[j-1] + gap)
+    is a prefix max: score[j] = gap * j + max_{k<=j}(cand[k] - gap * k).
+    """
+    n = len(ids1)
+    m = len(ids2)
+    cols = np.arange(m + 1, dtype=np.int64)
+    directions = np.empty((n + 1, m + 1), dtype=np.uint8)
+    directions[0, :] = LEFT
+    directions[1:, 0] = UP
+
+    prev = gap * cols
+    for i in range(1, n + 1):
+        sub = np.where(ids2 == ids1[i - 1], match, mismatch)
+        diag = prev[:-1] + sub
+        up = prev[1:] + gap
+
+        cand = np.empty(m + 1, dtype=np.int64)
+        cand[0] = gap * i
+        np.maximum(diag, up, out=cand[1:])
+        row = np.maximum.accumulate(cand - gap * cols) + gap * cols
+
+        # same tie-breaking as the traceback of the naive version: diag > up > left
+        row_dir = np.full(m, LEFT, dtype=np.uint8)
+        row_dir[row[1:] == up] = UP
+        row_dir[row[1:] == diag] = DIAG
+        directions[i, 1:] = row_dir
+        prev = row
+
+    return directions
+
+
+def align_indices(words1, words2, match=2, mismatch=-1, gap=-1):
+    """
+    Global alignment of two word sequences.
+    Returns two equally long lists of indices into words1 / words2, GAP where a gap is inserted.
+    """
+    ids1, ids2 = _intern(words1, words2)
+    directions = _fill_directions(ids1, ids2, match, mismatch, gap)
+
+    idx1, idx2 = [], []
+    i, j = len(ids1), len(ids2)
+    while i > 0 or j > 0:
+        d = directions[i, j]
+        if d == DIAG:
+            i -= 1
+            j -= 1
+            idx1.append(i)
+            idx2.append(j)
+        elif d == UP:
+            i -= 1
+            idx1.append(i)
+            idx2.append(GAP)
+        else:
+            j -= 1
+            idx1.append(GAP)
+            idx2.append(j)
+
+    return idx1[::-1], idx2[::-1]
+
+
+def needleman_wunsch(seq1, seq2, match=2, mismatch=-1, gap=-1):
+    idx1, idx2 = align_indices([s['word'] for s in seq1], [s['word'] for s in seq2], match, mismatch, gap)
+    align1 = [seq1[i] if i != GAP else {'word': '-', 'meta': '-'} for i in idx1]
+    align2 = [seq2[j] if j != GAP else {'word': '-', 'meta': '-'} for j in idx2]
+    return align1, align2
+
+
+def interval_join(spans, events):
+    """
+    For every (start, end) span, the indices of the (start, end) events overlapping it
+    according to utils.util.check_include, in the original event order.
+
+    Spans are sorted by start and indexed with a running max of their ends, so each event
+    only visits the spans that can overlap it instead of all of them. Malformed intervals
+    (start > end) are rare and are checked against everything, which keeps the result
+    identical to the all-pairs loop.
+    """
+    matches = [[] for _ in spans]
+    if len(spans) == 0 or len(events) == 0:
+        return matches
+
+    span_arr = np.asarray(spans, dtype=np.float64).reshape(-1, 2)
+    event_arr = np.asarray(events, dtype=np.float64).reshape(-1, 2)
+    span_ok = span_arr[:, 0] <= span_arr[:, 1]
+    event_ok = event_arr[:, 0] <= event_arr[:, 1]
+
+    order = np.flatnonzero(span_ok)
+    order = order[np.argsort(span_arr[order, 0], kind='stable')]
+    starts = span_arr[order, 0]
+    ends = span_arr[order, 1]
+    max_end = np.maximum.accumulate(ends) if len(order) > 0 else ends
+    bad_spans = np.flatnonzero(~span_ok).tolist()
+
+    # well-formed spans can only overlap an event if span start <= event end
+    upper = np.searchsorted(starts, event_arr[:, 1], side='right')
+    order, ends, max_end = order.tolist(), ends.tolist(), max_end.tolist()
+
+    for e, ((ev_start, ev_end), ok, k) in enumerate(zip(event_arr.tolist(), event_ok.tolist(), upper.tolist())):
+        if not ok:
+            candidates = range(len(spans))
+        else:
+            candidates = []
+            j = k - 1
+            while j >= 0 and max_end[j] >= ev_start:
+                if ends[j] >= ev_start:
+                    candidates.append(order[j])
+                j -= 1
+            candidates.extend(bad_spans)
+        for s in candidates:
+            if check_include(spans[s][0], spans[s][1], ev_start, ev_end):
+                matches[s].append(e)
+
+    return matches
+
+
+def needleman_wunsch_naive(seq1, seq2, match=2, mismatch=-1, gap=-1):
+    """Pure python reference implementation, kept for tests and benchmarks."""
+    n = len(seq1)
+    m = len(seq2)
+    score = np.zeros((n + 1, m + 1))
+
+    for i in range(n + 1):
+        score[i][0] = gap * i
+    for j in range(m + 1):
+        score[0][j] = gap * j
+
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            match_score = score[i - 1][j - 1] + (match if seq1[i - 1]['word'] == seq2[j - 1]['word'] else mismatch)
+            delete = score[i - 1][j] + gap
+            insert = score[i][j - 1] + gap
+            score[i][j] = max(match_score, delete, insert)
+
+    align1, align2 = [], []
+    i, j = n, m
+    while i > 0 or j > 0:
+        current_score = score[i][j]
+        if i > 0 and j > 0 and (current_score == score[i - 1][j - 1] + (
+        match if seq1[i - 1]['word'] == seq2[j - 1]['word'] else mismatch)):
+            align1.append(seq1[i - 1])
+            align2.append(seq2[j - 1])
+            i -= 1
+            j -= 1
+        elif i > 0 and (current_score == score[i - 1][j] + gap):
+            align1.append(seq1[i - 1])
+            align2.append({'word': '-', 'meta': '-'})
+            i -= 1
+        else:
+            align1.append({'word': '-', 'meta': '-'})
+            align2.append(seq2[j - 1])
+            j -= 1
+
+    return align1[::-1], align2[::-1]
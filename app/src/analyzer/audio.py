@@ -0,0 +1,35 @@
+import librosa
+import numpy as np
+
+
+class AudioBuffer:
+    """
+    Decodes an audio file once (mono, float32, native sample rate) and hands out
+    resampled views of the same samples, so every analysis stage shares one decode.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        y, sr = librosa.load(path, sr=None, mono=True, dtype=np.float32)
+        self.sr = sr
+        self._views = {sr: y}
+
+    @property
+    def y(self):
+        return self._views[self.sr]
+
+    @property
+    def duration(self):
+        return len(self.y) / self.sr
+
+    def resampled(self, sr):
+        """Samples at the given rate; computed on first use and cached."""
+        if sr not in self._views:
+            self._views[sr] = librosa.resample(self.y, orig_sr=self.sr, target_sr=sr)
+        return self._views[sr]
+
+    def madmom_signal(self, sr=44100):
+        """madmom Signal for processors that expect a fixed sample rate (RNNBeatProcessor: 44.1 kHz)."""
+        from madmom.audio.signal import Signal
+
+        return Signal(self.resampled(sr), sample_rate=sr)
@@ -0,0 +1,196 @@
+"""
+musicVis 일괄 재생성 (분석기 변경 후 백필 등).
+
+    cd app/src && python -m analyzer.batch manifest.jsonl [--processes 4] [--musicai-jobs 2] [--batch-size 20]
+
+manifest.jsonl 한 줄이 곡 하나입니다.
+    {"music_id": "...", "url": "https://... 또는 로컬 경로", "lyrics": "..."}
+    {"music_id": "..."}   # url/lyrics가 없으면 music 테이블에서 가져옵니다
+
+로컬 DSP(beat/pitch)는 프로세스 풀에서 병렬로 돌고, MusicAI 작업은 --musicai-jobs 개까지만 동시에 실행됩니다.
+결과는 --batch-size 개씩 모아 한 번에 저장하며, 저장이 끝난 music_id를 체크포인트 파일에 기록하므로
+중간에 멈춘 뒤 같은 명령을 다시 실행하면 남은 곡부터 이어서 처리합니다.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analyzer.cache import AnalysisCache
+from analyzer.ingest import absolute_music_url, is_passthrough_url, open_audio
+from analyzer.pipeline import analyze_audio, analyze_url, stored_vis_data
+from analyzer.timing import StageTimer
+
+DONE = 'done'
+FAILED = 'failed'
+
+# per worker process, set by _init_worker
+_cache = None
+_remote_slots = None
+
+
+def load_manifest(path, db_manager=None):
+    """Manifest entries with url and lyrics filled in; entries with only a music_id are looked up in the DB."""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if 'music_id' not in entry:
+                raise ValueError(f'{path}:{line_no}: missing music_id')
+            if 'url' not in entry or 'lyrics' not in entry:
+                if db_manager is None:
+                    raise ValueError(f'{path}:{line_no}: url/lyrics missing and no database to look them up')
+                music = db_manager.search_music_source(entry['music_id']).data
+                # execute_state가 저장한 "//cdn..." 형태는 scheme이 없어 그대로는 받을 수 없음
+                entry.setdefault('url', absolute_music_url(music['url']))
+                entry.setdefault('lyrics', (music.get('lyrics') or {}).get('lyrics') or '')
+            entries.append(entry)
+    return entries
+
+
+def load_checkpoint(path):
+    """music_id -> last recorded status. Later lines win, so a failed entry that later succeeded counts as done."""
+    statuses = {}
+    if not os.path.exists(path):
+        return statuses
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            statuses[str(record['music_id'])] = record['status']
+    return statuses
+
+
+def append_checkpoint(path, records):
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _init_worker(cache_dir, cache_max_bytes, remote_slots):
+    global _cache, _remote_slots
+    _cache = AnalysisCache(cache_dir, cache_max_bytes)
+    _remote_slots = remote_slots
+
+
+def _analyze_entry(entry, pitch_tier, beat_backend):
+    timer = StageTimer()
+    if is_passthrough_url(entry['url']):
+        result = analyze_url(entry['url'], entry['lyrics'], entry['music_id'], _cache, pitch_tier=pitch_tier, timer=timer,
+                             remote_slots=_remote_slots, beat_backend=beat_backend)
+    else:
+        with timer.stage('download'):
+            audio = open_audio(entry['url'])
+        with audio:
+            result = analyze_audio(audio, entry['lyrics'], entry['music_id'], _cache, pitch_tier=pitch_tier, timer=timer,
+                                   remote_slots=_remote_slots, beat_backend=beat_backend)
+    # 프로세스 간 전송량을 줄이기 위해 저장할 형태(compact + LOD 피라미드)로 바꿔서 돌려줍니다.
+    return stored_vis_data(result), timer.summary()
+
+
+class BatchRunner:
+    def __init__(self, db_manager, checkpoint, processes=2, musicai_jobs=2, batch_size=20, pitch_tier=None,
+                 beat_backend=None, cache_dir=None, cache_max_bytes=1024**3):
+        self.db_manager = db_manager
+        self.checkpoint = checkpoint
+        self.processes = processes
+        self.musicai_jobs = musicai_jobs
+        self.batch_size = batch_size
+        self.pitch_tier = pitch_tier
+        self.beat_backend = beat_backend
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'music-diary-analysis-cache')
+        self.cache_max_bytes = cache_max_bytes
+        self._pending_rows = []
+
+    def run(self, entries):
+        statuses = load_checkpoint(self.checkpoint)
+        todo = [entry for entry in entries if statuses.get(str(entry['music_id'])) != DONE]
+        print(f'Batch: {len(entries) - len(todo)} already done, {len(todo)} to analyze')
+
+        context = multiprocessing.get_context('spawn')
+        counts = {DONE: 0, FAILED: 0}
+        started = time.perf_counter()
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.cache_dir, self.cache_max_bytes, context.BoundedSemaphore(self.musicai_jobs)),
+        ) as pool:
+            futures = {pool.submit(_analyze_entry, entry, self.pitch_tier, self.beat_backend): entry for entry in todo}
+            try:
+                for future in as_completed(futures):
+                    music_id = futures[future]['music_id']
+                    try:
+                        vis_data, timings = future.result()
+                    except Exception as e:
+                        print(f'Batch: music {music_id} failed: {e}')
+                        append_checkpoint(self.checkpoint, [{'music_id': music_id, 'status': FAILED, 'error': str(e)}])
+                        counts[FAILED] += 1
+                        continue
+                    print(f'Batch: music {music_id} analyzed in {timings["total_seconds"]:.1f}s')
+                    self._pending_rows.append((music_id, vis_data))
+                    counts[DONE] += 1
+                    if len(self._pending_rows) >= self.batch_size:
+                        self.flush()
+            finally:
+                # 중단(Ctrl+C 등)되더라도 이미 끝난 분석은 저장하고 체크포인트에 남깁니다.
+                self.flush()
+                for future in futures:
+                    future.cancel()
+
+        print(f'Batch: {counts[DONE]} stored, {counts[FAILED]} failed in {time.perf_counter() - started:.1f}s')
+        return counts
+
+    def flush(self):
+        if not self._pending_rows:
+            return
+        rows, self._pending_rows = self._pending_rows, []
+        self.db_manager.replace_music_vis_many(rows)
+        append_checkpoint(self.checkpoint, [{'music_id': music_id, 'status': DONE} for music_id, _ in rows])
+        print(f'Batch: stored {len(rows)} musicVis rows')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate musicVis for many songs')
+    parser.add_argument('manifest')
+    parser.add_argument('--checkpoint', help='default: <manifest>.checkpoint.jsonl')
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--musicai-jobs', type=int, default=2, help='MusicAI 동시 작업 수 상한')
+    parser.add_argument('--batch-size', type=int, default=20, help='한 번에 저장할 musicVis 행 수')
+    parser.add_argument('--pitch-tier')
+    parser.add_argument('--beat-backend')
+    parser.add_argument('--cache-dir', default=os.getenv('ANALYSIS_CACHE_DIR'))
+    args = parser.parse_args()
+
+    import dotenv
+    from database.manager import DBManager
+
+    dotenv.load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
+    db_manager = DBManager()
+    runner = BatchRunner(
+        db_manager,
+        args.checkpoint or args.manifest + '.checkpoint.jsonl',
+        processes=args.processes,
+        musicai_jobs=args.musicai_jobs,
+        batch_size=args.batch_size,
+        pitch_tier=args.pitch_tier,
+        beat_backend=args.beat_backend,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(os.getenv('ANALYSIS_CACHE_MAX_BYTES', 1024**3)),
+    )
+    runner.run(load_manifest(args.manifest, db_manager))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BEAT_SAMPLE_RATE = 44100  # RNNBeatProcessor input rate
+
+# per worker process: (RNNBeatProcessor, DBNBeatTrackingProcessor), loaded once by _load_models
+_models = None
+
+
+def _load_models():
+    global _models
+    import madmom
+
+    _models = (
+        madmom.features.beats.RNNBeatProcessor(),
+        madmom.features.beats.DBNBeatTrackingProcessor(fps=100),
+    )
+
+
+def _ready():
+    """No-op job: runs once the worker has loaded its models."""
+    return os.getpid()
+
+
+def _track_beats(samples, sample_rate):
+    from madmom.audio.signal import Signal
+
+    start = time.perf_counter()
+    rnn, dbn = _models
+    act = rnn(Signal(samples, sample_rate=sample_rate))
+    beats = dbn(act)
+    return act, beats, time.perf_counter() - start
+
+
+def _beat_activations(samples, sample_rate):
+    from madmom.audio.signal import Signal
+
+    start = time.perf_counter()
+    rnn, _ = _models
+    return rnn(Signal(samples, sample_rate=sample_rate)), None, time.perf_counter() - start
+
+
+class BeatTrackerPool:
+    """
+    madmom 비트 추적 전용 프로세스 풀. 각 프로세스가 시작할 때 RNN 모델 앙상블을 한 번만 읽고
+    이후 MusicAnalyzer가 보내는 작업을 처리합니다. 대기열 길이와 작업별 시간을 stats()로 확인할 수 있습니다.
+    """
+
+    def __init__(self, processes=2, warm=True):
+        self.processes = processes
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_load_models,
+        )
+        # ProcessPoolExecutor는 작업이 들어올 때 프로세스를 띄우므로, 첫 요청이 모델 읽기를 기다리지 않도록
+        # 프로세스 수만큼 빈 작업을 보내 지금 띄워 둡니다. spawn된 자식이 main 모듈을 다시 읽으며 만든 풀은 제외합니다.
+        self._warm_jobs = []
+        if warm and multiprocessing.parent_process() is None:
+            self._warm_jobs = [self._executor.submit(_ready) for _ in range(processes)]
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._total_wait_seconds = 0.0
+        self._last = None
+
+    def track(self, samples, sample_rate=BEAT_SAMPLE_RATE):
+        """samples: mono float signal at sample_rate. Returns (activations, beat times)."""
+        return self._run(_track_beats, samples, sample_rate)
+
+    def activations(self, samples, sample_rate=BEAT_SAMPLE_RATE):
+        """RNN beat activations only, for callers that run the DBN over several windows themselves."""
+        act, _ = self._run(_beat_activations, samples, sample_rate)
+        return act
+
+    def _run(self, func, samples, sample_rate):
+        with self._lock:
+            self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            act, beats, seconds = self._executor.submit(func, samples, sample_rate).result()
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._failed += 1
+            raise
+
+        elapsed = time.perf_counter() - submitted
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._total_seconds += seconds
+            self._total_wait_seconds += elapsed - seconds
+            self._last = {'seconds': seconds, 'wait_seconds': elapsed - seconds, 'audio_seconds': len(samples) / sample_rate}
+        print(f'Beat tracking done in {seconds:.2f}s (queued {elapsed - seconds:.2f}s)')
+        return act, beats
+
+    def stats(self):
+        with self._lock:
+            return {
+                'processes': self.processes,
+                'warming_up': sum(not job.done() for job in self._warm_jobs),
+                'in_flight': self._pending,
+                'queue_depth': max(0, self._pending - self.processes),
+                'completed': self._completed,
+                'failed': self._failed,
+                'mean_seconds': self._total_seconds / self._completed if self._completed else None,
+                'mean_wait_seconds': self._total_wait_seconds / self._completed if self._completed else None,
+                'last_job': self._last,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,61 @@
+import os
+
+import librosa
+import numpy as np
+
+# 비트 추출 방식 (속도와 정확도를 맞바꿉니다)
+#   madmom:  RNN 앙상블 + DBN (기존 방식, 가장 정확하지만 모델 로딩과 추론이 무거움)
+#   librosa: onset envelope 기반 beat_track (RNN 없이 수십 배 빠름)
+#   grid:    MusicAI가 돌려준 BPM으로 일정 간격 격자를 만들고 onset envelope에 위상만 맞춤 (가장 빠름)
+BEAT_BACKENDS = ('madmom', 'librosa', 'grid')
+# 서버 기본값은 빠른 librosa. madmom은 요청의 beat_backend 또는 BEAT_BACKEND=madmom으로 고를 수 있음
+DEFAULT_BEAT_BACKEND = os.getenv('BEAT_BACKEND', 'librosa')
+
+ONSET_SR = 22050
+ONSET_HOP = 512
+
+
+def check_beat_backend(backend):
+    backend = backend or DEFAULT_BEAT_BACKEND
+    if backend not in BEAT_BACKENDS:
+        raise ValueError(f"Unknown beat backend '{backend}' (choose from {', '.join(BEAT_BACKENDS)})")
+    return backend
+
+
+def onset_envelope(y):
+    """Onset strength of samples at ONSET_SR, one value per ONSET_HOP frame."""
+    return librosa.onset.onset_strength(y=y, sr=ONSET_SR, hop_length=ONSET_HOP)
+
+
+def track_onset_beats(envelope):
+    """librosa beat_track on a precomputed onset envelope. Returns beat times in seconds."""
+    _, beats = librosa.beat.beat_track(onset_envelope=envelope, sr=ONSET_SR, hop_length=ONSET_HOP, units='time')
+    return beats
+
+
+def parse_bpm(bpm):
+    """MusicAI BPM artifact ('105', '105.3', 105) as a positive float, or None."""
+    try:
+        bpm = float(bpm)
+    except (TypeError, ValueError):
+        return None
+    return bpm if bpm > 0 else None
+
+
+def grid_beats(envelope, bpm):
+    """
+    Beats every 60 / bpm seconds over the envelope's duration. The grid phase is the offset
+    (within one beat period) whose frames collect the most onset strength.
+    """
+    frame_rate = ONSET_SR / ONSET_HOP
+    period = 60.0 / bpm * frame_rate  # in envelope frames
+    n_phases = max(1, int(np.ceil(period)))
+    positions = np.arange(0, len(envelope) - 1, period)
+    if len(positions) == 0:
+        return np.empty(0)
+    # 모든 위상 후보(0..period 프레임)에 대해 격자 위치의 onset 합을 한 번에 계산
+    frames = np.rint(positions[None, :] + np.arange(n_phases)[:, None]).astype(np.int64)
+    valid = frames < len(envelope)
+    scores = np.where(valid, envelope[np.minimum(frames, len(envelope) - 1)], 0).sum(axis=1)
+    best = frames[scores.argmax()]
+    return librosa.frames_to_time(best[valid[scores.argmax()]], sr=ONSET_SR, hop_length=ONSET_HOP)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+RESULT_FILE = 'result.json'
+FEATURES_FILE = 'features.npz'
+ARTIFACTS_FILE = 'artifacts.json'
+INDEX_DIR = '.music-index'
+URL_INDEX_DIR = '.url-index'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Content-addressed on-disk cache of analysis results.
+
+    Entries are keyed by (audio bytes, lyrics, analyzer version) and hold the get_final_format()
+    result plus the intermediate features (beat activations, pitch track) and the MusicAI artifacts
+    needed to re-align edited lyrics. A small index maps each music_id to its latest entry, and another
+    maps source URLs to the audio digest so a known URL can be served without downloading it again.
+    When the total size exceeds max_bytes, the least recently used entries are evicted.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, INDEX_DIR), exist_ok=True)
+        os.makedirs(os.path.join(self.root, URL_INDEX_DIR), exist_ok=True)
+
+    @staticmethod
+    def make_key(audio_digest, lyrics, version, **options):
+        """options: analysis settings that change the result (e.g. pitch tier)."""
+        digest = hashlib.sha256()
+        for part in (str(version), audio_digest, lyrics or '', json.dumps(options, sort_keys=True)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, RESULT_FILE), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(entry)  # LRU: a hit makes the entry the most recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def get_features(self, key):
+        try:
+            with np.load(os.path.join(self._entry(key), FEATURES_FILE)) as npz:
+                return {name: npz[name] for name in npz.files}
+        except (OSError, ValueError):
+            return None
+
+    def get_artifacts(self, key):
+        try:
+            with open(os.path.join(self._entry(key), ARTIFACTS_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_index(self, path, value):
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(value)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f'Analysis cache index write failed: {e}')
+
+    @staticmethod
+    def _read_index(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    @staticmethod
+    def _url_name(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def link(self, music_id, key):
+        """Remember that music_id's latest analysis is stored under key."""
+        self._write_index(os.path.join(self.root, INDEX_DIR, str(music_id)), key)
+
+    def lookup(self, music_id):
+        """Cache key of music_id's latest analysis, or None (never analyzed here, or evicted)."""
+        key = self._read_index(os.path.join(self.root, INDEX_DIR, str(music_id)))
+        return key if key and os.path.isdir(self._entry(key)) else None
+
+    def link_url(self, url, audio_digest):
+        """Remember that url served audio whose sha256 is audio_digest."""
+        self._write_index(os.path.join(self.root, URL_INDEX_DIR, self._url_name(url)), audio_digest)
+
+    def lookup_url(self, url):
+        """sha256 of the audio last downloaded from url, or None."""
+        return self._read_index(os.path.join(self.root, URL_INDEX_DIR, self._url_name(url)))
+
+    def put(self, key, result, features=None, artifacts=None):
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.root)
+        try:
+            with open(os.path.join(tmp, RESULT_FILE), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            if features:
+                np.savez(os.path.join(tmp, FEATURES_FILE), **features)
+            if artifacts:
+                with open(os.path.join(tmp, ARTIFACTS_FILE), 'w', encoding='utf-8') as f:
+                    json.dump(artifacts, f, ensure_ascii=False)
+            entry = self._entry(key)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except OSError as e:
+            # a cache write must never fail the analysis itself (e.g. another worker stored the same key)
+            print(f'Analysis cache write failed: {e}')
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(path))
+                entries.append((os.stat(path).st_mtime, size, path))
+            except OSError:
+                continue  # evicted by another worker meanwhile
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,315 @@
+import hashlib
+import os
+import tempfile
+from urllib.parse import urlparse
+
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Epilogue, Field, File, MultipartDecoder, NeedData
+
+from utils.util import get_http_session
+
+CHUNK_SIZE = 1024 * 1024
+MAX_AUDIO_BYTES = int(os.getenv("ANALYSIS_MAX_AUDIO_BYTES", 100 * 1024**2))
+# 이 크기 이하로 알려진 파일은 디스크 대신 메모리 파일(memfd)에 저장 (Linux 전용)
+MEMFD_MAX_BYTES = int(os.getenv("ANALYSIS_MEMFD_MAX_BYTES", 16 * 1024**2))
+AUDIO_SUFFIXES = {".mp3", ".wav", ".flac", ".ogg", ".m4a", ".aac"}
+# 업로드의 Content-Type → 임시 파일 확장자 (파일 이름에 확장자가 없을 때 사용)
+AUDIO_CONTENT_TYPES = {
+    "audio/mpeg": ".mp3", "audio/mp3": ".mp3",
+    "audio/wav": ".wav", "audio/wave": ".wav", "audio/x-wav": ".wav",
+    "audio/flac": ".flac", "audio/x-flac": ".flac",
+    "audio/ogg": ".ogg",
+    "audio/mp4": ".m4a", "audio/x-m4a": ".m4a",
+    "audio/aac": ".aac",
+}
+# 업로드 본문의 음원 외 텍스트 필드(lyrics 등) 하나의 최대 크기
+MAX_FORM_FIELD_BYTES = int(os.getenv("ANALYSIS_MAX_FORM_FIELD_BYTES", 256 * 1024))
+DOWNLOAD_TIMEOUT = (10, 60)  # (connect, read) seconds
+# MusicAI에 URL을 그대로 넘길지 여부 (0이면 항상 내려받은 파일을 업로드)
+MUSICAI_URL_PASSTHROUGH = os.getenv("MUSICAI_URL_PASSTHROUGH", "1") == "1"
+
+
+class AudioTooLargeError(ValueError):
+    """The audio is larger than the allowed max_bytes."""
+
+
+class UnsupportedAudioError(ValueError):
+    """The upload is not one of the accepted audio formats."""
+
+
+class IngestedAudio:
+    """
+    요청마다 따로 만든 음원 파일. path는 분석기에 넘길 수 있는 경로이고
+    close() (또는 with 블록 종료) 시 파일이 삭제됩니다.
+    """
+
+    def __init__(self, path, fd, size, sha256, in_memory):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.in_memory = in_memory
+        self._fd = fd
+
+    def close(self):
+        if self._fd is None:
+            return
+        os.close(self._fd)
+        self._fd = None
+        if not self.in_memory and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_spool(suffix, expected_size):
+    if expected_size is not None and expected_size <= MEMFD_MAX_BYTES and hasattr(os, "memfd_create"):
+        fd = os.memfd_create("music-diary-audio")
+        # /proc/self는 여는 프로세스 자신을 가리키므로 m4a/aac를 디코딩하는 ffmpeg 하위 프로세스에서도 열리도록 pid로 지정
+        return fd, f"/proc/{os.getpid()}/fd/{fd}", True
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="music-")
+    return fd, path, False
+
+
+def spool(chunks, max_bytes=MAX_AUDIO_BYTES, suffix="", expected_size=None):
+    """
+    청크 이터러블을 요청 전용 임시 파일에 쓰면서 sha256을 계산합니다.
+    max_bytes를 넘으면 파일을 지우고 AudioTooLargeError(ValueError)를 발생시킵니다.
+    """
+    if expected_size is not None and expected_size > max_bytes:
+        raise AudioTooLargeError(f"Music file is too large ({expected_size} > {max_bytes} bytes)")
+
+    fd, path, in_memory = _open_spool(suffix, expected_size)
+    audio = IngestedAudio(path, fd, 0, None, in_memory)
+    digest = hashlib.sha256()
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            audio.size += len(chunk)
+            if audio.size > max_bytes:
+                raise AudioTooLargeError(f"Music file is too large (> {max_bytes} bytes)")
+            digest.update(chunk)
+            view = memoryview(chunk)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+    except BaseException:
+        audio.close()
+        raise
+    os.lseek(fd, 0, os.SEEK_SET)
+    audio.sha256 = digest.hexdigest()
+    return audio
+
+
+def open_local_audio(path):
+    """로컬 음원 파일을 복사하지 않고 IngestedAudio로 감쌉니다 (close()해도 원본은 지우지 않음)."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return IngestedAudio(path, None, size, digest.hexdigest(), in_memory=False)
+
+
+def open_audio(music_path, max_bytes=MAX_AUDIO_BYTES):
+    """로컬 파일 경로면 그대로, 그 외에는 URL(Google Drive 링크 포함)로 보고 내려받습니다."""
+    if os.path.isfile(music_path):
+        return open_local_audio(music_path)
+    return download_audio(resolve_music_url(music_path), max_bytes=max_bytes)
+
+
+def absolute_music_url(url):
+    """
+    music 테이블의 url을 내려받을 수 있는 주소로 바꿉니다. execute_state는 Mureka 응답을 ":"로 잘라 저장하므로
+    scheme 없는 "//cdn..." 형태로 남아 있고, 여기에 https:를 붙입니다. 그 외 url은 그대로 둡니다.
+    """
+    return f"https:{url}" if url.startswith("//") else url
+
+
+def is_passthrough_url(music_url):
+    """
+    MusicAI가 직접 받아갈 수 있는 URL인지 (Mureka CDN 등 공개 http(s) 주소).
+    Google Drive 링크는 큰 파일에서 확인 페이지를 거쳐야 하므로 제외합니다.
+    """
+    parsed = urlparse(music_url)
+    return (
+        MUSICAI_URL_PASSTHROUGH
+        and parsed.scheme in ("http", "https")
+        and bool(parsed.hostname)
+        and not parsed.hostname.endswith("drive.google.com")
+    )
+
+
+def resolve_music_url(music_path):
+    """Google Drive 공유 링크를 직접 다운로드 URL로 바꿉니다."""
+    if "drive.google.com" in music_path:
+        if "/file/d/" in music_path:
+            file_id = music_path.split("/d/")[1].split("/")[0]
+        elif "id=" in music_path:
+            file_id = music_path.split("id=")[1].split("&")[0]
+        else:
+            raise ValueError("Invalid Google Drive URL")
+        music_path = f"https://drive.google.com/uc?id={file_id}&export=download"
+        print(f"Converted Google Drive link to direct download URL: {music_path}")
+    return music_path
+
+
+def download_audio(music_url, max_bytes=MAX_AUDIO_BYTES):
+    """공유 세션으로 음원을 큰 청크 단위로 내려받아 IngestedAudio로 반환합니다."""
+    response = get_http_session().get(music_url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+    with response:
+        if response.status_code != 200:
+            raise ValueError("Failed to download the music file")
+
+        suffix = os.path.splitext(urlparse(music_url).path)[1].lower()
+        content_length = response.headers.get("Content-Length")
+        return spool(
+            response.iter_content(chunk_size=CHUNK_SIZE),
+            max_bytes=max_bytes,
+            suffix=suffix if suffix in AUDIO_SUFFIXES else ".wav",
+            expected_size=int(content_length) if content_length and content_length.isdigit() else None,
+        )
+
+
+def audio_suffix(filename=None, content_type=None):
+    """업로드 파일 이름의 확장자나 Content-Type으로 임시 파일 확장자를 정합니다. 둘 다 음원이 아니면 UnsupportedAudioError."""
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if suffix in AUDIO_SUFFIXES:
+        return suffix
+    mimetype = parse_options_header(content_type or "")[0]
+    if mimetype in AUDIO_CONTENT_TYPES:
+        return AUDIO_CONTENT_TYPES[mimetype]
+    raise UnsupportedAudioError(f"Unsupported audio type ({filename or '-'}, {mimetype or '-'}); expected one of {sorted(AUDIO_SUFFIXES)}")
+
+
+def _looks_like_audio(head):
+    """True if the first bytes carry the signature of an accepted container (mp3, wav, flac, ogg, m4a, aac)."""
+    return (
+        head.startswith((b"ID3", b"fLaC", b"OggS"))
+        or (head[:4] == b"RIFF" and head[8:12] == b"WAVE")
+        or head[4:8] == b"ftyp"
+        # 태그 없는 MPEG 오디오 / ADTS AAC 프레임 동기 비트
+        or (len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0)
+    )
+
+
+def _checked_audio(chunks):
+    """확장자/Content-Type만 믿지 않도록 첫 12바이트의 음원 시그니처를 확인하면서 청크를 그대로 넘깁니다."""
+    head = b""
+    for chunk in chunks:
+        if len(head) >= 12:
+            yield chunk
+            continue
+        head += chunk
+        if len(head) >= 12:
+            if not _looks_like_audio(head):
+                raise UnsupportedAudioError("Uploaded file is not a supported audio file")
+            yield head
+    if len(head) < 12:
+        if not _looks_like_audio(head):
+            raise UnsupportedAudioError("Uploaded file is not a supported audio file")
+        yield head
+
+
+class _MultipartReader:
+    """
+    multipart/form-data 본문을 CHUNK_SIZE 단위로 읽어 파트별로 넘깁니다.
+    텍스트 필드는 fields에 모으고(필드당 max_field_bytes까지), 파일 파트의 데이터는 file_data()로 흘려보냅니다.
+    """
+
+    def __init__(self, stream, boundary, max_field_bytes):
+        self.fields = {}
+        self._stream = stream
+        # max_form_memory_size는 파일 파트까지 포함한 버퍼 전체에 걸리므로 쓰지 않고, 필드 크기는 _handle에서 제한합니다.
+        self._decoder = MultipartDecoder(boundary)
+        self._max_field_bytes = max_field_bytes
+        self._events = self._read_events()
+        self._part = None
+        self._field_data = bytearray()
+
+    def _read_events(self):
+        while True:
+            event = self._decoder.next_event()
+            if isinstance(event, NeedData):
+                # 파트 헤더가 끝나지 않는 본문처럼 이벤트 없이 버퍼만 쌓이는 경우를 막습니다.
+                if len(self._decoder.buffer) > CHUNK_SIZE + self._max_field_bytes:
+                    raise ValueError("Malformed multipart body")
+                # 빈 청크(None)는 본문의 끝: 이후 완결되지 않은 파트가 있으면 decoder가 ValueError를 냅니다.
+                self._decoder.receive_data(self._stream.read(CHUNK_SIZE) or None)
+            elif isinstance(event, Epilogue):
+                return
+            else:
+                yield event
+
+    def next_file(self, name):
+        """name 파일 파트가 시작될 때까지 앞의 필드를 모으고 그 File 이벤트를 반환합니다 (없으면 None)."""
+        for event in self._events:
+            if isinstance(event, File) and event.name == name:
+                self._part = event
+                return event
+            self._handle(event)
+        return None
+
+    def file_data(self):
+        """next_file()로 연 파일 파트의 데이터 청크 (파트가 끝나면 멈춤)."""
+        for event in self._events:
+            yield event.data
+            if not event.more_data:
+                return
+
+    def finish(self):
+        """파일 뒤에 오는 필드까지 끝까지 읽고 fields를 반환합니다."""
+        for event in self._events:
+            self._handle(event)
+        return self.fields
+
+    def _handle(self, event):
+        if isinstance(event, (Field, File)):
+            self._part = event
+            self._field_data.clear()
+        elif isinstance(self._part, Field):
+            self._field_data += event.data
+            if len(self._field_data) > self._max_field_bytes:
+                raise ValueError(f"Form field '{self._part.name}' is too large (> {self._max_field_bytes} bytes)")
+            if not event.more_data:
+                self.fields[self._part.name] = self._field_data.decode("utf-8", errors="replace")
+        # 다른 파일 파트의 데이터는 버립니다.
+
+
+def spool_upload(stream, content_type, content_length=None, file_field="audio", max_bytes=MAX_AUDIO_BYTES,
+                 max_field_bytes=MAX_FORM_FIELD_BYTES):
+    """
+    요청 본문(stream)을 메모리에 모으지 않고 CHUNK_SIZE 단위로 읽어 spool()로 임시 파일에 씁니다.
+    multipart/form-data면 file_field 파일 파트를 음원으로, 나머지 텍스트 파트를 필드로 읽고,
+    그 외에는 본문 전체를 음원으로 봅니다 (Content-Type: audio/*).
+    (IngestedAudio, 필드 dict)를 반환합니다. 크기 초과는 AudioTooLargeError, 음원이 아니면 UnsupportedAudioError.
+    """
+    mimetype, options = parse_options_header(content_type or "")
+    if mimetype != "multipart/form-data":
+        audio = spool(_checked_audio(iter(lambda: stream.read(CHUNK_SIZE), b"")), max_bytes=max_bytes,
+                      suffix=audio_suffix(content_type=mimetype), expected_size=content_length)
+        return audio, {}
+
+    if not options.get("boundary"):
+        raise ValueError("Missing multipart boundary")
+    # 본문 크기는 음원 + 필드 + 경계 문자열이므로, 음원만으로 max_bytes를 넘는 요청만 미리 거절합니다.
+    if content_length is not None and content_length > max_bytes + max_field_bytes:
+        raise AudioTooLargeError(f"Upload is too large ({content_length} > {max_bytes} bytes)")
+
+    reader = _MultipartReader(stream, options["boundary"].encode("latin-1"), max_field_bytes)
+    part = reader.next_file(file_field)
+    if part is None:
+        raise ValueError(f"Missing '{file_field}' file")
+    audio = spool(_checked_audio(reader.file_data()), max_bytes=max_bytes,
+                  suffix=audio_suffix(part.filename, part.headers.get("Content-Type")))
+    try:
+        # 음원 뒤에 온 lyrics 등도 읽어야 하므로 본문 끝까지 읽습니다.
+        return audio, reader.finish()
+    except BaseException:
+        audio.close()
+        raise
@@ -0,0 +1,151 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class AnalysisJob:
+    def __init__(self, user_id, music_id, key=None):
+        self.job_id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.music_id = music_id
+        self.key = key  # identifies the analysis (music + lyrics + settings), so the same request reuses this job
+        self.status = QUEUED
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.timings = None  # analyzer.timing.StageTimer.summary() of the run
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0  # bumped on every change, so watchers can tell whether anything happened
+        self._cond = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in (SUCCEEDED, FAILED)
+
+    def _update(self, **changes):
+        with self._cond:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.updated_at = time.time()
+            self.version += 1
+            self._cond.notify_all()
+
+    def report(self, stage):
+        self._update(status=RUNNING, stage=stage)
+
+    def record_timings(self, timings):
+        self._update(timings=timings)
+
+    def succeed(self, result):
+        self._update(status=SUCCEEDED, stage='done', result=result)
+
+    def fail(self, error):
+        self._update(status=FAILED, error=error)
+
+    def wait(self, timeout=None):
+        """Block until the job is done (or timeout) and return whether it is."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout=timeout)
+
+    def wait_for_change(self, version, timeout):
+        """Block until the job changes after `version` (or timeout) and return the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.job_id,
+            'music_id': self.music_id,
+            'status': self.status,
+            'stage': self.stage,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+        if self.error is not None:
+            data['error'] = self.error
+        if self.timings is not None:
+            data['timings'] = self.timings
+        if include_result and self.status == SUCCEEDED:
+            data['result'] = self.result
+        return data
+
+
+class AnalysisJobManager:
+    """
+    /analysis 작업을 백그라운드 워커 풀에서 실행하고 상태를 메모리에 보관합니다.
+    작업 상태는 프로세스 로컬이므로, 같은 gunicorn 워커 프로세스로 조회해야 합니다.
+    """
+
+    def __init__(self, max_workers=2, ttl=60 * 60):
+        self.ttl = ttl  # 끝난 작업을 보관하는 시간 (초)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, user_id, music_id, key=None, **kwargs):
+        """
+        func(progress=..., timings=..., **kwargs)를 실행하는 작업을 등록하고 바로 반환합니다.
+        key가 같은 작업이 대기/실행 중이거나 이미 성공했다면 새로 실행하지 않고 그 작업을 돌려줍니다.
+        """
+        with self._lock:
+            self._prune()
+            existing = self._by_key.get(key) if key is not None else None
+            if existing is not None and existing.status != FAILED:
+                return existing
+            job = AnalysisJob(user_id, music_id, key)
+            self._jobs[job.job_id] = job
+            if key is not None:
+                self._by_key[key] = job
+        self._pool.submit(self._run, job, func, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, key):
+        """The job registered under key that has not failed, or None."""
+        with self._lock:
+            job = self._by_key.get(key)
+        return job if job is not None and job.status != FAILED else None
+
+    def find_music(self, music_id):
+        """Latest job for music_id that is still queued or running, or None."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.music_id == music_id and not job.done]
+        return max(jobs, key=lambda job: job.created_at, default=None)
+
+    def _run(self, job, func, kwargs):
+        job.report('started')
+        try:
+            result = func(progress=job.report, timings=job.record_timings, **kwargs)
+            job.succeed(result)
+        except Exception as e:
+            print(f"Analysis job {job.job_id} failed: {traceback.format_exc()}")
+            job.fail(str(e))
+
+    def _prune(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and now - job.updated_at > self.ttl]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return counts
@@ -1,62 +1,53 @@
-import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from functools import partial
 
 import librosa
-import madmom
 import numpy as np
 import json
 
-from musicai_sdk import MusicAiClient
-
-from utils.util import fetch_json, check_include, normalize, hz_to_midi
-
-
-def needleman_wunsch(seq1, seq2, match=2, mismatch=-1, gap=-1):
-    n = len(seq1)
-    m = len(seq2)
-    score = np.zeros((n + 1, m + 1))
-
-    for i in range(n + 1):
-        score[i][0] = gap * i
-    for j in range(m + 1):
-        score[0][j] = gap * j
-
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            match_score = score[i - 1][j - 1] + (match if seq1[i - 1]['word'] == seq2[j - 1]['word'] else mismatch)
-            delete = score[i - 1][j] + gap
-            insert = score[i][j - 1] + gap
-            score[i][j] = max(match_score, delete, insert)
-
-    align1, align2 = [], []
-    i, j = n, m
-    while i > 0 or j > 0:
-        current_score = score[i][j]
-        if i > 0 and j > 0 and (current_score == score[i - 1][j - 1] + (
-        match if seq1[i - 1]['word'] == seq2[j - 1]['word'] else mismatch)):
-            align1.append(seq1[i - 1])
-            align2.append(seq2[j - 1])
-            i -= 1
-            j -= 1
-        elif i > 0 and (current_score == score[i - 1][j] + gap):
-            align1.append(seq1[i - 1])
-            align2.append({'word': '-', 'meta': '-'})
-            i -= 1
-        else:
-            align1.append({'word': '-', 'meta': '-'})
-            align2.append(seq2[j - 1])
-            j -= 1
+from analyzer.alignment import GAP, align_indices, interval_join
+from analyzer.audio import AudioBuffer
+from analyzer.beat_pool import BEAT_SAMPLE_RATE
+from analyzer.beats import ONSET_SR, check_beat_backend, grid_beats, onset_envelope, parse_bpm, track_onset_beats
+from analyzer.musicai import get_client, get_job_tracker
+from analyzer.pitch import check_pitch_tier, extract_pitch_track, pitch_records
+from analyzer.records import AlignedWord, OriginalWord, TranscriptWord, VocalNote, beat_records, to_dicts
+from analyzer.streaming import AudioStream, should_stream, stream_beat_activations, stream_onset_envelope, stream_pitch_track
+from analyzer.timing import StageTimer
+from analyzer.waveform import WaveformEnvelope
+from utils.util import fetch_json_many, normalize
 
-    return align1[::-1], align2[::-1]
+# bump whenever a change alters analysis output; cached results of older versions are ignored
+ANALYZER_VERSION = '2'
 
 
 class MusicAnalyzer:
-    def __init__(self, url, original_lyrics):
-        self.client = MusicAiClient(api_key=os.getenv('MUSICAI_API_KEY'))
-        print(f'Application Info: {self.client.get_application_info()}')
+    def __init__(self, url, original_lyrics, progress=None, beat_pool=None, pitch_tier=None, client=None, timer=None, streaming=None, tracker=None, remote_slots=None, beat_backend=None,
+                 input_url=None, fetch_audio=None):
+        # None이면 analyze()에서 프로세스 공용 클라이언트와 폴러를 사용 (application info는 처음 한 번만 조회)
+        self.client = client
+        self.tracker = tracker  # analyzer.musicai.JobTracker; None이면 client.wait_for_job_completion으로 기다림
+        # 동시에 실행할 MusicAI 작업 수를 제한하는 세마포어 (배치 분석에서 여러 프로세스가 공유)
+        self.remote_slots = remote_slots or nullcontext()
 
         self.url = url
+        # input_url: MusicAI가 직접 받을 수 있는 공개 URL이면 upload_file 없이 inputUrl로 그대로 넘깁니다.
+        # fetch_audio(): url이 None일 때 로컬 DSP용 음원 경로를 돌려주는 함수로, 원격 작업과 동시에 처음 필요할 때 한 번만 호출됩니다.
+        self.input_url = input_url
+        self.fetch_audio = fetch_audio
+        self._fetch_lock = threading.Lock()
+        self.progress = progress or (lambda stage: None)
+        self.beat_pool = beat_pool  # analyzer.beat_pool.BeatTrackerPool: madmom models stay loaded between analyses
+        self.pitch_tier = check_pitch_tier(pitch_tier)  # analyzer.pitch.PITCH_TIERS
+        self.beat_backend = check_beat_backend(beat_backend)  # analyzer.beats.BEAT_BACKENDS
+        self._bpm_ready = threading.Event()  # set once the MusicAI job is over (grid backend waits for its BPM)
+        self.timer = timer or StageTimer()  # analyzer.timing.StageTimer: per-stage wall/CPU time and peak RSS
+        # True: beat/pitch over overlapping blocks with constant memory, None: decide by track length (ANALYSIS_STREAMING_SECONDS)
+        self.streaming = streaming
         self.original_lyrics = original_lyrics
-        self.original_dict = []
+        self.original_dict = []  # OriginalWord
         if self.original_lyrics != '':
             self._set_original_dict()
             self.workflow = 'synthesizer'
@@ -64,93 +55,204 @@ class MusicAnalyzer:
             self.workflow = 'synthesizer_instrument'
 
         self.bpm = None
-        self.lyrics = []
+        self.lyrics = []  # TranscriptWord
         self.metadata = None
-        self.vocal_pitch = None
-        self.aligned_lyrics = []
-        self.beat_amp = []
-        self.pitches = []
+        self.vocal_pitch = None  # VocalNote
+        self.artifact_timings = {}
+        self.aligned_lyrics = []  # AlignedWord
+        self.beat_times = np.empty(0)  # beats with an amplitude, in seconds
+        self.beat_amp = np.empty(0)  # normalized amplitude at each of beat_times
+        self.beat_activations = np.empty(0)
+        self.beats = np.empty(0)
+        self.pitch_times = np.empty(0)
+        self.pitch_midi = np.empty(0, dtype=np.int64)
+        self.waveform = None  # analyzer.waveform.WaveformEnvelope.finish(): 플레이어가 바로 그릴 peak/RMS 포락선
+        self.audio = None
 
     def _set_original_dict(self):
         # remove all strings in []
         lyrics = [lyric for lyric in self.original_lyrics.split('\n') if not lyric.startswith('[') and not lyric.endswith(']')]
         for i, phase in enumerate(lyrics):
             for word in phase.split():
-                self.original_dict.append({'word': word, 'phase': i})
-
-    def analyze(self):
-        file_url = self.client.upload_file(file_path=self.url)
-        workflow_params = {
-            'inputUrl': file_url
-        }
-        create_job_info = self.client.create_job(
-            job_name='music_lyrics',
-            workflow_id=self.workflow,
-            params=workflow_params)
-        job_id = create_job_info['id']
-        print(job_id)
-
-        job_info = self.client.wait_for_job_completion(job_id)
-
-        status = job_info['status']
-        results = job_info['result']
+                self.original_dict.append(OriginalWord(word, i))
+
+    def analyze(self, concurrent=True):
+        """
+        concurrent=True: 로컬 beat/pitch 추출은 MusicAI 결과와 무관하므로, 원격 작업을 기다리는 동안
+        워커 풀에서 먼저 실행하고 가사 정렬 전에 합류합니다. (전체 시간 ≈ max(원격, 로컬))
+        """
+        if self.client is None:
+            self.client, self.tracker = get_client(), self.tracker or get_job_tracker()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            local_job = pool.submit(self._analyze_local, True) if concurrent else None
+
+            try:
+                with self.remote_slots:
+                    job_info = self._run_remote_job(self.input_url or self._upload(), local_job)
+                    if job_info['status'] != 'SUCCEEDED' and self.input_url is not None:
+                        # MusicAI가 URL을 받지 못했을 수도 있으니(만료, 접근 제한 등) 파일을 올려서 한 번 더 시도합니다.
+                        print(f'MusicAI job failed for input URL {self.input_url}, retrying with an uploaded file')
+                        job_info = self._run_remote_job(self._upload(), local_job)
+
+                status = job_info['status']
+                results = job_info['result']
+                if status == 'SUCCEEDED':
+                    self.bpm = results['BPM']
+            finally:
+                self._bpm_ready.set()
+
+            if local_job is not None:
+                self.progress('local_analysis')
+                local_job.result()
 
         if status != 'SUCCEEDED':
             print(f'MusicAI Error occurred status response is {status}')
         else:
-            self.bpm = results['BPM']
-            self.metadata = fetch_json(results['Music metadata'])
+            self.progress('fetching_results')
+            artifact_names = ['Music metadata']
+            if len(self.original_dict) > 0:
+                artifact_names += ['Lyrics', 'Vocal pitch']  # , 'Chords map'
+            with self.timer.stage('fetch'):
+                artifacts, self.artifact_timings = fetch_json_many({name: results[name] for name in artifact_names})
+
+            self.metadata = artifacts['Music metadata']
             if len(self.original_dict) > 0:
-                lyrics = fetch_json(results['Lyrics'])
+                lyrics = artifacts['Lyrics']
                 for phase in lyrics:
                     for word in phase['words']:
-                        self.lyrics.append(word)
-                # self.chords_map = fetch_json(results['Chords map'])
-                self.vocal_pitch = fetch_json(results['Vocal pitch'])
+                        self.lyrics.append(TranscriptWord.from_dict(word))
+                # self.chords_map = artifacts['Chords map']
+                self.vocal_pitch = [VocalNote.from_dict(note) for note in artifacts['Vocal pitch']]
+
+                self.progress('aligning')
+                self._align()
+            if not concurrent:
+                self.progress('local_analysis')
+                self._analyze_local()
+
+    def _local_path(self):
+        with self._fetch_lock:
+            if self.url is None and self.fetch_audio is not None:
+                with self.timer.stage('download'):
+                    self.url = self.fetch_audio()
+            return self.url
+
+    def _upload(self):
+        self.progress('uploading')
+        with self.timer.stage('upload'):
+            return self.client.upload_file(file_path=self._local_path())
+
+    def _run_remote_job(self, input_url, local_job=None):
+        workflow_params = {
+            'inputUrl': input_url
+        }
+        with self.timer.stage('upload'):
+            create_job_info = self.client.create_job(
+                job_name='music_lyrics',
+                workflow_id=self.workflow,
+                params=workflow_params)
+        job_id = create_job_info['id']
+        print(job_id)
+
+        self.progress('waiting_remote_job')
+        with self.timer.stage('remote_job'):
+            if self.tracker is None:
+                return self.client.wait_for_job_completion(job_id)
+            remote = self.tracker.track(job_id)
+            if local_job is not None:
+                # 로컬 분석(음원 받기 포함)이 먼저 실패하면 원격 작업을 끝까지 기다리지 않고 그 오류를 바로 올립니다.
+                # analyze_url은 내려받은 음원이 이미 분석된 것일 때 이렇게 원격 작업을 건너뜁니다.
+                wait([remote, local_job], return_when=FIRST_COMPLETED)
+                if not remote.done() and local_job.exception() is not None:
+                    raise local_job.exception()
+            return remote.result()
+
+    def realign(self, artifacts, result):
+        """
+        가사만 바뀌었을 때: 캐시해 둔 MusicAI 결과(get_artifacts())로 가사 정렬과 음정 매칭만 다시 하고,
+        이전 get_final_format() 결과의 비트/음정은 그대로 둔 새 결과를 반환합니다. 음원은 다시 읽지 않습니다.
+        """
+        self.bpm = artifacts['bpm']
+        self.metadata = artifacts['metadata']
+        self.lyrics = [TranscriptWord.from_dict(word) for word in artifacts['lyrics'] or []]
+        self.vocal_pitch = [VocalNote.from_dict(note) for note in artifacts['vocal_pitch'] or []]
+        self.aligned_lyrics = []
+        if len(self.original_dict) > 0:
+            self._align()
+        return {**result, 'Lyrics': to_dicts(self.aligned_lyrics)}
+
+    def _align(self):
+        with self.timer.stage('alignment'):
+            self._align_lyrics()
+        with self.timer.stage('feature_join'):
+            self._align_music_features()
+
+    def _analyze_local(self, concurrent=False):
+        path = self._local_path()
+        if self.streaming is None:
+            self.streaming = should_stream(path)
+        with self.timer.stage('decode'):
+            # 스트리밍 모드에서는 파일 정보만 읽고, 각 단계가 필요한 샘플레이트로 블록을 직접 읽습니다.
+            self.audio = AudioStream(path) if self.streaming else AudioBuffer(path)
+        stages = [self._beat_stage,
+                  partial(self._timed, 'pitch', self._get_all_pitches),
+                  partial(self._timed, 'waveform', self._get_waveform)]
+        if concurrent:
+            # analyze()의 풀에서 실행 중이므로 단계들은 별도 풀에서 돌려, 풀 크기와 상관없이 서로 기다리다 멈추지 않게 합니다.
+            with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+                jobs = [pool.submit(stage) for stage in stages]
+                for job in jobs:
+                    job.result()
+        else:
+            for stage in stages:
+                stage()
+        self.audio = None
 
-                self._align_lyrics()
-                self._align_music_features()
-            self._get_beat_amplitudes()
-            self._get_all_pitches()
+    def _beat_stage(self):
+        if self.beat_backend == 'grid':
+            self._bpm_ready.wait()  # 격자 방식은 MusicAI BPM이 필요하므로 원격 작업이 끝날 때까지 기다림
+        self._timed('beat', self._get_beat_amplitudes)
+
+    def _timed(self, stage, func):
+        with self.timer.stage(stage):
+            return func()
 
     def _align_lyrics(self):
-        org_align, pred_align = needleman_wunsch(self.original_dict, self.lyrics)
+        # 갭은 단어 '-'가 아니라 GAP 인덱스로 표시되므로 가사에 실제 '-'가 있어도 갭으로 오인하지 않습니다.
+        org_idx, pred_idx = align_indices([org.word for org in self.original_dict], [pred.word for pred in self.lyrics])
         pred_bag = []
         org_bag = []
-        for org, pred in zip(org_align, pred_align):
-            if org['word'] == '-':
-                if pred['word'] != '-':
-                    pred_bag.append(pred)
+        for i, j in zip(org_idx, pred_idx):
+            if i == GAP:
+                if j != GAP:
+                    pred_bag.append(self.lyrics[j])
             else:
-                if pred['word'] == '-':
+                org = self.original_dict[i]
+                if j == GAP:
                     if len(pred_bag) > 0:
-                        start_time = pred_bag[0]['start']
-                        end_time = pred_bag[-1]['end']
+                        start_time = pred_bag[0].start
+                        end_time = pred_bag[-1].end
                     else:  # 뒤에 나올 단어 아니면 앞에 단어와 합칠 것
                         org_bag.append(org)
                         continue
                 else:
+                    pred = self.lyrics[j]
                     if len(pred_bag) > 0:
-                        start_time = pred_bag[0]['start']
+                        start_time = pred_bag[0].start
                     else:
-                        start_time = pred['start']
-                    end_time = pred['end']
+                        start_time = pred.start
+                    end_time = pred.end
 
+                word = org.word
                 if len(org_bag) > 0:
                     for missed_org in org_bag:
-                        if missed_org['phase'] == org['phase']:
-                            org['word'] = missed_org['word'] + org['word']
+                        if missed_org.phase == org.phase:
+                            word = missed_org.word + word
                         else:
-                            self.aligned_lyrics[-1]['word'] = self.aligned_lyrics[-1]['word'] + missed_org['word']
+                            self.aligned_lyrics[-1].word += missed_org.word
                     org_bag = []
-                self.aligned_lyrics.append(
-                    {'word': org['word'],
-                     'start': start_time,
-                     'end': end_time,
-                     'phase': org['phase'],
-                     'pitch': [],
-                     # 'chords': []
-                     })
+                self.aligned_lyrics.append(AlignedWord(word, start_time, end_time, org.phase))
 
                 pred_bag = []
         print('Lyrics alignment done')
@@ -167,17 +269,10 @@ class MusicAnalyzer:
         #                 'end': chord_end
         #             })
 
-        for pitch in self.vocal_pitch:
-            pitch_start = pitch['start']
-            pitch_end = pitch['end']
-            for lyric in self.aligned_lyrics:
-                if check_include(lyric['start'], lyric['end'], pitch_start, pitch_end):
-                    lyric['pitch'].append({
-                        'note_name': pitch['note_name'],
-                        'midi_note': pitch['midi_note'],
-                        'start': pitch_start,
-                        'end': pitch_end
-                    })
+        spans = [(lyric.start, lyric.end) for lyric in self.aligned_lyrics]
+        events = [(pitch.start, pitch.end) for pitch in self.vocal_pitch]
+        for lyric, pitch_ids in zip(self.aligned_lyrics, interval_join(spans, events)):
+            lyric.pitch.extend(self.vocal_pitch[p] for p in pitch_ids)
         print(f'Align music feature done')
 
     def get_final_format(self):
@@ -185,47 +280,99 @@ class MusicAnalyzer:
             'BPM': self.bpm,
             'Instruments': self.metadata['instrumentTags'],
             'Emotions': self.metadata['moodTags'],
-            'Lyrics': self.aligned_lyrics,
-            'Beat_amplitude': self.beat_amp,
-            'Pitch': self.pitches,
+            'Lyrics': to_dicts(self.aligned_lyrics),
+            'Beat_amplitude': beat_records(self.beat_times, self.beat_amp),
+            'Pitch': pitch_records(self.pitch_times, self.pitch_midi),
+            'Waveform': self.waveform,
+        }
+
+    def get_timings(self):
+        """{'stages': {name: {wall_seconds, cpu_seconds, peak_rss_mb, rss_growth_mb}}, 'total_seconds', 'peak_rss_mb'}"""
+        return self.timer.summary()
+
+    def get_artifacts(self):
+        """MusicAI outputs that realign() needs, so edited lyrics never require another remote job."""
+        return {
+            'bpm': self.bpm,
+            'metadata': self.metadata,
+            'lyrics': to_dicts(self.lyrics),
+            'vocal_pitch': to_dicts(self.vocal_pitch) if self.vocal_pitch is not None else None,
+        }
+
+    def get_features(self):
+        """Intermediate features worth caching next to the final result."""
+        return {
+            'beat_activations': np.asarray(self.beat_activations),
+            'beats': np.asarray(self.beats),
+            'pitch_times': self.pitch_times,
+            'pitch_midi': self.pitch_midi,
         }
 
     def _get_beat_amplitudes(self):
-        y, sr = librosa.load(self.url, sr=None ,dtype='float64')
-        proc = madmom.features.beats.RNNBeatProcessor()
-        act = proc(self.url)
-        beats = madmom.features.beats.DBNBeatTrackingProcessor(fps=100)(act)
+        act, beats = self._track_beats()
+        self.beat_activations, self.beats = act, beats
         # print(beats)
-        beat_samples = librosa.time_to_samples(beats, sr=sr)
+        beat_samples = librosa.time_to_samples(beats, sr=self.audio.sr)
         # print(beat_samples)
-        beat_samples = beat_samples[beat_samples < len(y)]
-        beat_amplitude = y[beat_samples]
+        if self.streaming:
+            beat_samples = beat_samples[beat_samples < self.audio.frames]
+            beat_amplitude = self.audio.samples_at(beat_samples)
+        else:
+            beat_samples = beat_samples[beat_samples < len(self.audio.y)]
+            beat_amplitude = self.audio.y[beat_samples]
         # print(beat_amplitude)
 
         normalized_amp = normalize(beat_amplitude)
-        for beat, amp in zip(beats, normalized_amp):
-            self.beat_amp.append({'time': float(beat), 'amplitude': float(amp)})
-
-        return y, sr, beats, normalized_amp
+        self.beat_times = np.asarray(beats)[:len(normalized_amp)]
+        self.beat_amp = np.asarray(normalized_amp)
+
+        return beats, normalized_amp
+
+    def _track_beats(self):
+        """(activations, beat times) from the selected backend; librosa/grid return the onset envelope as activations."""
+        if self.beat_backend == 'madmom':
+            if self.streaming:
+                return self._track_beats_streaming()
+            if self.beat_pool is not None:
+                return self.beat_pool.track(self.audio.resampled(BEAT_SAMPLE_RATE))
+            import madmom  # heavy import, only needed when no warm beat pool is available
+
+            proc = madmom.features.beats.RNNBeatProcessor()
+            act = proc(self.audio.madmom_signal(BEAT_SAMPLE_RATE))
+            return act, madmom.features.beats.DBNBeatTrackingProcessor(fps=100)(act)
+
+        envelope = stream_onset_envelope(self.audio) if self.streaming else onset_envelope(self.audio.resampled(ONSET_SR))
+        if self.beat_backend == 'grid':
+            bpm = parse_bpm(self.bpm)
+            if bpm is not None:
+                return envelope, grid_beats(envelope, bpm)
+            print(f'MusicAI BPM unavailable ({self.bpm!r}), falling back to onset beat tracking')
+        return envelope, track_onset_beats(envelope)
+
+    def _track_beats_streaming(self):
+        import madmom
+        from madmom.audio.signal import Signal
+
+        if self.beat_pool is not None:
+            rnn = self.beat_pool.activations
+        else:
+            proc = madmom.features.beats.RNNBeatProcessor()
+            rnn = lambda samples: proc(Signal(samples, sample_rate=BEAT_SAMPLE_RATE))
+        act = stream_beat_activations(self.audio, rnn, sr=BEAT_SAMPLE_RATE)
+        return act, madmom.features.beats.DBNBeatTrackingProcessor(fps=100)(act)
+
+    def _get_waveform(self):
+        # 디코딩된 원본 샘플레이트 신호로 계산 (스트리밍이면 블록을 차례로 읽음)
+        envelope = WaveformEnvelope(self.audio.sr)
+        for block in (self.audio.blocks() if self.streaming else [self.audio.y]):
+            envelope.add(block)
+        self.waveform = envelope.finish()
 
     def _get_all_pitches(self):
-        y, sr = librosa.load(self.url, dtype='float64')
-        harmonic, percussive = librosa.effects.hpss(y)
-        pitches, magnitudes = librosa.core.piptrack(y=harmonic, sr=sr)
-
-        pitch_array = []
-        for t in range(pitches.shape[1]):
-            idx = magnitudes[:, t].argmax()
-            pitch = pitches[idx, t]
-            if pitch > 0:
-                pitch_array.append(pitch)
-            else:
-                pitch_array.append(np.nan)
-
-        midi_pitches = [hz_to_midi(p) if not np.isnan(p) else 0 for p in pitch_array]
-        times = librosa.times_like(np.array(midi_pitches), sr=sr)
-        for t, p in zip(times, midi_pitches):
-            self.pitches.append({'time': t, 'pitch': p})
+        if self.streaming:
+            self.pitch_times, self.pitch_midi = stream_pitch_track(self.audio, self.pitch_tier)
+        else:
+            self.pitch_times, self.pitch_midi = extract_pitch_track(self.audio, self.pitch_tier)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from musicai_sdk import MusicAiClient
+from requests import HTTPError
+
+from utils.util import get_http_session
+
+DONE_STATUSES = ('SUCCEEDED', 'FAILED')
+# 상태 조회 (connect, read) 타임아웃. SDK는 timeout 없이 requests.get을 불러 응답이 멈추면 폴러 전체가 멈춥니다.
+STATUS_TIMEOUT = (float(os.getenv('MUSICAI_STATUS_CONNECT_TIMEOUT', 5)), float(os.getenv('MUSICAI_STATUS_READ_TIMEOUT', 15)))
+
+_client = None
+_application_info = None
+_tracker = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide MusicAiClient; application info is fetched (and logged) only on first use."""
+    global _client, _application_info
+    with _lock:
+        if _client is None:
+            _client = TimeoutMusicAiClient(api_key=os.getenv('MUSICAI_API_KEY'))
+            _application_info = _client.get_application_info()
+            print(f'Application Info: {_application_info}')
+        return _client
+
+
+def get_application_info():
+    get_client()
+    return _application_info
+
+
+def get_job_tracker():
+    """Process-wide JobTracker polling through the shared client."""
+    global _tracker
+    client = get_client()
+    with _lock:
+        if _tracker is None:
+            _tracker = JobTracker(client)
+        return _tracker
+
+
+class TimeoutMusicAiClient(MusicAiClient):
+    """
+    작업 상태 조회(get_job_status, get_job)를 공유 세션과 STATUS_TIMEOUT으로 보내는 MusicAiClient.
+    타임아웃은 requests.Timeout으로 올라오므로 JobTracker에서는 다른 조회 실패처럼 errors로 셉니다.
+    """
+
+    def get_job_status(self, job_id):
+        return self._get_json(f'{self.base_url}/job/{job_id}/status')
+
+    def get_job(self, job_id):
+        return self._get_json(f'{self.base_url}/job/{job_id}')
+
+    def _get_json(self, url):
+        response = get_http_session().get(url, headers=self.get_headers(), timeout=STATUS_TIMEOUT)
+        if response.status_code // 100 != 2:
+            raise HTTPError(f'Error getting job: {response.status_code} {response.text}')
+        return response.json()
+
+
+class _TrackedJob:
+    def __init__(self, job_id, interval):
+        self.job_id = job_id
+        self.future = Future()
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.errors = 0
+        self.submitted = time.monotonic()
+
+
+class JobTracker:
+    """
+    여러 MusicAI 작업을 하나의 백그라운드 스레드에서 폴링하고, 끝난 작업의 Future를 완료합니다.
+    작업마다 폴링 간격을 min_interval에서 시작해 backoff 배씩 max_interval까지 늘려,
+    오래 걸리는 작업이 많아도 API 호출 수가 작업 수 × 짧은 간격으로 불어나지 않습니다.
+
+        job_info = tracker.track(job_id).result()  # client.wait_for_job_completion(job_id)와 같은 결과
+    """
+
+    def __init__(self, client, min_interval=1.0, max_interval=15.0, backoff=1.5, max_errors=5):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors  # 연속으로 이만큼 상태 조회가 실패하면 Future에 예외를 넘깁니다
+        self._jobs = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._polls = 0
+        self._completed = 0
+        self._failed = 0
+
+    def track(self, job_id):
+        """Future that resolves to client.get_job(job_id) once the job has SUCCEEDED or FAILED."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('JobTracker is shut down')
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _TrackedJob(job_id, self.min_interval)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='musicai-poller', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return job.future
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = [job for job in self._jobs.values() if job.next_poll <= now]
+                if not due:
+                    timeout = min((job.next_poll for job in self._jobs.values()), default=now + 60) - now
+                    self._cond.wait(timeout=timeout)
+                    continue
+
+            for job in due:
+                self._poll(job)
+
+    def _poll(self, job):
+        try:
+            status = self.client.get_job_status(job.job_id)['status']
+            job_info = self.client.get_job(job.job_id) if status in DONE_STATUSES else None
+        except Exception as e:
+            job.errors += 1
+            print(f'MusicAI status check failed for {job.job_id} ({job.errors}/{self.max_errors}): {e}')
+            if job.errors >= self.max_errors:
+                self._finish(job, error=e)
+                return
+            job_info = None
+        else:
+            job.errors = 0
+
+        with self._cond:
+            self._polls += 1
+        if job_info is not None:
+            self._finish(job, result=job_info)
+        else:
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+            job.next_poll = time.monotonic() + job.interval
+
+    def _finish(self, job, result=None, error=None):
+        with self._cond:
+            self._jobs.pop(job.job_id, None)
+            if error is None and result['status'] == 'SUCCEEDED':
+                self._completed += 1
+            else:
+                self._failed += 1
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            print(f'MusicAI job {job.job_id} {result["status"]} after {time.monotonic() - job.submitted:.1f}s')
+            job.future.set_result(result)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending': len(self._jobs),
+                'polls': self._polls,
+                'completed': self._completed,
+                'failed': self._failed,
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            self._cond.notify_all()
+        for job in jobs:
+            job.future.cancel()
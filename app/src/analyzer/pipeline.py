@@ -0,0 +1,202 @@
+from analyzer.beats import check_beat_backend
+from analyzer.cache import AnalysisCache
+from analyzer.ingest import download_audio, is_passthrough_url, resolve_music_url
+from analyzer.music import MusicAnalyzer, ANALYZER_VERSION
+from analyzer.pitch import check_pitch_tier
+from analyzer.timing import StageTimer
+from analyzer.vis_codec import encode_vis_data
+from analyzer.vis_lod import with_lod
+
+
+class AnalysisNotCachedError(LookupError):
+    """realign_and_store: no reusable analysis for this music_id on this server."""
+
+
+class _CachedAudio(Exception):
+    """analyze_url: the downloaded audio was already analyzed with these settings (raised to stop MusicAnalyzer)."""
+
+    def __init__(self, cache_key, audio_digest, result):
+        super().__init__(cache_key)
+        self.cache_key = cache_key
+        self.audio_digest = audio_digest
+        self.result = result
+
+
+def stored_vis_data(result):
+    """musicVis에 저장할 형태: 압축 포맷 + 구간/해상도 조회(/library/summary/<id>/music/window)용 min/max/mean 피라미드."""
+    return with_lod(encode_vis_data(result))
+
+
+def analyze_audio(audio, lyrics, music_id, cache: AnalysisCache, progress=None, beat_pool=None, pitch_tier=None, timer=None, remote_slots=None, beat_backend=None):
+    """
+    이미 받아 둔 음원(analyzer.ingest.IngestedAudio)을 캐시 확인 후 분석하고 get_final_format() 결과를 반환합니다.
+    remote_slots: 동시에 실행할 MusicAI 작업 수를 제한하는 세마포어 (선택, 배치 분석용)
+    """
+    pitch_tier = check_pitch_tier(pitch_tier)
+    beat_backend = check_beat_backend(beat_backend)
+    # 같은 음원 + 같은 가사 + 같은 분석기 버전 + 같은 분석 설정이면 캐시된 결과를 그대로 사용
+    cache_key = _cache_key(audio.sha256, lyrics, pitch_tier, beat_backend)
+    result = cache.get(cache_key)
+    if result is None:
+        la = MusicAnalyzer(audio.path, lyrics, progress=progress, beat_pool=beat_pool, pitch_tier=pitch_tier, timer=timer,
+                           remote_slots=remote_slots, beat_backend=beat_backend)
+        la.analyze()
+        result = _store_analysis(cache, cache_key, la, audio.sha256, pitch_tier, beat_backend)
+    else:
+        print(f"Analysis cache hit: {cache_key}")
+    cache.link(music_id, cache_key)
+    return result
+
+
+def analyze_url(music_url, lyrics, music_id, cache: AnalysisCache, progress=None, beat_pool=None, pitch_tier=None, timer=None, remote_slots=None, beat_backend=None):
+    """
+    MusicAI가 직접 받을 수 있는 URL(analyzer.ingest.is_passthrough_url)의 음원을 분석합니다.
+    URL을 MusicAI inputUrl로 그대로 넘겨 업로드를 생략하고, 로컬 DSP용 음원은 원격 작업과 동시에 내려받습니다.
+    예전에 같은 URL을 받은 적이 있으면 그때의 음원 sha256으로 캐시를 먼저 확인하므로 다운로드도 생략됩니다.
+    처음 보는 URL이어도 내려받은 음원이 (업로드나 다른 URL로) 이미 분석된 것이면 원격 작업을 기다리지 않고 캐시 결과를 반환합니다.
+    """
+    pitch_tier = check_pitch_tier(pitch_tier)
+    beat_backend = check_beat_backend(beat_backend)
+    known_digest = cache.lookup_url(music_url)
+    if known_digest is not None:
+        cache_key = _cache_key(known_digest, lyrics, pitch_tier, beat_backend)
+        result = cache.get(cache_key)
+        if result is not None:
+            print(f"Analysis cache hit: {cache_key} ({music_url})")
+            cache.link(music_id, cache_key)
+            return result
+
+    downloads = []
+
+    def fetch_audio():
+        downloads.append(download_audio(music_url))
+        audio = downloads[-1]
+        cache_key = _cache_key(audio.sha256, lyrics, pitch_tier, beat_backend)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            raise _CachedAudio(cache_key, audio.sha256, cached)
+        return audio.path
+
+    try:
+        la = MusicAnalyzer(None, lyrics, progress=progress, beat_pool=beat_pool, pitch_tier=pitch_tier, timer=timer,
+                           remote_slots=remote_slots, beat_backend=beat_backend, input_url=music_url, fetch_audio=fetch_audio)
+        la.analyze()
+        audio_digest = downloads[0].sha256
+    except _CachedAudio as hit:
+        print(f"Analysis cache hit: {hit.cache_key} ({music_url}, already analyzed audio)")
+        cache.link_url(music_url, hit.audio_digest)
+        cache.link(music_id, hit.cache_key)
+        return hit.result
+    finally:
+        for audio in downloads:
+            audio.close()
+
+    cache_key = _cache_key(audio_digest, lyrics, pitch_tier, beat_backend)
+    result = _store_analysis(cache, cache_key, la, audio_digest, pitch_tier, beat_backend)
+    cache.link_url(music_url, audio_digest)
+    cache.link(music_id, cache_key)
+    return result
+
+
+def _cache_key(audio_digest, lyrics, pitch_tier, beat_backend):
+    return AnalysisCache.make_key(audio_digest, lyrics, ANALYZER_VERSION, pitch_tier=pitch_tier, beat_backend=beat_backend)
+
+
+def _store_analysis(cache: AnalysisCache, cache_key, la: MusicAnalyzer, audio_digest, pitch_tier, beat_backend):
+    result = la.get_final_format()
+    # 가사만 바뀌었을 때 realign_and_store가 원격 작업 없이 다시 정렬할 수 있도록 MusicAI 결과도 함께 저장
+    artifacts = {**la.get_artifacts(), "audio_sha256": audio_digest, "pitch_tier": pitch_tier, "beat_backend": beat_backend}
+    cache.put(cache_key, result, la.get_features(), artifacts)
+    return result
+
+
+def analyze_and_store(music_path, lyrics, music_id, db_manager, cache: AnalysisCache, progress=None, beat_pool=None, pitch_tier=None, timings=None, beat_backend=None):
+    """
+    음원 다운로드 → (캐시 확인) → MusicAnalyzer 분석 → musicVis 저장까지 수행하고
+    get_final_format() 결과를 반환합니다.
+    progress(stage): 진행 단계를 알려주는 콜백 (선택)
+    beat_pool: 모델을 미리 읽어 둔 BeatTrackerPool (선택)
+    pitch_tier: analyzer.pitch.PITCH_TIERS 중 하나, None이면 서버 기본값 (PITCH_TIER)
+    beat_backend: analyzer.beats.BEAT_BACKENDS 중 하나, None이면 서버 기본값 (BEAT_BACKEND)
+    timings(record): 단계별 wall/CPU 시간과 peak RSS 기록(StageTimer.summary())을 받는 콜백 (선택)
+    """
+    progress = progress or (lambda stage: None)
+    pitch_tier = check_pitch_tier(pitch_tier)
+    timer = StageTimer()
+
+    music_url = resolve_music_url(music_path)
+    if is_passthrough_url(music_url):
+        # MusicAI는 URL에서 직접 받고, 로컬 분석용 다운로드는 원격 작업과 동시에 진행됩니다.
+        result = analyze_url(music_url, lyrics, music_id, cache, progress=progress, beat_pool=beat_pool, pitch_tier=pitch_tier, timer=timer,
+                             beat_backend=beat_backend)
+    else:
+        progress("downloading")
+        # 요청마다 별도 임시 파일(작은 파일은 memfd)에 받고, with 블록이 끝나면 삭제됩니다.
+        with timer.stage("download"):
+            audio = download_audio(music_url)
+        with audio:
+            result = analyze_audio(audio, lyrics, music_id, cache, progress=progress, beat_pool=beat_pool, pitch_tier=pitch_tier, timer=timer,
+                                   beat_backend=beat_backend)
+
+    _store_music_vis(result, music_id, db_manager, progress, timer, timings)
+    return result
+
+
+def analyze_upload_and_store(audio, lyrics, music_id, db_manager, cache: AnalysisCache, progress=None, beat_pool=None, pitch_tier=None, timings=None, beat_backend=None):
+    """
+    클라이언트가 직접 올린 음원(analyzer.ingest.spool_upload로 받은 IngestedAudio)을 분석하고 musicVis에 저장합니다.
+    다운로드 단계가 없다는 점 외에는 analyze_and_store와 같으며, 끝나면(실패해도) audio를 닫아 임시 파일을 지웁니다.
+    """
+    progress = progress or (lambda stage: None)
+    timer = StageTimer()
+    with audio:
+        result = analyze_audio(audio, lyrics, music_id, cache, progress=progress, beat_pool=beat_pool, pitch_tier=pitch_tier, timer=timer,
+                               beat_backend=beat_backend)
+    _store_music_vis(result, music_id, db_manager, progress, timer, timings)
+    return result
+
+
+def _store_music_vis(result, music_id, db_manager, progress, timer: StageTimer, timings):
+    progress("storing")
+    with timer.stage("store"):
+        _ = db_manager.replace_music_vis(music_id, stored_vis_data(result))
+
+    # MusicAI 쪽(upload, remote_job, fetch)과 로컬 DSP(decode, beat, pitch) 중 어디서 시간이 걸렸는지 남깁니다.
+    timer.log(f"music {music_id}")
+    if timings is not None:
+        timings(timer.summary())
+
+    # 리스트인 Instruments, Emotions를 문자열로 합치고, BPM을 포함해 하나의 문자열로 만듭니다.
+    final_str = f"BPM: {result['BPM']}, Instruments: {', '.join(result['Instruments'])}, Emotions: {', '.join(result['Emotions'])}"
+    print(f"분석 요약: {final_str}")
+
+
+def realign_and_store(music_id, lyrics, db_manager, cache: AnalysisCache):
+    """
+    가사만 바뀐 music_id의 musicVis를 갱신합니다. 캐시된 MusicAI 전사/음정 결과와 비트/음정 특징을 재사용해
+    가사 정렬과 음정 매칭만 다시 수행하므로 음원 다운로드와 원격 작업이 필요 없습니다.
+    이 서버에서 분석한 적이 없거나 캐시에서 밀려났다면 AnalysisNotCachedError를 던집니다 (/analysis로 전체 분석 필요).
+    """
+    timer = StageTimer()
+    old_key = cache.lookup(music_id)
+    artifacts = cache.get_artifacts(old_key) if old_key else None
+    result = cache.get(old_key) if artifacts else None
+    if result is None:
+        raise AnalysisNotCachedError(f"No cached analysis for music {music_id}; run a full analysis first")
+    if lyrics and artifacts["vocal_pitch"] is None:
+        raise AnalysisNotCachedError(f"Music {music_id} was analyzed without lyrics; run a full analysis first")
+
+    la = MusicAnalyzer(None, lyrics, pitch_tier=artifacts["pitch_tier"], timer=timer)
+    result = la.realign(artifacts, result)
+
+    # 새 가사 기준 키로도 저장해 두면, 같은 음원/가사로 /analysis가 와도 캐시에서 바로 응답합니다.
+    cache_key = AnalysisCache.make_key(artifacts["audio_sha256"], lyrics, ANALYZER_VERSION,
+                                       pitch_tier=artifacts["pitch_tier"], beat_backend=artifacts["beat_backend"])
+    if cache_key != old_key:
+        cache.put(cache_key, result, cache.get_features(old_key), artifacts)
+    cache.link(music_id, cache_key)
+
+    with timer.stage("store"):
+        _ = db_manager.replace_music_vis(music_id, stored_vis_data(result))
+    timer.log(f"music {music_id} realign")
+    return result
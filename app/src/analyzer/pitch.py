@@ -0,0 +1,55 @@
+import os
+
+import librosa
+import numpy as np
+
+from utils.util import hz_to_midi_array
+
+# 정확도와 CPU 사용량을 맞바꾸는 pitch 추출 단계
+#   full:    HPSS로 하모닉 성분을 분리한 뒤 piptrack (기존 방식, 가장 느림)
+#   fast:    HPSS 생략, hop 2배, 탐색 범위를 보컬 음역(C2~C6)으로 제한
+#   preview: fast + 11.025 kHz로 낮춘 신호와 큰 hop으로 시각화용 대략적인 윤곽만 추출
+PITCH_TIERS = {
+    'full': {'sr': 22050, 'hpss': True, 'hop_length': 512, 'fmin': 150.0, 'fmax': 4000.0},
+    'fast': {'sr': 22050, 'hpss': False, 'hop_length': 1024, 'fmin': 65.0, 'fmax': 1050.0},
+    'preview': {'sr': 11025, 'hpss': False, 'hop_length': 1024, 'fmin': 65.0, 'fmax': 1050.0},
+}
+DEFAULT_PITCH_TIER = os.getenv('PITCH_TIER', 'full')
+
+
+def check_pitch_tier(tier):
+    tier = tier or DEFAULT_PITCH_TIER
+    if tier not in PITCH_TIERS:
+        raise ValueError(f"Unknown pitch tier '{tier}' (choose from {', '.join(PITCH_TIERS)})")
+    return tier
+
+
+def extract_pitch_track(audio, tier):
+    """audio: analyzer.audio.AudioBuffer. Returns columnar (times, midi) for the given tier."""
+    config = PITCH_TIERS[tier]
+    pitches, magnitudes = pitch_frames(audio.resampled(config['sr']), config)
+    return pitch_track_from_piptrack(pitches, magnitudes, config['sr'], hop_length=config['hop_length'])
+
+
+def pitch_frames(y, config):
+    """piptrack (pitches, magnitudes) of samples already at config['sr'], after HPSS if the tier uses it."""
+    if config['hpss']:
+        y, _ = librosa.effects.hpss(y)
+    return librosa.core.piptrack(
+        y=y, sr=config['sr'], hop_length=config['hop_length'], fmin=config['fmin'], fmax=config['fmax'])
+
+
+def pitch_track_from_piptrack(pitches, magnitudes, sr, hop_length=512):
+    """
+    Strongest pitch candidate of every STFT frame, as columnar (times, midi) arrays.
+    Frames without a pitch get midi 0.
+    """
+    frames = np.arange(pitches.shape[1])
+    best_bins = magnitudes.argmax(axis=0)
+    midi = hz_to_midi_array(pitches[best_bins, frames])
+    times = librosa.frames_to_time(frames, sr=sr, hop_length=hop_length)
+    return times, midi
+
+
+def pitch_records(times, midi):
+    return [{'time': t, 'pitch': p} for t, p in zip(times.tolist(), midi.tolist())]
@@ -0,0 +1,83 @@
+import numpy as np
+
+# MusicAnalyzer의 중간 데이터(원본 가사, 전사 단어, 보컬 음표, 정렬된 가사)를 담는 고정 슬롯 레코드.
+# 분석 중에는 속성으로만 다루고, JSON 형태(dict)로는 get_final_format / get_artifacts에서 한 번만 바꿉니다.
+
+
+class OriginalWord:
+    """A word of the user's lyrics and the line (phase) it belongs to."""
+
+    __slots__ = ('word', 'phase')
+
+    def __init__(self, word, phase):
+        self.word = word
+        self.phase = phase
+
+
+class TranscriptWord:
+    """A word MusicAI heard, with its time span in seconds."""
+
+    __slots__ = ('word', 'start', 'end')
+
+    def __init__(self, word, start, end):
+        self.word = word
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['word'], data['start'], data['end'])
+
+    def to_dict(self):
+        return {'word': self.word, 'start': self.start, 'end': self.end}
+
+
+class VocalNote:
+    """A note of MusicAI's vocal pitch track."""
+
+    __slots__ = ('note_name', 'midi_note', 'start', 'end')
+
+    def __init__(self, note_name, midi_note, start, end):
+        self.note_name = note_name
+        self.midi_note = midi_note
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['note_name'], data['midi_note'], data['start'], data['end'])
+
+    def to_dict(self):
+        return {'note_name': self.note_name, 'midi_note': self.midi_note, 'start': self.start, 'end': self.end}
+
+
+class AlignedWord:
+    """A word of the user's lyrics placed on MusicAI's timeline, with the vocal notes sung over it."""
+
+    __slots__ = ('word', 'start', 'end', 'phase', 'pitch')
+
+    def __init__(self, word, start, end, phase):
+        self.word = word
+        self.start = start
+        self.end = end
+        self.phase = phase
+        self.pitch = []  # VocalNote, shared with the analyzer's vocal pitch track
+
+    def to_dict(self):
+        return {
+            'word': self.word,
+            'start': self.start,
+            'end': self.end,
+            'phase': self.phase,
+            'pitch': [note.to_dict() for note in self.pitch],
+        }
+
+
+def to_dicts(records):
+    return [record.to_dict() for record in records]
+
+
+def beat_records(times, amplitudes):
+    """Beat_amplitude entries from parallel arrays of beat times and normalized amplitudes."""
+    return [{'time': t, 'amplitude': a} for t, a in zip(np.asarray(times, dtype=np.float64).tolist(),
+                                                           np.asarray(amplitudes, dtype=np.float64).tolist())]
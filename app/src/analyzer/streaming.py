@@ -0,0 +1,161 @@
+import os
+
+import librosa
+import numpy as np
+import soundfile as sf
+import soxr
+
+from analyzer.beats import ONSET_HOP, ONSET_SR, onset_envelope
+from analyzer.pitch import PITCH_TIERS, pitch_frames, pitch_track_from_piptrack
+
+# 이보다 긴 음원은 전체를 메모리에 올리지 않고 블록 단위로 분석합니다 (0이면 항상 스트리밍)
+STREAMING_MIN_SECONDS = float(os.getenv('ANALYSIS_STREAMING_SECONDS', 600))
+BLOCK_SECONDS = 30.0
+
+# 블록 양쪽에 붙여 계산한 뒤 버리는 문맥 길이.
+# pitch: HPSS 시간축 median(31 프레임) + STFT/iSTFT 창이 닿는 범위보다 넉넉하게
+PITCH_MARGIN_FRAMES = 32
+# beat: madmom 양방향 RNN이 보는 앞뒤 문맥 (100 fps 기준 10초)
+BEAT_FPS = 100
+BEAT_MARGIN_SECONDS = 10.0
+
+
+def should_stream(path, min_seconds=None):
+    """True when the file is long enough to stream and soundfile can read it block by block."""
+    min_seconds = STREAMING_MIN_SECONDS if min_seconds is None else min_seconds
+    try:
+        return sf.info(path).duration >= min_seconds
+    except (RuntimeError, sf.LibsndfileError):
+        return False  # 형식을 블록 단위로 읽을 수 없으면 기존처럼 통째로 디코딩
+
+
+class AudioStream:
+    """
+    AudioBuffer와 같은 mono float32 신호를 파일 전체를 읽지 않고 블록 단위로 내보냅니다.
+    리샘플링은 soxr 스트림으로 처리해 librosa.resample(soxr_hq)와 같은 샘플을 만듭니다.
+    """
+
+    def __init__(self, path, block_seconds=BLOCK_SECONDS):
+        self.path = path
+        info = sf.info(path)
+        self.sr = info.samplerate
+        self.frames = info.frames
+        self.block_seconds = block_seconds
+
+    @property
+    def duration(self):
+        return self.frames / self.sr
+
+    def blocks(self, sr=None):
+        """Mono float32 blocks at `sr` (native rate if None)."""
+        sr = sr or self.sr
+        resampler = soxr.ResampleStream(self.sr, sr, 1, dtype='float32', quality='soxr_hq') if sr != self.sr else None
+        # librosa.resample(fix=True)처럼 길이를 ceil(frames * ratio)에 맞춥니다.
+        expected = int(np.ceil(self.frames * sr / self.sr))
+        emitted = 0
+        with sf.SoundFile(self.path) as f:
+            block_frames = max(1, int(self.block_seconds * self.sr))
+            while True:
+                block = f.read(block_frames, dtype='float32', always_2d=True)
+                last = len(block) < block_frames
+                y = block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+                if resampler is not None:
+                    y = resampler.resample_chunk(y, last=last)
+                y = y[:max(0, expected - emitted)]
+                emitted += len(y)
+                if len(y):
+                    yield y
+                if last:
+                    break
+        if emitted < expected:
+            yield np.zeros(expected - emitted, dtype=np.float32)
+
+    def samples_at(self, positions):
+        """Mono samples at the given native-rate sample positions, read with one seek each."""
+        values = np.empty(len(positions), dtype=np.float32)
+        with sf.SoundFile(self.path) as f:
+            for i, position in enumerate(positions):
+                f.seek(int(position))
+                values[i] = f.read(1, dtype='float32', always_2d=True)[0].mean()
+        return values
+
+
+def windows(blocks, core, margin):
+    """
+    Cuts a block stream into overlapping analysis windows.
+    Yields (start, window, left, last): window covers samples [start - left, start + core + margin)
+    (clipped at both ends), so a frame-based analysis of the window is exact for the `core` samples
+    after `start`. Only about core + 2 * margin samples are held at once.
+    """
+    buf = np.empty(0, dtype=np.float32)
+    buf_start = 0  # sample index of buf[0]
+    start = 0
+    for block in blocks:
+        buf = np.concatenate([buf, block])
+        while buf_start + len(buf) >= start + core + margin:
+            left = min(margin, start)
+            yield start, buf[start - left - buf_start:start + core + margin - buf_start], left, False
+            start += core
+            drop = max(0, start - margin - buf_start)
+            buf = buf[drop:]
+            buf_start += drop
+
+    total = buf_start + len(buf)
+    while True:
+        left = min(margin, start)
+        last = start + core >= total
+        yield start, buf[start - left - buf_start:start + core + margin - buf_start], left, last
+        if last:
+            break
+        start += core
+
+
+def _keep_frames(left, last, hop, core, n_frames):
+    """Window-local frame indices that belong to the window's core (and the tail, for the last one)."""
+    first = left // hop
+    stop = n_frames if last else first + core // hop
+    return first, min(stop, n_frames)
+
+
+def stream_pitch_track(stream: AudioStream, tier):
+    """Same (times, midi) as pitch.extract_pitch_track, computed window by window."""
+    config = PITCH_TIERS[tier]
+    sr, hop = config['sr'], config['hop_length']
+    core = max(1, int(stream.block_seconds * sr) // hop) * hop
+    midi_parts = []
+    for _, y, left, last in windows(stream.blocks(sr), core, PITCH_MARGIN_FRAMES * hop):
+        pitches, magnitudes = pitch_frames(y, config)
+        _, midi = pitch_track_from_piptrack(pitches, magnitudes, sr, hop_length=hop)
+        first, stop = _keep_frames(left, last, hop, core, len(midi))
+        midi_parts.append(midi[first:stop])
+
+    midi = np.concatenate(midi_parts) if midi_parts else np.empty(0, dtype=np.int64)
+    times = librosa.frames_to_time(np.arange(len(midi)), sr=sr, hop_length=hop)
+    return times, midi
+
+
+def stream_beat_activations(stream: AudioStream, rnn, sr=44100):
+    """
+    madmom beat activations (BEAT_FPS) for the whole track, computed on overlapping windows.
+    rnn(samples) -> activations for mono samples at `sr` (a RNNBeatProcessor or BeatTrackerPool.activations).
+    """
+    hop = sr // BEAT_FPS
+    core = max(1, int(stream.block_seconds * BEAT_FPS)) * hop
+    margin = int(BEAT_MARGIN_SECONDS * BEAT_FPS) * hop
+    parts = []
+    for _, y, left, last in windows(stream.blocks(sr), core, margin):
+        act = np.asarray(rnn(y))
+        first, stop = _keep_frames(left, last, hop, core, len(act))
+        parts.append(act[first:stop])
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+
+
+def stream_onset_envelope(stream: AudioStream):
+    """beats.onset_envelope of the whole track, computed window by window (librosa/grid beat backends)."""
+    core = max(1, int(stream.block_seconds * ONSET_SR) // ONSET_HOP) * ONSET_HOP
+    parts = []
+    for _, y, left, last in windows(stream.blocks(ONSET_SR), core, PITCH_MARGIN_FRAMES * ONSET_HOP):
+        envelope = onset_envelope(y)
+        first, stop = _keep_frames(left, last, ONSET_HOP, core, len(envelope))
+        parts.append(envelope[first:stop])
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
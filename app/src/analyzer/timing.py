@@ -0,0 +1,66 @@
+import json
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _peak_rss_mb():
+    # ru_maxrss is the process high-water mark in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageTimer:
+    """
+    분석 단계별 wall time, CPU time, peak RSS를 기록합니다.
+
+        timer = StageTimer()
+        with timer.stage('pitch'):
+            ...
+        timer.summary()  # {'pitch': {'wall_seconds': .., 'cpu_seconds': .., 'peak_rss_mb': .., 'rss_growth_mb': ..}}
+
+    cpu_seconds는 해당 단계를 실행한 스레드의 CPU 시간이라 원격 작업 대기처럼 기다리기만 하는 단계는 0에 가깝습니다.
+    RSS는 프로세스 전체 값이므로 동시에 도는 단계(beat/pitch)끼리는 서로의 메모리가 섞여 보입니다.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        rss_before = _peak_rss_mb()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(
+                name,
+                wall_seconds=time.perf_counter() - wall,
+                cpu_seconds=time.thread_time() - cpu,
+                peak_rss_mb=_peak_rss_mb(),
+                rss_growth_mb=_peak_rss_mb() - rss_before,
+            )
+
+    def record(self, name, **values):
+        # 같은 단계를 여러 번 지나면 시간은 더하고 메모리는 최댓값을 남깁니다.
+        with self._lock:
+            entry = self._stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_rss_mb': 0.0, 'rss_growth_mb': 0.0})
+            entry['wall_seconds'] += values.get('wall_seconds', 0.0)
+            entry['cpu_seconds'] += values.get('cpu_seconds', 0.0)
+            entry['peak_rss_mb'] = max(entry['peak_rss_mb'], values.get('peak_rss_mb', 0.0))
+            entry['rss_growth_mb'] = max(entry['rss_growth_mb'], values.get('rss_growth_mb', 0.0))
+
+    def summary(self):
+        with self._lock:
+            stages = {name: {key: round(value, 4) for key, value in entry.items()} for name, entry in self._stages.items()}
+        return {
+            'stages': stages,
+            'total_seconds': round(time.perf_counter() - self._started, 4),
+            'peak_rss_mb': round(_peak_rss_mb(), 1),
+        }
+
+    def log(self, label='analysis'):
+        print(f'{label} timings: {json.dumps(self.summary())}')
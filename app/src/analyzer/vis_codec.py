@@ -0,0 +1,161 @@
+import base64
+
+import numpy as np
+
+VIS_FORMAT = 'compact'
+VIS_FORMAT_VERSION = 1
+
+
+def pack_array(values, dtype):
+    """values를 little-endian dtype 배열의 base64 문자열로 (압축 포맷의 열 하나)."""
+    return base64.b64encode(np.asarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode('ascii')
+
+
+def unpack_array(packed, dtype):
+    """pack_array의 역변환 (읽기 전용 numpy 배열)."""
+    return np.frombuffer(base64.b64decode(packed), dtype=np.dtype(dtype).newbyteorder('<'))
+
+
+def _unpack_floats(packed):
+    """float32 배열을 가장 짧은 10진 표현의 float 리스트로 (8.83 -> 8.829999923706055 방지)"""
+    return unpack_array(packed, 'f4').astype(str).astype(np.float64).tolist()
+
+
+def is_compact(vis_data):
+    return isinstance(vis_data, dict) and vis_data.get('format') == VIS_FORMAT
+
+
+def _encode_beats(beats):
+    return {
+        'count': len(beats),
+        'time': pack_array([b['time'] for b in beats], 'f4'),
+        'amplitude': pack_array([b['amplitude'] for b in beats], 'f4'),
+    }
+
+
+def _decode_beats(packed):
+    times = _unpack_floats(packed['time'])
+    amps = _unpack_floats(packed['amplitude'])
+    return [{'time': t, 'amplitude': a} for t, a in zip(times, amps)]
+
+
+def beat_columns(packed):
+    """압축된 Beat_amplitude의 (times, amplitudes) float64 배열"""
+    return unpack_array(packed['time'], 'f4').astype(np.float64), unpack_array(packed['amplitude'], 'f4').astype(np.float64)
+
+
+def _encode_lyrics(lyrics):
+    notes = [note for lyric in lyrics for note in lyric['pitch']]
+    note_names = sorted({note['note_name'] for note in notes})
+    name_index = {name: i for i, name in enumerate(note_names)}
+    return {
+        'count': len(lyrics),
+        'word': [lyric['word'] for lyric in lyrics],
+        'start': pack_array([lyric['start'] for lyric in lyrics], 'f4'),
+        'end': pack_array([lyric['end'] for lyric in lyrics], 'f4'),
+        'phase': pack_array([lyric['phase'] for lyric in lyrics], 'u2'),
+        'pitch_count': pack_array([len(lyric['pitch']) for lyric in lyrics], 'u2'),
+        'note_names': note_names,
+        'pitch_note': pack_array([name_index[note['note_name']] for note in notes], 'u1'),
+        'pitch_midi': pack_array([note['midi_note'] for note in notes], 'i1'),
+        'pitch_start': pack_array([note['start'] for note in notes], 'f4'),
+        'pitch_end': pack_array([note['end'] for note in notes], 'f4'),
+    }
+
+
+def decode_lyrics(packed):
+    note_names = packed['note_names']
+    notes = [
+        {'note_name': note_names[n], 'midi_note': m, 'start': s, 'end': e}
+        for n, m, s, e in zip(
+            unpack_array(packed['pitch_note'], 'u1').tolist(),
+            unpack_array(packed['pitch_midi'], 'i1').tolist(),
+            _unpack_floats(packed['pitch_start']),
+            _unpack_floats(packed['pitch_end']),
+        )
+    ]
+    offsets = [0] + np.cumsum(unpack_array(packed['pitch_count'], 'u2'), dtype=np.int64).tolist()
+    return [
+        {'word': w, 'start': s, 'end': e, 'phase': p, 'pitch': notes[offsets[i]:offsets[i + 1]]}
+        for i, (w, s, e, p) in enumerate(zip(
+            packed['word'],
+            _unpack_floats(packed['start']),
+            _unpack_floats(packed['end']),
+            unpack_array(packed['phase'], 'u2').tolist(),
+        ))
+    ]
+
+
+def _encode_pitch(frames):
+    times = np.array([f['time'] for f in frames], dtype=np.float64)
+    midi = np.array([f['pitch'] for f in frames], dtype=np.int64)
+
+    # run-length note segments: every change of midi value starts a new run
+    if len(midi) > 0:
+        starts = np.flatnonzero(np.diff(midi, prepend=midi[0] - 1))
+        lengths = np.diff(np.append(starts, len(midi)))
+        values = midi[starts]
+    else:
+        lengths = values = np.empty(0, dtype=np.int64)
+
+    packed = {
+        'count': len(frames),
+        'run_lengths': pack_array(lengths, 'u4'),
+        'run_values': pack_array(values, 'i1'),
+    }
+    # piptrack frames are evenly spaced, so two numbers describe every frame time
+    step = float(times[1] - times[0]) if len(times) > 1 else 0.0
+    if len(times) > 0 and np.allclose(times, times[0] + step * np.arange(len(times)), rtol=0, atol=1e-6):
+        packed['time_start'] = float(times[0])
+        packed['time_step'] = step
+    else:
+        packed['time'] = pack_array(times, 'f4')
+    return packed
+
+
+def pitch_columns(packed):
+    """압축된 Pitch의 프레임별 (times, midi) 배열 (음정이 없는 프레임은 midi 0)"""
+    midi = np.repeat(unpack_array(packed['run_values'], 'i1').astype(np.int64), unpack_array(packed['run_lengths'], 'u4'))
+    if 'time' in packed:
+        times = np.array(_unpack_floats(packed['time']))
+    else:
+        times = packed['time_start'] + packed['time_step'] * np.arange(packed['count'])
+    return times, midi
+
+
+def _decode_pitch(packed):
+    times, midi = pitch_columns(packed)
+    return [{'time': t, 'pitch': p} for t, p in zip(times.tolist(), midi.tolist())]
+
+
+def encode_vis_data(vis_data):
+    """
+    get_final_format() 결과를 컬럼형 압축 포맷으로 변환합니다.
+    BPM/Instruments/Emotions는 그대로 두고, Lyrics와 Beat_amplitude는 base64로 패킹한
+    컬럼 배열(float32, int8 등)로, 프레임 단위인 Pitch는 run-length 음 구간으로 바꿉니다.
+    """
+    if vis_data is None or is_compact(vis_data):
+        return vis_data
+
+    compact = {k: v for k, v in vis_data.items() if k not in ('Lyrics', 'Beat_amplitude', 'Pitch')}
+    compact['format'] = VIS_FORMAT
+    compact['version'] = VIS_FORMAT_VERSION
+    compact['Lyrics'] = _encode_lyrics(vis_data.get('Lyrics') or [])
+    compact['Beat_amplitude'] = _encode_beats(vis_data.get('Beat_amplitude') or [])
+    compact['Pitch'] = _encode_pitch(vis_data.get('Pitch') or [])
+    return compact
+
+
+def decode_vis_data(vis_data):
+    """압축 포맷을 기존 JSON 포맷으로 되돌립니다. 기존 포맷으로 저장된 데이터는 그대로 반환합니다."""
+    if not is_compact(vis_data):
+        return vis_data
+    if vis_data['version'] > VIS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported vis_data version: {vis_data['version']}")
+
+    # LOD: analyzer.vis_lod가 저장 시 덧붙이는 구간 조회용 피라미드 (기존 포맷에는 없음)
+    verbose = {k: v for k, v in vis_data.items() if k not in ('format', 'version', 'LOD')}
+    verbose['Lyrics'] = decode_lyrics(vis_data['Lyrics'])
+    verbose['Beat_amplitude'] = _decode_beats(vis_data['Beat_amplitude'])
+    verbose['Pitch'] = _decode_pitch(vis_data['Pitch'])
+    return verbose
@@ -0,0 +1,144 @@
+import numpy as np
+
+from analyzer.vis_codec import beat_columns, decode_lyrics, encode_vis_data, is_compact, pack_array, pitch_columns, unpack_array
+
+LOD_FACTOR = 4  # 한 단계 올라갈 때마다 묶는 구간 수
+LOD_MIN_BINS = 16  # 곡 전체가 이보다 적은 구간으로 줄어드는 단계는 만들지 않음
+DEFAULT_WINDOW_POINTS = 1000  # resolution을 주지 않았을 때 창 하나에 돌려줄 최소 점 수
+FALLBACK_STEP = 0.05  # 음정 프레임이 없을 때 level 0 간격 (초)
+
+
+def _bin_stats(times, values, step):
+    """(bins, min, max, mean) of values over the non-empty step-wide bins of sorted times."""
+    if len(times) == 0:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), empty, empty, empty
+    idx = np.floor(times / step).astype(np.int64)
+    starts = np.flatnonzero(np.diff(idx, prepend=-1))
+    counts = np.diff(np.append(starts, len(idx)))
+    values = np.asarray(values, dtype=np.float64)
+    return (idx[starts], np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts),
+            np.add.reduceat(values, starts) / counts)
+
+
+def _duration(compact, pitch_times, beat_times):
+    lyric_ends = unpack_array(compact['Lyrics']['end'], 'f4') if compact['Lyrics']['count'] else ()
+    return float(max([0.0, *pitch_times[-1:], *beat_times[-1:], *lyric_ends]))
+
+
+def build_lod(compact):
+    """
+    압축 포맷 vis_data의 Pitch/Beat_amplitude로 구간별 min/max/mean 피라미드를 만듭니다.
+    level 0은 원래 데이터(음정 프레임, 개별 비트)이고, level k는 음정 프레임 간격의 LOD_FACTOR**k배 구간입니다.
+    음정은 음정이 있는 프레임만 모아 모든 구간을 저장하고(음정이 없는 구간은 0),
+    비트는 비트가 있는 구간만 저장합니다. 비트 간격보다 촘촘한 단계는 원래 비트와 같으므로 비워 둡니다(None).
+    """
+    pitch_times, midi = pitch_columns(compact['Pitch'])
+    beat_times, amplitudes = beat_columns(compact['Beat_amplitude'])
+    base_step = float(np.median(np.diff(pitch_times))) if len(pitch_times) > 1 else FALLBACK_STEP
+    beat_spacing = float(np.median(np.diff(beat_times))) if len(beat_times) > 1 else 0.0
+    duration = _duration(compact, pitch_times, beat_times)
+    voiced = midi > 0
+
+    levels = []
+    step = base_step * LOD_FACTOR
+    while duration / step >= LOD_MIN_BINS:
+        n_bins = int(duration // step) + 1
+        bins, low, high, mean = _bin_stats(pitch_times[voiced], midi[voiced], step)
+        pitch = {}
+        for name, values, dtype in (('min', low, 'i1'), ('max', high, 'i1'), ('mean', mean, 'f2')):
+            dense = np.zeros(n_bins)
+            dense[bins] = values
+            pitch[name] = pack_array(dense, dtype)
+
+        beats = None
+        if step > beat_spacing:
+            bins, low, high, mean = _bin_stats(beat_times, amplitudes, step)
+            beats = {'bin': pack_array(bins, 'u4'),
+                     'min': pack_array(low, 'f2'), 'max': pack_array(high, 'f2'), 'mean': pack_array(mean, 'f2')}
+
+        levels.append({'step': step, 'bins': n_bins, 'pitch': pitch, 'beats': beats})
+        step *= LOD_FACTOR
+    return {'factor': LOD_FACTOR, 'base_step': base_step, 'levels': levels}
+
+
+def with_lod(vis_data):
+    """저장 직전에 압축 포맷 vis_data에 LOD 피라미드를 덧붙입니다. 그 외 포맷이나 이미 있는 경우는 그대로 반환합니다."""
+    if not is_compact(vis_data) or 'LOD' in vis_data:
+        return vis_data
+    return {**vis_data, 'LOD': build_lod(vis_data)}
+
+
+def _rounded(values, decimals):
+    return np.round(np.asarray(values, dtype=np.float64), decimals).tolist()
+
+
+def _pitch_window(compact, lod, level, start, end):
+    if level == 0:
+        times, midi = pitch_columns(compact['Pitch'])
+        keep = (times >= start) & (times < end)
+        return {'time': _rounded(times[keep], 4), 'pitch': midi[keep].tolist()}
+
+    packed = lod['levels'][level - 1]
+    step = packed['step']
+    first = max(0, int(np.floor(start / step)))
+    last = min(packed['bins'], int(np.ceil(end / step)))
+    first = min(first, last)
+    return {
+        'time': _rounded(np.arange(first, last) * step, 4),
+        'min': unpack_array(packed['pitch']['min'], 'i1')[first:last].tolist(),
+        'max': unpack_array(packed['pitch']['max'], 'i1')[first:last].tolist(),
+        'mean': _rounded(unpack_array(packed['pitch']['mean'], 'f2')[first:last], 2),
+    }
+
+
+def _beat_window(compact, lod, level, start, end):
+    packed = lod['levels'][level - 1] if level > 0 else None
+    if packed is None or packed['beats'] is None:
+        times, amplitudes = beat_columns(compact['Beat_amplitude'])
+        keep = (times >= start) & (times < end)
+        return {'time': _rounded(times[keep], 4), 'amplitude': _rounded(amplitudes[keep], 4)}
+
+    step = packed['step']
+    bins = unpack_array(packed['beats']['bin'], 'u4').astype(np.int64)
+    keep = (bins >= np.floor(start / step)) & (bins < np.ceil(end / step))
+    return {
+        'time': _rounded(bins[keep] * step, 4),
+        'min': _rounded(unpack_array(packed['beats']['min'], 'f2')[keep], 3),
+        'max': _rounded(unpack_array(packed['beats']['max'], 'f2')[keep], 3),
+        'mean': _rounded(unpack_array(packed['beats']['mean'], 'f2')[keep], 3),
+    }
+
+
+def query_window(vis_data, start, end, resolution=None):
+    """
+    [start, end) 구간(초)의 Pitch, Beat_amplitude, Lyrics를 resolution(초, 점 하나의 간격) 수준으로 반환합니다.
+    간격이 resolution 이하인(요청보다 거칠지 않은) 단계 중 가장 거친 단계를 고르고, 그런 단계가 없으면 level 0입니다.
+    level 0이면 원래 프레임/비트를 그대로, 그 위 단계면 구간 시작 시각과 min/max/mean 배열을 돌려줍니다.
+    Lyrics는 구간과 겹치는 단어들이며, level 0이 아니면 단어별 음표(pitch)는 빼고 보냅니다 (멜로디는 Pitch 피라미드로 충분).
+    LOD가 저장되지 않은 예전 vis_data는 요청 시 피라미드를 만듭니다.
+    """
+    if not 0 <= start < end:
+        raise ValueError(f"Invalid window [{start}, {end})")
+    resolution = resolution or (end - start) / DEFAULT_WINDOW_POINTS
+    if resolution <= 0:
+        raise ValueError(f"Invalid resolution {resolution}")
+
+    compact = encode_vis_data(vis_data)
+    lod = compact.get('LOD') or build_lod(compact)
+    # 단계 간격은 위로 갈수록 커지므로 step <= resolution인 단계 수가 곧 고를 단계 번호입니다.
+    level = sum(1 for packed in lod['levels'] if packed['step'] <= resolution)
+
+    lyrics = [lyric for lyric in decode_lyrics(compact['Lyrics']) if lyric['start'] < end and lyric['end'] > start]
+    if level > 0:
+        lyrics = [{k: v for k, v in lyric.items() if k != 'pitch'} for lyric in lyrics]
+    return {
+        'start': start,
+        'end': end,
+        'level': level,
+        'step': lod['levels'][level - 1]['step'] if level > 0 else lod['base_step'],
+        'BPM': compact.get('BPM'),
+        'Pitch': _pitch_window(compact, lod, level, start, end),
+        'Beat_amplitude': _beat_window(compact, lod, level, start, end),
+        'Lyrics': lyrics,
+    }
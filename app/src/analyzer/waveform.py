@@ -0,0 +1,78 @@
+import numpy as np
+
+from analyzer.vis_codec import pack_array, unpack_array
+
+WAVEFORM_STEP = 0.04  # level 0 간격 (초, 초당 25점)
+WAVEFORM_FACTOR = 4  # 한 단계 올라갈 때마다 묶는 점 수
+WAVEFORM_MIN_POINTS = 16  # 이보다 적은 점이 되는 단계는 만들지 않음
+
+
+class WaveformEnvelope:
+    """
+    mono 신호의 고정 구간별 peak(|x| 최댓값)와 RMS. 통째로 읽은 신호(AudioBuffer.y)든
+    블록 단위로 읽은 신호(AudioStream.blocks())든 add()로 순서대로 넣은 뒤 finish()로 여러 해상도의 포락선을 얻습니다.
+    """
+
+    def __init__(self, sr, step=WAVEFORM_STEP):
+        self.window = max(1, int(round(sr * step)))
+        self.step = self.window / sr
+        self._carry = np.empty(0, dtype=np.float32)  # 다음 블록과 이어 붙일, 구간을 채우지 못한 나머지
+        self._peaks = []
+        self._sums = []  # 구간별 제곱합
+
+    def add(self, y):
+        if len(self._carry):
+            y = np.concatenate([self._carry, y])
+        n = len(y) // self.window * self.window
+        frames = y[:n].reshape(-1, self.window)
+        # np.abs(frames)처럼 블록 크기의 사본을 만들지 않고 구간별 최댓값/최솟값으로 peak 계산
+        self._peaks.append(np.maximum(frames.max(axis=1, initial=0), -frames.min(axis=1, initial=0)))
+        self._sums.append(np.einsum('ij,ij->i', frames, frames, dtype=np.float64))
+        self._carry = y[n:].copy()
+
+    def finish(self):
+        """{'step', 'factor', 'levels': [{'count', 'peak', 'rms'}]}; level k는 step * factor**k초 간격, 값은 0~255로 양자화."""
+        peaks = self._peaks + [np.zeros(0, dtype=np.float32)]
+        sums = self._sums + [np.zeros(0)]
+        if len(self._carry):  # 마지막의 짧은 구간
+            peaks.append(np.abs(self._carry).max(keepdims=True))
+            sums.append(np.array([np.einsum('i,i->', self._carry, self._carry, dtype=np.float64)]))
+        peaks, sums = np.concatenate(peaks), np.concatenate(sums)
+        counts = np.full(len(sums), self.window, dtype=np.int64)
+        if len(self._carry):
+            counts[-1] = len(self._carry)
+
+        levels = []
+        while True:
+            levels.append({
+                'count': len(peaks),
+                'peak': pack_array(_quantize(peaks), 'u1'),
+                'rms': pack_array(_quantize(np.sqrt(sums / np.maximum(counts, 1))), 'u1'),
+            })
+            if len(peaks) < WAVEFORM_MIN_POINTS * WAVEFORM_FACTOR:
+                break
+            peaks, sums, counts = (_group(values, reduce) for values, reduce in
+                                   ((peaks, np.max), (sums, np.sum), (counts, np.sum)))
+        return {'step': self.step, 'factor': WAVEFORM_FACTOR, 'levels': levels}
+
+
+def _group(values, reduce):
+    """Reduce every WAVEFORM_FACTOR consecutive values (the last group may be shorter)."""
+    pad = -len(values) % WAVEFORM_FACTOR
+    padded = np.concatenate([values, np.zeros(pad, dtype=values.dtype)])
+    return reduce(padded.reshape(-1, WAVEFORM_FACTOR), axis=1)
+
+
+def _quantize(values):
+    return np.rint(np.clip(values, 0.0, 1.0) * 255)
+
+
+def waveform_levels(waveform):
+    """finish() 결과를 단계별 (times, peak, rms) float 배열로 되돌립니다 (0~1)."""
+    levels = []
+    for k, level in enumerate(waveform['levels']):
+        step = waveform['step'] * waveform['factor'] ** k
+        levels.append((np.arange(level['count']) * step,
+                       unpack_array(level['peak'], 'u1') / 255.0,
+                       unpack_array(level['rms'], 'u1') / 255.0))
+    return levels
@@ -5,10 +5,11 @@ from .lyrics_creation import extraction_source, making_lyrics
 from .music_creation import music_making, music_creation
 from .music_discussion import music_discussion
 from .termination import termination
+from analyzer.ingest import absolute_music_url
 from database.manager import DBManager, SEARCH_OPTION
 from .types import CombinedSlot, State, MusicMakingSlot, MusicDiscussionSlot
 import json
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 from langchain_core.memory import BaseMemory
 from flask import request
 
@@ -31,7 +32,9 @@ def execute_state(
     memory: BaseMemory,
     summary: str,
     db_manager: DBManager,
+    on_music_created: Optional[Callable[[str, str, str], None]] = None,
 ) -> Tuple[str, int, CombinedSlot]:
+    # on_music_created(music_id, url, lyrics): 새 곡이 저장된 직후 호출 (백그라운드 분석 시작용)
     flag = 0
 
     # state지정
@@ -157,7 +160,16 @@ def execute_state(
         # => 제일 마지막으로 저장된 lyrics을 무조건적으로 사용한다는 시나리오로 가야할 것 같습니다.
         lyrics_id = db_manager.search("lyrics", "session_id", sid, SEARCH_OPTION.LATEST.value).data[0]["lyrics_id"]
         url = response.split(":")[-1].strip()
-        _ = db_manager.insert_music(lyrics_id, style, url, "").data[0]["music_id"]
+        music_id = db_manager.insert_music(lyrics_id, style, url, "").data[0]["music_id"]
+
+        # 사용자가 시각화 화면을 열기 전에 끝나도록, 곡이 나오자마자 현재 가사로 분석을 시작합니다.
+        # (":"로 잘라서 url이 "//cdn..." 형태로 남으므로 분석에는 https를 붙여서 넘김)
+        analysis_url = absolute_music_url(url)
+        if on_music_created is not None and analysis_url.startswith("http"):
+            try:
+                on_music_created(music_id, analysis_url, slot.get("lyrics") or "")
+            except Exception as e:
+                print(f"Failed to start analysis for music {music_id}: {e}")
 
     # 다음 state로 넘어갈지 flag
     if none_fields == 0:
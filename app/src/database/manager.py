@@ -84,6 +84,25 @@ class DBManager:
     def insert_music_vis(self, music_id: str, vis_data: dict):
         return self._insert("musicVis", {"music_id": music_id, "vis_data": vis_data})
 
+    def replace_music_vis(self, music_id: str, vis_data: dict):
+        """
+        music_id의 musicVis를 새 vis_data로 바꿉니다 (재분석, 가사 재정렬).
+        조회 쪽은 musicVis 첫 행만 읽으므로 행을 추가하지 않고 기존 행을 지운 뒤 저장합니다.
+        """
+        self.supabase.table("musicVis").delete().eq("music_id", music_id).execute()
+        return self.insert_music_vis(music_id, vis_data)
+
+    def replace_music_vis_many(self, rows: list):
+        """
+        rows: [(music_id, vis_data), ...] 의 musicVis를 한꺼번에 바꿉니다 (배치 분석용).
+        replace_music_vis와 같이 해당 music_id들의 기존 행을 한 번에 지우고 새 행을 한 번에 저장합니다.
+        같은 music_id가 여러 번 있으면 마지막 것만 저장합니다.
+        """
+        latest = dict(rows)
+        self.supabase.table("musicVis").delete().in_("music_id", list(latest)).execute()
+        data = [{"music_id": music_id, "vis_data": vis_data} for music_id, vis_data in latest.items()]
+        return self.supabase.table("musicVis").insert(data).execute()
+
     def insert_summary(self, session_id: str, summary: str, latest_chat: str, latest_music: Optional[str], latest_state: str, latest_keywords: str):
         return self._insert(
             "summary",
@@ -135,7 +154,7 @@ class DBManager:
         """
         response = (
             self.supabase.table("summary")
-            .select("latest_music(url, musicVis(vis_data)), diary!inner(user_id)")
+            .select("latest_music(music_id, url, musicVis(vis_data)), diary!inner(user_id)")
             .eq("summary_id", summary_id)
             .eq("diary.user_id", user_id)
             .single()
@@ -143,6 +162,34 @@ class DBManager:
         )
         return response
 
+    def search_latest_music_by_session(self, session_id: str):
+        """
+        session의 모든 가사(lyrics)에 걸쳐 가장 최근에 만든 음악(music)을 가져옵니다.
+        /lyrics/save처럼 곡 없이 가사만 새로 저장된 뒤에도 그 세션의 곡을 찾을 수 있습니다.
+        """
+        response = (
+            self.supabase.table("music")
+            .select("music_id, lyrics!inner(session_id)")
+            .eq("lyrics.session_id", session_id)
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return response
+
+    def search_music_source(self, music_id: str):
+        """
+        music_id의 음원 url과 연결된 가사(lyrics)를 가져옵니다. (배치 분석 매니페스트에 music_id만 있을 때)
+        """
+        response = (
+            self.supabase.table("music")
+            .select("music_id, url, lyrics(lyrics)")
+            .eq("music_id", music_id)
+            .single()
+            .execute()
+        )
+        return response
+
     def search(self, table: str, reference: str, ref_id: str, search_option: str, **kwargs: dict):
         """
         kwargs:
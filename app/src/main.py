@@ -2,17 +2,27 @@ import dotenv
 import json
 import traceback
 import os
-import requests
 import datetime
 import logging
+import tempfile
+from functools import partial
 
 from langchain.memory import ConversationSummaryMemory  # ConversationSummaryMemory(llm=llm, memory_key="history")
 from langchain_openai import ChatOpenAI
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 
 from llm_instance import llm
-from analyzer.music import MusicAnalyzer
+from analyzer.beat_pool import BeatTrackerPool
+from analyzer.cache import AnalysisCache
+from analyzer.ingest import AudioTooLargeError, UnsupportedAudioError, spool_upload
+from analyzer.jobs import SUCCEEDED, AnalysisJobManager
+from analyzer.musicai import get_job_tracker
+from analyzer.pipeline import AnalysisNotCachedError, analyze_and_store, analyze_upload_and_store, realign_and_store
+from analyzer.beats import check_beat_backend
+from analyzer.pitch import check_pitch_tier
+from analyzer.vis_codec import VIS_FORMAT, encode_vis_data, decode_vis_data
+from analyzer.vis_lod import query_window
 from chatbot.execute_state import execute_state, State, STATE_NEXT
 from database.verification import verify_jwt
 from database.manager import DBManager, SEARCH_OPTION
@@ -23,6 +33,16 @@ dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
 dotenv.load_dotenv(dotenv_path=dotenv_path)
 
 db_manager = DBManager()
+analysis_cache = AnalysisCache(
+    os.getenv("ANALYSIS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "music-diary-analysis-cache")),
+    int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", 1024**3)),
+)
+analysis_jobs = AnalysisJobManager(max_workers=int(os.getenv("ANALYSIS_WORKERS", 2)))
+# Mureka가 곡을 돌려주면 사용자가 /analysis를 부르기 전에 미리 분석을 시작 (0이면 끔)
+analysis_autostart = os.getenv("ANALYSIS_AUTOSTART", "1") == "1"
+# madmom 모델을 미리 읽어 둔 비트 추적 프로세스 풀 (0이면 요청마다 모델을 읽음)
+beat_pool_processes = int(os.getenv("BEAT_POOL_PROCESSES", 2))
+beat_pool = BeatTrackerPool(beat_pool_processes) if beat_pool_processes > 0 else None
 
 app = Flask(__name__)
 CORS(
@@ -66,74 +86,261 @@ def analyze_music():
     #     return jsonify(error_message), 500
 
     try:
-        post_data = request.get_json()
-        user_id = request.jwt_user["id"]
-        if post_data is None:
-            raise ValueError("No JSON data provided")
+        params = parse_analysis_request()
+        # 곡 생성 직후 시작된 같은 분석이 있으면 새로 분석하지 않고 그 작업에 합류합니다 (이미 끝났으면 바로 반환).
+        job = analysis_jobs.find(analysis_job_key(params))
+        if job is not None and job.wait() and job.status == SUCCEEDED:
+            result = job.result
+        else:
+            result = analyze_and_store(**params, db_manager=db_manager, cache=analysis_cache, beat_pool=beat_pool)
+
+        # ?format=compact 를 요청한 클라이언트에는 압축 포맷을, 그 외에는 기존 JSON 포맷을 반환
+        return jsonify(format_vis_data(result)), 200
+    except ValueError as ve:
+        error_message = {"error": str(ve), "traceback": traceback.format_exc()}
+        print(json.dumps(error_message, indent=4))  # 로그에 상세 오류 정보 출력
+        return jsonify(error_message), 400
+    except Exception as e:
+        error_message = {"error": str(e), "traceback": traceback.format_exc()}
+        print(json.dumps(error_message, indent=4))  # 로그에 상세 오류 정보 출력
+        return jsonify(error_message), 400
 
-        print("Received data:", post_data)  # 요청 데이터 출력
 
-        music_path = post_data.get("url")
-        lyrics = post_data.get("lyrics")
-        if not music_path:
-            raise ValueError("Missing 'url' field")
-        if not lyrics:
+def parse_analysis_request():
+    """/analysis 요청에서 analyze_and_store 인자(음원 url, 가사, 결과를 저장할 music_id, pitch_tier, beat_backend)를 꺼냅니다."""
+    post_data = request.get_json()
+    user_id = request.jwt_user["id"]
+    if post_data is None:
+        raise ValueError("No JSON data provided")
+
+    print("Received data:", post_data)  # 요청 데이터 출력
+
+    music_path = post_data.get("url")
+    lyrics = post_data.get("lyrics")
+    if not music_path:
+        raise ValueError("Missing 'url' field")
+    if not lyrics:
+        raise ValueError("Missing 'lyrics' field")
+    # 부하가 클 때 정확도 대신 CPU를 아끼도록 full / fast / preview 중 선택 (없으면 서버 기본값)
+    pitch_tier = check_pitch_tier(post_data.get("pitch_tier"))
+    # 기본은 빠른 librosa 비트 추출 (서버 기본값 BEAT_BACKEND), 정확도가 중요한 요청은 madmom RNN, 미리보기는 grid를 선택할 수 있음
+    beat_backend = check_beat_backend(post_data.get("beat_backend"))
+
+    print(f"Music path: {music_path}, Lyrics: {lyrics}")
+
+    music_id = find_session_music_id(user_id)
+    return {"music_path": music_path, "lyrics": lyrics, "music_id": music_id, "pitch_tier": pitch_tier, "beat_backend": beat_backend}
+
+
+def analysis_job_key(params):
+    # 같은 곡 + 같은 가사 + 같은 분석 설정이면 같은 작업 (url은 같은 곡이어도 표기가 다를 수 있어 제외)
+    return (params["music_id"], params["lyrics"], params["pitch_tier"], params["beat_backend"])
+
+
+def submit_analysis(user_id, params):
+    return analysis_jobs.submit(
+        partial(analyze_and_store, **params, db_manager=db_manager, cache=analysis_cache, beat_pool=beat_pool),
+        user_id=user_id,
+        music_id=params["music_id"],
+        key=analysis_job_key(params),
+    )
+
+
+def start_music_analysis(user_id, music_id, url, lyrics):
+    """execute_state가 새 곡을 저장한 직후 호출: 서버 기본 설정으로 백그라운드 분석을 등록합니다."""
+    params = {"music_path": url, "lyrics": lyrics, "music_id": music_id, "pitch_tier": check_pitch_tier(None), "beat_backend": check_beat_backend(None)}
+    job = submit_analysis(user_id, params)
+    print(f"Analysis job {job.job_id} started for new music {music_id}")
+
+
+def find_session_music_id(user_id):
+    # 쿼리 파라미터의 sid(diary) → 세션에서 가장 최근에 만든 music의 music_id
+    # (최신 lyrics에는 곡이 없을 수 있음: /lyrics/save는 곡 없이 가사 행만 새로 추가)
+    front_sid = request.args.get("sid")
+    sid = db_manager.search("diary", "user_id", user_id, SEARCH_OPTION.ID.value, id=front_sid).data[0]["session_id"]
+    music = db_manager.search_latest_music_by_session(sid).data
+    if not music:
+        raise ValueError("No music has been created for this session yet")
+    return music[0]["music_id"]
+
+
+@app.route("/analysis/realign", methods=["POST"])
+@verify_jwt
+def realign_music():
+    # /lyrics/change, /lyrics/save 이후 가사만 바뀐 경우: 캐시된 MusicAI 결과로 가사 정렬만 다시 수행
+    try:
+        post_data = request.get_json()
+        if post_data is None or post_data.get("lyrics") is None:
             raise ValueError("Missing 'lyrics' field")
+        music_id = find_session_music_id(request.jwt_user["id"])
+        result = realign_and_store(music_id, post_data["lyrics"], db_manager=db_manager, cache=analysis_cache)
+        return jsonify(format_vis_data(result)), 200
+    except AnalysisNotCachedError as e:
+        # 이 서버에 캐시된 분석이 없으면 클라이언트가 /analysis로 전체 분석을 요청해야 합니다.
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        error_message = {"error": str(e), "traceback": traceback.format_exc()}
+        print(json.dumps(error_message, indent=4))
+        return jsonify(error_message), 400
 
-        print(f"Music path: {music_path}, Lyrics: {lyrics}")
-
-        # Google Drive 링크 처리
-        if "drive.google.com" in music_path:
-            if "/file/d/" in music_path:
-                file_id = music_path.split("/d/")[1].split("/")[0]
-            elif "id=" in music_path:
-                file_id = music_path.split("id=")[1].split("&")[0]
-            else:
-                raise ValueError("Invalid Google Drive URL")
-            music_path = f"https://drive.google.com/uc?id={file_id}&export=download"
-            print(f"Converted Google Drive link to direct download URL: {music_path}")
-
-        # 파일 다운로드
-        response = requests.get(music_path, stream=True)
-        if response.status_code != 200:
-            raise ValueError("Failed to download the music file")
-
-        # 파일을 로컬에 임시 저장
-        with open("temp_music_file.wav", "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                f.write(chunk)
-
-        la = MusicAnalyzer("temp_music_file.wav", lyrics)
-        la.analyze()
-        result = la.get_final_format()
-
-        bpm = result["BPM"]
-        instruments = result["Instruments"]  # 예: ["piano","drum"]
-        emotions = result["Emotions"]  # 예: ["happy","excited"]
 
-        # 쿼리 파라미터에서 sid 추출 및 출력
-        front_sid = request.args.get("sid")
-        sid = db_manager.search("diary", "user_id", user_id, SEARCH_OPTION.ID.value, id=front_sid).data[0]["session_id"]
-        lyrics_id = db_manager.search("lyrics", "session_id", sid, SEARCH_OPTION.LATEST.value).data[0]["lyrics_id"]
-        music_id = db_manager.search("music", "lyrics_id", lyrics_id, SEARCH_OPTION.LATEST.value).data[0]["music_id"]
-        _ = db_manager.insert_music_vis(music_id, result)
-
-        # 리스트인 Instruments, Emotions를 문자열로 합치고, BPM을 포함해 하나의 문자열로 만듭니다.
-        final_str = f"BPM: {bpm}, Instruments: {', '.join(instruments)}, Emotions: {', '.join(emotions)}"
-        print(f"분석 요약: {final_str}")
-        # 임시 파일 삭제
-        if os.path.exists("temp_music_file.wav"):
-            os.remove("temp_music_file.wav")
-
-        return jsonify(result), 200
+def format_vis_data(vis_data):
+    if request.args.get("format") == VIS_FORMAT:
+        return encode_vis_data(vis_data)
+    return decode_vis_data(vis_data)
+
+
+@app.route("/analysis/jobs", methods=["POST"])
+@verify_jwt
+def submit_analysis_job():
+    """분석 작업을 백그라운드에 등록하고 job_id를 바로 반환합니다."""
+    try:
+        params = parse_analysis_request()
+        # 같은 분석이 이미 돌고 있으면(곡 생성 직후 자동 시작 등) 그 작업을 돌려줍니다.
+        job = submit_analysis(request.jwt_user["id"], params)
+        return jsonify(job.to_dict()), 202
     except ValueError as ve:
-        error_message = {"error": str(ve), "traceback": traceback.format_exc()}
-        print(json.dumps(error_message, indent=4))  # 로그에 상세 오류 정보 출력
+        error_message = {"error": str(ve)}
+        print(f"ValueError: {str(ve)}")
         return jsonify(error_message), 400
     except Exception as e:
         error_message = {"error": str(e), "traceback": traceback.format_exc()}
-        print(json.dumps(error_message, indent=4))  # 로그에 상세 오류 정보 출력
+        print(f"Error in /analysis/jobs: {json.dumps(error_message, indent=4)}")
+        return jsonify(error_message), 500
+
+
+@app.route("/analysis/upload", methods=["POST"])
+@verify_jwt
+def analyze_uploaded_music():
+    """
+    음원 파일을 직접 올려 분석합니다. url을 다시 내려받는 과정(Google Drive 리다이렉트 포함)이 없습니다.
+    - multipart/form-data: audio 파일 파트 + lyrics, pitch_tier, beat_backend 텍스트 필드
+    - 그 외: 본문 전체가 음원 (Content-Type: audio/*), lyrics 등은 쿼리 파라미터
+    본문은 메모리에 모으지 않고 큰 청크 단위로 임시 파일에 씁니다. ?async=1이면 /analysis/jobs처럼 작업을 등록하고 202를 반환합니다.
+    """
+    audio = None
+    try:
+        params, audio = parse_upload_request()
+        if request.args.get("async") == "1":
+            # 임시 파일은 작업이 끝날 때 analyze_upload_and_store가 닫습니다.
+            job = analysis_jobs.submit(
+                partial(analyze_upload_and_store, audio, **params, db_manager=db_manager, cache=analysis_cache, beat_pool=beat_pool),
+                user_id=request.jwt_user["id"],
+                music_id=params["music_id"],
+            )
+            audio = None
+            return jsonify(job.to_dict()), 202
+
+        result = analyze_upload_and_store(audio, **params, db_manager=db_manager, cache=analysis_cache, beat_pool=beat_pool)
+        return jsonify(format_vis_data(result)), 200
+    except AudioTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
+    except UnsupportedAudioError as e:
+        return jsonify({"error": str(e)}), 415
+    except Exception as e:
+        error_message = {"error": str(e), "traceback": traceback.format_exc()}
+        print(json.dumps(error_message, indent=4))
         return jsonify(error_message), 400
+    finally:
+        if audio is not None:
+            audio.close()
+
+
+def parse_upload_request():
+    """/analysis/upload 본문을 임시 파일로 받고 (analyze_upload_and_store 인자, IngestedAudio)를 반환합니다."""
+    # 세션이 잘못된 요청은 본문을 받기 전에 거절합니다.
+    music_id = find_session_music_id(request.jwt_user["id"])
+    audio, fields = spool_upload(request.stream, request.headers.get("Content-Type"), content_length=request.content_length)
+    try:
+        fields = {**request.args.to_dict(), **fields}
+        lyrics = fields.get("lyrics")
+        if not lyrics:
+            raise ValueError("Missing 'lyrics' field")
+        params = {"lyrics": lyrics, "music_id": music_id, "pitch_tier": check_pitch_tier(fields.get("pitch_tier")),
+                  "beat_backend": check_beat_backend(fields.get("beat_backend"))}
+    except BaseException:
+        audio.close()
+        raise
+    print(f"Uploaded music: {audio.size} bytes (sha256 {audio.sha256}), Lyrics: {lyrics}")
+    return params, audio
+
+
+def get_user_job(job_id):
+    job = analysis_jobs.get(job_id)
+    if job is None or job.user_id != request.jwt_user["id"]:
+        return None
+    return job
+
+
+def job_response(job):
+    data = job.to_dict()
+    if "result" in data:
+        data["result"] = format_vis_data(data["result"])
+    return data
+
+
+@app.route("/analysis/jobs/<job_id>", methods=["GET"])
+@verify_jwt
+def get_analysis_job(job_id):
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "해당 분석 작업을 찾을 수 없습니다."}), 404
+    return jsonify(job_response(job)), 200
+
+
+@app.route("/analysis/jobs/<job_id>/events", methods=["GET"])
+@verify_jwt
+def stream_analysis_job(job_id):
+    """server-sent events로 진행 단계를 보내고, 끝나면 최종 결과를 보낸 뒤 스트림을 닫습니다."""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "해당 분석 작업을 찾을 수 없습니다."}), 404
+
+    def events():
+        version = None
+        while True:
+            current = job.wait_for_change(version, timeout=15)
+            if current == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            if job.done:
+                yield f"event: {job.status}\ndata: {json.dumps(job_response(job), ensure_ascii=False)}\n\n"
+                return
+            yield f"event: progress\ndata: {json.dumps(job.to_dict(include_result=False), ensure_ascii=False)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/analysis/cache", methods=["GET"])
+@verify_jwt
+def analysis_cache_stats():
+    try:
+        return jsonify(analysis_cache.stats()), 200
+    except Exception as e:
+        # 서버 내부 정보이므로 traceback은 로그에만 남깁니다.
+        print(f"Error in /analysis/cache: {json.dumps({'error': str(e), 'traceback': traceback.format_exc()}, indent=4)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/analysis/beat_pool", methods=["GET"])
+@verify_jwt
+def beat_pool_stats():
+    if beat_pool is None:
+        return jsonify({"processes": 0}), 200
+    return jsonify(beat_pool.stats()), 200
+
+
+@app.route("/analysis/musicai", methods=["GET"])
+@verify_jwt
+def musicai_tracker_stats():
+    # 공용 폴러가 기다리고 있는 MusicAI 작업 수와 누적 폴링 횟수
+    try:
+        return jsonify(get_job_tracker().stats()), 200
+    except Exception as e:
+        # 서버 내부 정보이므로 traceback은 로그에만 남깁니다.
+        print(f"Error in /analysis/musicai: {json.dumps({'error': str(e), 'traceback': traceback.format_exc()}, indent=4)}")
+        return jsonify({"error": str(e)}), 500
 
 
 @app.route("/generate_response", methods=["POST"])
@@ -221,6 +428,7 @@ def generate_response():
             memory=memory,
             summary=chat_summary,
             db_manager=db_manager,
+            on_music_created=partial(start_music_analysis, user_id) if analysis_autostart else None,
         )
 
         # turn 증가
@@ -368,9 +576,14 @@ def get_music_details_for_summary(summary_id):
 
         latest_music = music_details_res.data["latest_music"]
         music_vis_list = latest_music.get("musicVis", [])
-        vis_data = music_vis_list[0].get("vis_data") if music_vis_list else None
+        vis_data = format_vis_data(music_vis_list[0].get("vis_data") if music_vis_list else None)
 
         response_data = {"url": latest_music.get("url"), "vis_data": vis_data}
+        if vis_data is None:
+            # 아직 분석 중이면 클라이언트가 /analysis/jobs/<job_id>/events로 합류할 수 있도록 작업 정보를 함께 보냅니다.
+            job = analysis_jobs.find_music(latest_music.get("music_id"))
+            if job is not None and job.user_id == user_id:
+                response_data["analysis_job"] = job.to_dict(include_result=False)
 
         return jsonify(response_data), 200
 
@@ -380,6 +593,39 @@ def get_music_details_for_summary(summary_id):
         return jsonify(error_message), 500
 
 
+@app.route("/library/summary/<summary_id>/music/window", methods=["GET"])
+@verify_jwt
+def get_music_window_for_summary(summary_id):
+    """
+    화면에 보이는 구간만: ?start=초&end=초&resolution=초(점 하나의 간격, 생략하면 구간의 1/1000)
+    저장 시 만들어 둔 min/max/mean 피라미드에서 해상도에 맞는 단계를 골라 Pitch, Beat_amplitude, Lyrics를 반환합니다.
+    """
+    try:
+        user_id = request.jwt_user["id"]
+        start = request.args.get("start", type=float)
+        end = request.args.get("end", type=float)
+        resolution = request.args.get("resolution", type=float)
+        if start is None or end is None:
+            raise ValueError("Missing 'start' or 'end' query parameter")
+
+        music_details_res = db_manager.search_music_details_by_summary(summary_id, user_id)
+        latest_music = music_details_res.data.get("latest_music") if music_details_res.data else None
+        music_vis_list = (latest_music or {}).get("musicVis") or []
+        if not music_vis_list or music_vis_list[0].get("vis_data") is None:
+            return jsonify({"message": "해당 요약에 연결된 시각화 데이터가 없습니다."}), 404
+
+        return jsonify(query_window(music_vis_list[0]["vis_data"], start, end, resolution)), 200
+
+    except ValueError as ve:
+        error_message = {"error": str(ve)}
+        print(f"ValueError: {str(ve)}")
+        return jsonify(error_message), 400
+    except Exception as e:
+        error_message = {"error": str(e), "traceback": traceback.format_exc()}
+        print(f"Error in /library/summary/{summary_id}/music/window: {json.dumps(error_message, indent=4)}")
+        return jsonify(error_message), 500
+
+
 @app.route("/library/musics", methods=["GET"])
 @verify_jwt
 def get_musics():
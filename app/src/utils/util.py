@@ -1,10 +1,33 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
 
+def get_http_session():
+    """Process-wide keep-alive session, so repeated downloads reuse pooled connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET', 'HEAD'))
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+    return _http_session
 
-def fetch_json(url):
+
+def fetch_json(url, session=None, timeout=None):
     try:
-        response = requests.get(url)
+        response = (session or requests).get(url, timeout=timeout)
         response.raise_for_status()
         data = response.json()
         return data
@@ -20,6 +43,30 @@ def fetch_json(url):
         print(f'JSON decode error: {json_err}')
 
 
+def fetch_json_many(urls, timeout=(10, 60)):
+    """
+    {name: url}을 공유 keep-alive 세션으로 동시에 받아 ({name: data}, {name: 걸린 시간(초)})를 반환합니다.
+    실패한 항목의 data는 fetch_json과 같이 None입니다.
+    """
+    session = get_http_session()
+
+    def timed_fetch(url):
+        start = time.perf_counter()
+        data = fetch_json(url, session=session, timeout=timeout)
+        return data, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, len(urls))) as pool:
+        futures = {name: pool.submit(timed_fetch, url) for name, url in urls.items()}
+        fetched = {name: future.result() for name, future in futures.items()}
+
+    results = {name: data for name, (data, _) in fetched.items()}
+    timings = {name: seconds for name, (_, seconds) in fetched.items()}
+    if timings:
+        slowest = max(timings, key=timings.get)
+        print(f'Fetched {len(timings)} artifacts, slowest: {slowest} ({timings[slowest]:.2f}s)')
+    return results, timings
+
+
 def check_include(start1, end1, start2, end2):
     return start1 <= start2 <= end1 or start1 <= end2 <= end1 or (start1 >= start2 and end1 <= end2)
 
@@ -31,4 +78,13 @@ def normalize(data):
 
 
 def hz_to_midi(hz):
-    return round(69 + 12 * np.log2(hz/440.))
\ No newline at end of file
+    return round(69 + 12 * np.log2(hz/440.))
+
+
+def hz_to_midi_array(hz):
+    """Vectorized hz_to_midi; unvoiced (hz <= 0) frames map to 0."""
+    hz = np.asarray(hz)
+    midi = np.zeros(hz.shape, dtype=np.int64)
+    voiced = hz > 0
+    midi[voiced] = np.round(69 + 12 * np.log2(hz[voiced] / 440.))
+    return midi
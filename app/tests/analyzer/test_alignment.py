@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.alignment import GAP, align_indices, interval_join, needleman_wunsch, needleman_wunsch_naive
+from utils.util import check_include
+
+VOCAB = ["몽구리", "귀여워", "히히", "웃으며", "뛰어놀지", "해맑은", "얼굴", "세상", "모두가", "축제의"]
+
+
+def make_words(rng: random.Random, n: int):
+    return [{"word": rng.choice(VOCAB), "idx": i} for i in range(n)]
+
+
+def perturb(rng: random.Random, words):
+    """MusicAI 전사 결과처럼 단어 일부를 빠뜨리거나, 바꾸거나, 끼워 넣습니다."""
+    out = []
+    for w in words:
+        r = rng.random()
+        if r < 0.1:
+            continue
+        if r < 0.2:
+            out.append({"word": rng.choice(VOCAB) + "?", "start": 0.0, "end": 0.0})
+        else:
+            out.append({"word": w["word"], "start": 0.0, "end": 0.0})
+        if rng.random() < 0.05:
+            out.append({"word": rng.choice(VOCAB), "start": 0.0, "end": 0.0})
+    return out
+
+
+class TestNeedlemanWunsch:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_same_alignment_as_naive(self, seed):
+        rng = random.Random(seed)
+        org = make_words(rng, rng.randint(0, 40))
+        pred = perturb(rng, org)
+
+        assert needleman_wunsch(org, pred) == needleman_wunsch_naive(org, pred)
+
+    @pytest.mark.parametrize("n, m", [(0, 0), (0, 3), (3, 0)])
+    def test_empty_sequences(self, n, m):
+        org = [{"word": "a"}] * n
+        pred = [{"word": "a"}] * m
+
+        assert needleman_wunsch(org, pred) == needleman_wunsch_naive(org, pred)
+
+    def test_align_indices_marks_gaps(self):
+        idx1, idx2 = align_indices(["a", "b", "c"], ["a", "c"])
+
+        assert idx1 == [0, 1, 2]
+        assert idx2 == [0, GAP, 1]
+
+
+def all_pairs_join(spans, events):
+    return [[e for e, (ps, pe) in enumerate(events) if check_include(ls, le, ps, pe)] for ls, le in spans]
+
+
+def make_intervals(rng: random.Random, n: int, length: float, malformed: float = 0.0):
+    intervals = []
+    for _ in range(n):
+        start = round(rng.uniform(0, 60), 2)
+        end = round(start + rng.uniform(0, length), 2)
+        if rng.random() < malformed:
+            start, end = end + 0.5, start
+        intervals.append((start, end))
+    return intervals
+
+
+class TestIntervalJoin:
+    @pytest.mark.parametrize("seed", range(10))
+    def test_same_as_all_pairs(self, seed):
+        rng = random.Random(seed)
+        spans = make_intervals(rng, 80, 2.0, malformed=0.05)
+        events = make_intervals(rng, 400, 0.5, malformed=0.05)
+
+        assert interval_join(spans, events) == all_pairs_join(spans, events)
+
+    def test_touching_and_enclosing_intervals(self):
+        spans = [(1.0, 2.0), (2.0, 3.0), (5.0, 6.0)]
+        events = [(0.0, 1.0), (1.5, 2.0), (4.0, 7.0), (3.5, 4.5)]
+
+        assert interval_join(spans, events) == [[0, 1], [1], [2]]
+
+    def test_empty_inputs(self):
+        assert interval_join([], [(0.0, 1.0)]) == []
+        assert interval_join([(0.0, 1.0)], []) == [[]]
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.audio import AudioBuffer
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    sr = 44100
+    t = np.arange(sr * 2) / sr
+    path = tmp_path / "tone.wav"
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 440 * t), sr)
+    return str(path)
+
+
+class TestAudioBuffer:
+    def test_decodes_once_as_float32(self, wav_path):
+        buffer = AudioBuffer(wav_path)
+
+        assert buffer.sr == 44100
+        assert buffer.y.dtype == np.float32
+        assert buffer.duration == pytest.approx(2.0)
+
+    def test_resampled_view_is_cached(self, wav_path):
+        buffer = AudioBuffer(wav_path)
+
+        y = buffer.resampled(22050)
+
+        assert len(y) == 44100
+        assert buffer.resampled(22050) is y
+        assert buffer.resampled(buffer.sr) is buffer.y
@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.batch import DONE, FAILED, BatchRunner, append_checkpoint, load_checkpoint, load_manifest
+
+
+class FakeDBManager:
+    def __init__(self):
+        self.batches = []
+
+    def replace_music_vis_many(self, rows):
+        self.batches.append(rows)
+
+    def search_music_source(self, music_id):
+        return SimpleNamespace(data={"music_id": music_id, "url": f"//cdn.mureka.ai/{music_id}/song.mp3", "lyrics": {"lyrics": "몽구리 귀여워"}})
+
+
+class TestManifest:
+    def test_music_id_only_entries_are_filled_from_db(self, tmp_path):
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(
+            json.dumps({"music_id": "a", "url": "a.wav", "lyrics": ""}) + "\n\n" + json.dumps({"music_id": "b"}) + "\n",
+            encoding="utf-8",
+        )
+
+        entries = load_manifest(str(manifest), FakeDBManager())
+
+        assert entries[0] == {"music_id": "a", "url": "a.wav", "lyrics": ""}
+        assert entries[1] == {"music_id": "b", "url": "https://cdn.mureka.ai/b/song.mp3", "lyrics": "몽구리 귀여워"}
+
+    def test_missing_music_id(self, tmp_path):
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(json.dumps({"url": "a.wav"}), encoding="utf-8")
+
+        with pytest.raises(ValueError, match="missing music_id"):
+            load_manifest(str(manifest))
+
+
+class TestCheckpoint:
+    def test_later_records_win_and_torn_lines_are_ignored(self, tmp_path):
+        path = str(tmp_path / "checkpoint.jsonl")
+        append_checkpoint(path, [{"music_id": 1, "status": FAILED}, {"music_id": 2, "status": DONE}])
+        append_checkpoint(path, [{"music_id": 1, "status": DONE}])
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"music_id": 3, "sta')
+
+        assert load_checkpoint(path) == {"1": DONE, "2": DONE}
+
+    def test_flush_writes_rows_in_bulk_then_checkpoints(self, tmp_path):
+        db = FakeDBManager()
+        runner = BatchRunner(db, str(tmp_path / "checkpoint.jsonl"))
+        runner._pending_rows = [("a", {"BPM": "105"}), ("b", {"BPM": "90"})]
+
+        runner.flush()
+
+        assert db.batches == [[("a", {"BPM": "105"}), ("b", {"BPM": "90"})]]
+        assert load_checkpoint(runner.checkpoint) == {"a": DONE, "b": DONE}
+
+
+class TestBatchRunner:
+    def test_resume_skips_done_entries_and_records_failures(self, tmp_path):
+        checkpoint = str(tmp_path / "checkpoint.jsonl")
+        append_checkpoint(checkpoint, [{"music_id": "a", "status": DONE}])
+        db = FakeDBManager()
+        runner = BatchRunner(db, checkpoint, processes=1, cache_dir=str(tmp_path / "cache"))
+
+        counts = runner.run([
+            {"music_id": "a", "url": str(tmp_path / "a.wav"), "lyrics": ""},
+            {"music_id": "b", "url": str(tmp_path / "missing.wav"), "lyrics": ""},
+        ])
+
+        assert counts == {DONE: 0, FAILED: 1}
+        assert load_checkpoint(checkpoint) == {"a": DONE, "b": FAILED}
+        assert db.batches == []
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+import analyzer.beat_pool
+from analyzer.beat_pool import BeatTrackerPool
+
+SAMPLES = np.zeros(44100 * 2, dtype=np.float32)  # 2초
+
+
+class FakeExecutor:
+    """ProcessPoolExecutor 대신 제출된 작업만 기록합니다."""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.submitted = []
+
+    def submit(self, func, *args):
+        self.submitted.append(func)
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """madmom 없이 _run의 집계만 확인하도록 작업을 스레드에서 실행하는 풀 (processes=1)."""
+    monkeypatch.setattr(analyzer.beat_pool, "ProcessPoolExecutor", FakeExecutor)
+    pool = BeatTrackerPool(processes=1, warm=False)
+    pool._executor = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool._executor.shutdown()
+
+
+class TestBeatTrackerPool:
+    def test_workers_are_primed_at_startup(self, monkeypatch):
+        monkeypatch.setattr(analyzer.beat_pool, "ProcessPoolExecutor", FakeExecutor)
+
+        pool = BeatTrackerPool(processes=3)
+
+        assert pool._executor.submitted == [analyzer.beat_pool._ready] * 3
+        assert pool._executor.kwargs["initializer"] is analyzer.beat_pool._load_models
+        assert BeatTrackerPool(processes=3, warm=False)._executor.submitted == []
+
+    def test_in_flight_and_queue_depth_while_jobs_run(self, pool):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+
+        def blocked(samples, sample_rate):
+            started.release()
+            release.wait(timeout=10)
+            return "act", [0.5], 0.25
+
+        threads = [threading.Thread(target=pool._run, args=(blocked, SAMPLES, 44100)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            assert started.acquire(timeout=10)
+
+        busy = pool.stats()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert (busy["in_flight"], busy["queue_depth"]) == (3, 2)
+        stats = pool.stats()
+        assert (stats["in_flight"], stats["queue_depth"], stats["completed"], stats["failed"]) == (0, 0, 3, 0)
+        assert stats["mean_seconds"] == pytest.approx(0.25)
+        assert stats["last_job"]["audio_seconds"] == pytest.approx(2.0)
+
+    def test_failed_jobs_are_counted_and_raised(self, pool):
+        def broken(samples, sample_rate):
+            raise RuntimeError("model crashed")
+
+        with pytest.raises(RuntimeError, match="model crashed"):
+            pool._run(broken, SAMPLES, 44100)
+
+        stats = pool.stats()
+        assert (stats["in_flight"], stats["completed"], stats["failed"]) == (0, 0, 1)
+        assert stats["mean_seconds"] is None
+
+    def test_track_returns_activations_and_beats(self, pool, monkeypatch):
+        monkeypatch.setattr(analyzer.beat_pool, "_track_beats", lambda samples, sample_rate: ("act", [0.5, 1.0], 0.1))
+
+        assert pool.track(SAMPLES) == ("act", [0.5, 1.0])
+        assert pool.stats()["completed"] == 1
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.beats import ONSET_SR, check_beat_backend, grid_beats, onset_envelope, parse_bpm, track_onset_beats
+
+
+def click_track(bpm, seconds, offset=0.25):
+    """offset초부터 bpm 간격으로 감쇠 노이즈 클릭이 들어간 신호"""
+    rng = np.random.default_rng(0)
+    y = np.zeros(int(seconds * ONSET_SR), dtype=np.float32)
+    click = int(0.03 * ONSET_SR)
+    for t in np.arange(offset, seconds - 0.1, 60.0 / bpm):
+        i = int(t * ONSET_SR)
+        y[i:i + click] += rng.standard_normal(click).astype(np.float32) * np.exp(-np.arange(click) / (0.005 * ONSET_SR))
+    return y
+
+
+class TestBeatBackends:
+    def test_check_beat_backend(self):
+        assert check_beat_backend("grid") == "grid"
+        assert check_beat_backend(None) == "librosa"
+        with pytest.raises(ValueError, match="Unknown beat backend"):
+            check_beat_backend("rnn")
+
+    def test_parse_bpm(self):
+        assert parse_bpm("105") == 105.0
+        assert parse_bpm(92.5) == 92.5
+        assert parse_bpm("") is None
+        assert parse_bpm(None) is None
+        assert parse_bpm("0") is None
+
+    @pytest.mark.parametrize("backend", ["librosa", "grid"])
+    def test_beats_follow_clicks(self, backend):
+        envelope = onset_envelope(click_track(120, 20))
+
+        beats = track_onset_beats(envelope) if backend == "librosa" else grid_beats(envelope, 120)
+
+        # 클릭은 0.25 + 0.5k 초. 대부분의 비트가 클릭에서 한 프레임(23 ms) 남짓 안에 있어야 합니다.
+        distance = np.abs((beats - 0.25 + 0.25) % 0.5 - 0.25)
+        assert len(beats) >= 30
+        assert np.median(distance) < 0.05
+
+    def test_grid_spacing_is_exact(self):
+        beats = grid_beats(onset_envelope(click_track(90, 12)), 90)
+
+        assert np.allclose(np.diff(beats), 60 / 90, atol=512 / ONSET_SR)
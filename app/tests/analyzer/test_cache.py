@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.cache import AnalysisCache, file_sha256
+
+RESULT = {"BPM": "105", "Instruments": ["piano"], "Emotions": ["happy"], "Lyrics": [], "Beat_amplitude": [], "Pitch": []}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(str(tmp_path / "cache"), max_bytes=10 * 1024**2)
+
+
+class TestAnalysisCache:
+    def test_key_depends_on_audio_lyrics_and_version(self):
+        key = AnalysisCache.make_key("abc", "가사", "1")
+
+        assert key == AnalysisCache.make_key("abc", "가사", "1")
+        assert key != AnalysisCache.make_key("abd", "가사", "1")
+        assert key != AnalysisCache.make_key("abc", "가사2", "1")
+        assert key != AnalysisCache.make_key("abc", "가사", "2")
+        assert key != AnalysisCache.make_key("abc", "가사", "1", pitch_tier="fast")
+
+    def test_miss_then_hit(self, cache: AnalysisCache):
+        key = AnalysisCache.make_key("abc", "가사", "1")
+        features = {"beat_activations": np.linspace(0, 1, 10), "pitch_midi": np.arange(5)}
+
+        assert cache.get(key) is None
+        cache.put(key, RESULT, features)
+
+        assert cache.get(key) == RESULT
+        np.testing.assert_array_equal(cache.get_features(key)["pitch_midi"], np.arange(5))
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["entries"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = AnalysisCache(str(tmp_path / "cache"), max_bytes=0)
+        big = dict(RESULT, Pitch=[{"time": 0.0, "pitch": 60}] * 100)
+        entry_size = len(str(big))
+        cache.max_bytes = int(entry_size * 2.5)
+
+        cache.put("a", big)
+        cache.put("b", big)
+        os.utime(os.path.join(cache.root, "a"), (0, 0))
+        os.utime(os.path.join(cache.root, "b"), (1, 1))
+        assert cache.get("a") is not None  # a가 최근 사용 항목이 됨
+        cache.put("c", big)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_file_sha256(self, tmp_path):
+        path = tmp_path / "audio.bin"
+        path.write_bytes(b"\x00" * 3000000)
+
+        assert file_sha256(str(path)) == file_sha256(str(path), chunk_size=4096)
+
+    def test_music_index_points_to_latest_entry(self, cache: AnalysisCache):
+        artifacts = {"bpm": "105", "lyrics": [], "vocal_pitch": None}
+        cache.put("a", RESULT, artifacts=artifacts)
+        cache.link(7, "a")
+
+        assert cache.lookup(7) == "a"
+        assert cache.get_artifacts("a") == artifacts
+        assert cache.lookup(8) is None
+        # 인덱스 디렉터리는 캐시 항목으로 세지 않습니다.
+        assert cache.stats()["entries"] == 1
+
+    def test_index_of_evicted_entry_is_a_miss(self, cache: AnalysisCache):
+        cache.put("a", RESULT)
+        cache.link(7, "a")
+        cache.max_bytes = 0
+        cache.put("b", RESULT)
+
+        assert cache.lookup(7) is None
+
+    def test_url_index_maps_urls_to_audio_digests(self, cache: AnalysisCache):
+        cache.link_url("https://cdn.mureka.ai/song.mp3?sig=1", "abc")
+
+        assert cache.lookup_url("https://cdn.mureka.ai/song.mp3?sig=1") == "abc"
+        assert cache.lookup_url("https://cdn.mureka.ai/song.mp3?sig=2") is None
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,183 @@
+import hashlib
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import encode_multipart
+
+from analyzer.ingest import (
+    CHUNK_SIZE,
+    AudioTooLargeError,
+    UnsupportedAudioError,
+    is_passthrough_url,
+    resolve_music_url,
+    spool,
+    spool_upload,
+)
+
+CHUNKS = [b"RIFF" * 1000, b"", b"data" * 5000]
+
+
+class TestSpool:
+    @pytest.mark.parametrize("expected_size", [None, sum(map(len, CHUNKS))])
+    def test_writes_chunks_to_a_private_file(self, expected_size):
+        with spool(iter(CHUNKS), expected_size=expected_size) as audio:
+            with open(audio.path, "rb") as f:
+                assert f.read() == b"".join(CHUNKS)
+            assert audio.size == 24000
+            assert audio.sha256 == hashlib.sha256(b"".join(CHUNKS)).hexdigest()
+            path = audio.path
+
+        if not audio.in_memory:
+            assert not os.path.exists(path)
+
+    def test_in_memory_files_open_from_subprocesses(self):
+        # m4a/aac는 audioread가 ffmpeg 하위 프로세스에 경로를 넘겨 디코딩합니다.
+        with spool(iter(CHUNKS), expected_size=24000) as audio:
+            reader = "import sys; sys.stdout.buffer.write(open(sys.argv[1], 'rb').read())"
+            data = subprocess.run([sys.executable, "-c", reader, audio.path], capture_output=True, check=True).stdout
+
+        assert data == b"".join(CHUNKS)
+
+    def test_parallel_spools_do_not_share_files(self):
+        with spool([b"a"]) as first, spool([b"b"]) as second:
+            assert first.path != second.path
+
+    def test_rejects_oversized_streams_and_cleans_up(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+        with pytest.raises(ValueError, match="too large"):
+            spool(iter(CHUNKS), max_bytes=10000)
+        with pytest.raises(ValueError, match="too large"):
+            spool(iter(CHUNKS), max_bytes=10000, expected_size=24000)
+
+        assert os.listdir(tmp_path) == []
+
+
+WAV = b"RIFF\x00\x00\x00\x00WAVEfmt " + bytes(range(256)) * 10000
+
+
+class ReadRecorder(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def multipart(fields, filename="song.wav", data=WAV, content_type="audio/wav"):
+    values = {**fields, "audio": FileStorage(io.BytesIO(data), filename=filename, content_type=content_type)}
+    boundary, body = encode_multipart(values)
+    return ReadRecorder(body), f"multipart/form-data; boundary={boundary}"
+
+
+class TestSpoolUpload:
+    def test_spools_the_file_part_in_chunks_and_collects_fields(self):
+        stream, content_type = multipart({"lyrics": "첫 줄\n둘째 줄", "pitch_tier": "fast"})
+
+        audio, fields = spool_upload(stream, content_type)
+        with audio:
+            with open(audio.path, "rb") as f:
+                assert f.read() == WAV
+            assert audio.sha256 == hashlib.sha256(WAV).hexdigest()
+            assert audio.path.endswith(".wav")
+
+        assert fields == {"lyrics": "첫 줄\n둘째 줄", "pitch_tier": "fast"}
+        assert set(stream.reads) == {CHUNK_SIZE}
+        assert len(stream.reads) > 2
+
+    def test_fields_after_the_file_are_read(self):
+        boundary, body = encode_multipart({"audio": FileStorage(io.BytesIO(WAV), filename="song.wav"), "lyrics": "가사"})
+
+        audio, fields = spool_upload(io.BytesIO(body), f"multipart/form-data; boundary={boundary}")
+        audio.close()
+
+        assert fields == {"lyrics": "가사"}
+
+    def test_raw_audio_body(self):
+        audio, fields = spool_upload(io.BytesIO(WAV), "audio/mpeg")
+        with audio:
+            assert audio.size == len(WAV)
+            assert audio.path.endswith(".mp3")
+
+        assert fields == {}
+
+    @pytest.mark.parametrize("filename, data, content_type", [
+        ("notes.txt", WAV, "text/plain"),
+        ("song.mp3", b"<html>not a song</html>", "audio/mpeg"),
+        ("song.wav", b"", "audio/wav"),
+    ])
+    def test_rejects_non_audio_and_cleans_up(self, tmp_path, monkeypatch, filename, data, content_type):
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        stream, multipart_type = multipart({"lyrics": "가사"}, filename=filename, data=data, content_type=content_type)
+
+        with pytest.raises(UnsupportedAudioError):
+            spool_upload(stream, multipart_type)
+        with pytest.raises(UnsupportedAudioError):
+            spool_upload(io.BytesIO(data), content_type)
+
+        assert os.listdir(tmp_path) == []
+
+    def test_rejects_oversized_uploads_and_cleans_up(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        stream, content_type = multipart({"lyrics": "가사"})
+
+        with pytest.raises(AudioTooLargeError):
+            spool_upload(stream, content_type, max_bytes=len(WAV) - 1)
+        with pytest.raises(AudioTooLargeError):
+            spool_upload(stream, content_type, content_length=10 * len(WAV), max_bytes=len(WAV))
+        with pytest.raises(AudioTooLargeError):
+            spool_upload(io.BytesIO(WAV), "audio/wav", max_bytes=1000)
+
+        assert os.listdir(tmp_path) == []
+
+    def test_rejects_missing_file_and_oversized_fields(self):
+        boundary, body = encode_multipart({"lyrics": "가사"})
+        with pytest.raises(ValueError, match="Missing 'audio'"):
+            spool_upload(io.BytesIO(body), f"multipart/form-data; boundary={boundary}")
+
+        stream, content_type = multipart({"lyrics": "가" * 1000})
+        with pytest.raises(ValueError, match="too large"):
+            spool_upload(stream, content_type, max_field_bytes=100)
+
+    def test_rejects_truncated_bodies(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        stream, content_type = multipart({"lyrics": "가사"})
+
+        with pytest.raises(ValueError):
+            spool_upload(io.BytesIO(stream.getvalue()[: len(WAV) // 2]), content_type)
+
+        assert os.listdir(tmp_path) == []
+
+
+class TestResolveMusicUrl:
+    def test_google_drive_links(self):
+        direct = "https://drive.google.com/uc?id=abc123&export=download"
+
+        assert resolve_music_url("https://drive.google.com/file/d/abc123/view?usp=sharing") == direct
+        assert resolve_music_url("https://drive.google.com/open?id=abc123&foo=bar") == direct
+
+    def test_other_links_are_unchanged(self):
+        url = "https://cdn.mureka.ai/song.mp3"
+
+        assert resolve_music_url(url) == url
+
+
+class TestPassthroughUrl:
+    def test_public_http_urls_are_passed_to_musicai(self):
+        assert is_passthrough_url("https://cdn.mureka.ai/song.mp3")
+        assert is_passthrough_url("http://example.com/a.wav")
+
+    def test_drive_links_and_local_paths_are_downloaded(self):
+        assert not is_passthrough_url("https://drive.google.com/uc?id=abc123&export=download")
+        assert not is_passthrough_url("/tmp/song.wav")
+        assert not is_passthrough_url("file:///tmp/song.wav")
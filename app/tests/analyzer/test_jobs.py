@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.jobs import FAILED, SUCCEEDED, AnalysisJobManager
+
+
+def wait_until_done(job, timeout=5):
+    version = None
+    while not job.done:
+        version = job.wait_for_change(version, timeout=timeout)
+    return job
+
+
+class TestAnalysisJobManager:
+    def test_submit_returns_immediately_and_reports_progress(self):
+        manager = AnalysisJobManager(max_workers=1)
+        release = threading.Event()
+
+        def analysis(progress, timings, value):
+            progress("downloading")
+            release.wait(5)
+            progress("aligning")
+            timings({"stages": {"pitch": {"wall_seconds": 1.5}}})
+            return {"BPM": value}
+
+        job = manager.submit(analysis, user_id="user", music_id="music", value="105")
+        assert not job.done
+        assert manager.get(job.job_id) is job
+
+        version = None
+        while job.stage != "downloading":
+            version = job.wait_for_change(version, timeout=5)
+        release.set()
+        wait_until_done(job)
+
+        assert job.status == SUCCEEDED
+        assert job.to_dict()["result"] == {"BPM": "105"}
+        assert "result" not in job.to_dict(include_result=False)
+        assert job.to_dict()["timings"]["stages"]["pitch"]["wall_seconds"] == 1.5
+
+    def test_failed_job_keeps_error(self):
+        manager = AnalysisJobManager(max_workers=1)
+
+        def analysis(progress, timings):
+            raise ValueError("Failed to download the music file")
+
+        job = wait_until_done(manager.submit(analysis, user_id="user", music_id="music"))
+
+        assert job.status == FAILED
+        assert job.to_dict()["error"] == "Failed to download the music file"
+        assert manager.stats()[FAILED] == 1
+
+    def test_finished_jobs_expire(self):
+        manager = AnalysisJobManager(max_workers=1, ttl=0)
+        job = wait_until_done(manager.submit(lambda progress, timings: {}, user_id="user", music_id="music"))
+
+        manager.submit(lambda progress, timings: {}, user_id="user", music_id="music")
+
+        assert manager.get(job.job_id) is None
+
+    def test_same_key_reuses_running_or_succeeded_job(self):
+        manager = AnalysisJobManager(max_workers=1)
+        release = threading.Event()
+        calls = []
+
+        def analysis(progress, timings):
+            calls.append(1)
+            release.wait(5)
+            return {"BPM": "105"}
+
+        job = manager.submit(analysis, user_id="user", music_id="music", key=("music", "가사"))
+        assert manager.submit(analysis, user_id="user", music_id="music", key=("music", "가사")) is job
+        assert manager.find(("music", "가사")) is job
+        assert manager.find_music("music") is job
+
+        release.set()
+        assert job.wait(timeout=5)
+        assert manager.submit(analysis, user_id="user", music_id="music", key=("music", "가사")) is job
+        assert manager.find_music("music") is None
+        assert calls == [1]
+
+    def test_failed_job_with_same_key_is_retried(self):
+        manager = AnalysisJobManager(max_workers=1)
+
+        def analysis(progress, timings):
+            raise ValueError("MusicAI is unreachable")
+
+        job = manager.submit(analysis, user_id="user", music_id="music", key="k")
+        job.wait(timeout=5)
+
+        assert manager.find("k") is None
+        assert manager.submit(analysis, user_id="user", music_id="music", key="k") is not job
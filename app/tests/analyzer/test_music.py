@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+import analyzer.music
+from analyzer.music import MusicAnalyzer
+
+METADATA = {"instrumentTags": ["piano"], "moodTags": ["happy"]}
+
+
+class FakeClient:
+    """원격 작업을 기다리는 동안 on_wait()를 불러 그 시점의 로컬 분석 상태를 seen에 남기는 MusicAI 클라이언트."""
+
+    def __init__(self, on_wait=None, error=None):
+        self.on_wait = on_wait
+        self.error = error
+        self.seen = None
+
+    def upload_file(self, file_path):
+        return "https://musicai.example.com/uploads/1"
+
+    def create_job(self, job_name, workflow_id, params):
+        return {"id": "job-1"}
+
+    def wait_for_job_completion(self, job_id):
+        if self.on_wait is not None:
+            self.seen = self.on_wait()
+        if self.error is not None:
+            raise self.error
+        return {"id": job_id, "status": "SUCCEEDED", "result": {"BPM": "120", "Music metadata": "metadata-url"}}
+
+
+@pytest.fixture
+def song(tmp_path):
+    sr = 22050
+    t = np.arange(sr * 4) / sr
+    y = (0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 2 * t) > 0)).astype(np.float32)
+    path = tmp_path / "song.wav"
+    sf.write(path, y, sr)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def artifacts(monkeypatch):
+    monkeypatch.setattr(analyzer.music, "fetch_json_many", lambda urls: ({name: METADATA for name in urls}, {}))
+
+
+def waveform_done(analyzer_):
+    """Event set when the last local stage (waveform) finishes."""
+    done = threading.Event()
+    get_waveform = analyzer_._get_waveform
+
+    def wrapped():
+        get_waveform()
+        done.set()
+
+    analyzer_._get_waveform = wrapped
+    return done
+
+
+class TestAnalyzeConcurrency:
+    @pytest.mark.parametrize("beat_backend", ["librosa", "grid"])
+    def test_local_stages_finish_while_the_remote_job_runs(self, song, beat_backend):
+        client = FakeClient()
+        la = MusicAnalyzer(song, "", pitch_tier="fast", client=client, beat_backend=beat_backend)
+        done = waveform_done(la)
+        client.on_wait = lambda: done.wait(timeout=30)
+
+        la.analyze()
+
+        # grid 비트는 BPM을 기다리지만 파형 단계는 원격 작업이 끝나기 전에 끝나야 합니다.
+        assert client.seen is True
+        assert la.get_final_format()["BPM"] == "120"
+        assert len(la.beat_times) > 0
+        assert la.waveform is not None
+
+    def test_sequential_mode_runs_local_stages_after_the_remote_job(self, song):
+        client = FakeClient()
+        la = MusicAnalyzer(song, "", pitch_tier="fast", client=client, beat_backend="librosa")
+        done = waveform_done(la)
+        client.on_wait = done.is_set
+
+        la.analyze(concurrent=False)
+
+        assert client.seen is False
+        assert done.is_set()
+        assert len(la.pitch_times) > 0
+
+    @pytest.mark.parametrize("beat_backend", ["librosa", "grid"])
+    def test_remote_job_error_propagates_after_local_stages_stop(self, song, beat_backend):
+        la = MusicAnalyzer(song, "", pitch_tier="fast", client=FakeClient(error=RuntimeError("MusicAI down")), beat_backend=beat_backend)
+        threads = threading.active_count()
+
+        with pytest.raises(RuntimeError, match="MusicAI down"):
+            la.analyze()
+
+        assert threading.active_count() == threads
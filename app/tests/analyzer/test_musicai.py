@@ -0,0 +1,102 @@
+import os
+import sys
+import threading
+
+import pytest
+import requests
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+import analyzer.musicai
+from analyzer.musicai import STATUS_TIMEOUT, JobTracker, TimeoutMusicAiClient
+
+
+class FakeClient:
+    """get_job_status를 polls_needed번 호출해야 끝나는 MusicAI 작업들"""
+
+    def __init__(self, polls_needed, fail=(), broken=()):
+        self.polls_needed = dict(polls_needed)
+        self.fail = set(fail)
+        self.broken = set(broken)
+        self.status_calls = {job_id: 0 for job_id in self.polls_needed}
+        self.lock = threading.Lock()
+
+    def get_job_status(self, job_id):
+        if job_id in self.broken:
+            raise ConnectionError("MusicAI is unreachable")
+        with self.lock:
+            self.status_calls[job_id] += 1
+            done = self.status_calls[job_id] >= self.polls_needed[job_id]
+        if not done:
+            return {"id": job_id, "status": "STARTED"}
+        return {"id": job_id, "status": "FAILED" if job_id in self.fail else "SUCCEEDED"}
+
+    def get_job(self, job_id):
+        status = self.get_job_status(job_id)["status"]
+        return {"id": job_id, "status": status, "result": {"BPM": "105"} if status == "SUCCEEDED" else None}
+
+
+class TestJobTracker:
+    def test_one_poller_completes_many_jobs(self):
+        client = FakeClient({f"job-{i}": i + 1 for i in range(20)}, fail={"job-3"})
+        tracker = JobTracker(client, min_interval=0.001, max_interval=0.01)
+
+        futures = {job_id: tracker.track(job_id) for job_id in client.polls_needed}
+        results = {job_id: future.result(timeout=5) for job_id, future in futures.items()}
+
+        assert results["job-0"] == {"id": "job-0", "status": "SUCCEEDED", "result": {"BPM": "105"}}
+        assert results["job-3"]["status"] == "FAILED"
+        assert tracker.stats()["pending"] == 0
+        assert tracker.stats()["completed"] == 19
+        assert tracker.stats()["failed"] == 1
+        tracker.shutdown()
+
+    def test_polling_interval_backs_off(self):
+        tracker = JobTracker(FakeClient({"job": 100}), min_interval=0.01, max_interval=0.04, backoff=2)
+        tracker.track("job")
+        job = tracker._jobs["job"]
+        while tracker.stats()["polls"] < 4:
+            threading.Event().wait(0.01)
+
+        assert job.interval == pytest.approx(0.04)
+        tracker.shutdown()
+
+    def test_repeated_errors_fail_the_future(self):
+        tracker = JobTracker(FakeClient({"job": 1}, broken={"job"}), min_interval=0.001, max_interval=0.001, max_errors=3)
+
+        with pytest.raises(ConnectionError):
+            tracker.track("job").result(timeout=5)
+        tracker.shutdown()
+
+    def test_same_job_shares_a_future(self):
+        tracker = JobTracker(FakeClient({"job": 2}), min_interval=0.001)
+
+        assert tracker.track("job") is tracker.track("job")
+        tracker.track("job").result(timeout=5)
+        tracker.shutdown()
+
+
+class StalledSession:
+    """응답 없이 read 타임아웃이 나는 MusicAI API."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append((url, timeout))
+        raise requests.Timeout("Read timed out")
+
+
+class TestTimeoutMusicAiClient:
+    def test_stalled_status_checks_time_out_and_count_as_poll_errors(self, monkeypatch):
+        session = StalledSession()
+        monkeypatch.setattr(analyzer.musicai, "get_http_session", lambda: session)
+        tracker = JobTracker(TimeoutMusicAiClient(api_key="key"), min_interval=0.001, max_interval=0.001, max_errors=2)
+
+        with pytest.raises(requests.Timeout):
+            tracker.track("job").result(timeout=5)
+
+        assert session.calls == [("https://api.music.ai/api/job/job/status", STATUS_TIMEOUT)] * 2
+        assert tracker.stats()["failed"] == 1
+        tracker.shutdown()
@@ -0,0 +1,159 @@
+import os
+import sys
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+import analyzer.music
+import analyzer.pipeline
+from analyzer.cache import AnalysisCache
+from analyzer.ingest import open_local_audio, spool
+from analyzer.pipeline import analyze_audio, analyze_upload_and_store, analyze_url
+
+SONG_URL = "https://cdn.mureka.ai/song.mp3"
+METADATA = {"instrumentTags": ["piano"], "moodTags": ["happy"]}
+
+
+class FakeClient:
+    def __init__(self, fail_urls=()):
+        self.fail_urls = set(fail_urls)
+        self.uploads = []
+        self.input_urls = []
+
+    def upload_file(self, file_path):
+        self.uploads.append(file_path)
+        return f"https://musicai.example.com/uploads/{len(self.uploads)}"
+
+    def create_job(self, job_name, workflow_id, params):
+        self.input_urls.append(params["inputUrl"])
+        return {"id": params["inputUrl"]}
+
+    def wait_for_job_completion(self, job_id):
+        if job_id in self.fail_urls:
+            return {"id": job_id, "status": "FAILED", "result": None}
+        return {"id": job_id, "status": "SUCCEEDED", "result": {"BPM": "120", "Music metadata": "metadata-url"}}
+
+
+class PendingTracker:
+    """MusicAI 작업이 끝나지 않는 공용 폴러 (JobTracker.track과 같은 Future 인터페이스)."""
+
+    def __init__(self):
+        self.futures = []
+
+    def track(self, job_id):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+@pytest.fixture
+def song(tmp_path):
+    sr = 22050
+    t = np.arange(sr * 4) / sr
+    y = (0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 2 * t) > 0)).astype(np.float32)
+    path = tmp_path / "song.wav"
+    sf.write(path, y, sr)
+    return str(path)
+
+
+@pytest.fixture
+def downloads(song, monkeypatch):
+    urls = []
+
+    def download_audio(url):
+        urls.append(url)
+        return open_local_audio(song)
+
+    monkeypatch.setattr(analyzer.pipeline, "download_audio", download_audio)
+    monkeypatch.setattr(analyzer.music, "fetch_json_many", lambda urls: ({name: METADATA for name in urls}, {}))
+    return urls
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(str(tmp_path / "cache"), max_bytes=10 * 1024**2)
+
+
+def analyze(client, cache, monkeypatch, music_id=1):
+    monkeypatch.setattr(analyzer.music, "get_client", lambda: client)
+    monkeypatch.setattr(analyzer.music, "get_job_tracker", lambda: None)
+    return analyze_url(SONG_URL, "", music_id, cache, pitch_tier="fast", beat_backend="librosa")
+
+
+class TestAnalyzeUrl:
+    def test_url_is_passed_to_musicai_without_upload(self, downloads, cache, monkeypatch):
+        client = FakeClient()
+
+        result = analyze(client, cache, monkeypatch)
+
+        assert client.input_urls == [SONG_URL]
+        assert client.uploads == []
+        assert downloads == [SONG_URL]
+        assert result["BPM"] == "120"
+        assert len(result["Beat_amplitude"]) > 0
+
+    def test_known_url_is_served_from_cache_without_download(self, downloads, cache, monkeypatch):
+        first = analyze(FakeClient(), cache, monkeypatch)
+        client = FakeClient()
+
+        assert analyze(client, cache, monkeypatch, music_id=2) == first
+        assert client.input_urls == []
+        assert downloads == [SONG_URL]
+        assert cache.lookup(2) == cache.lookup(1)
+
+    def test_falls_back_to_upload_when_musicai_cannot_fetch_the_url(self, downloads, song, cache, monkeypatch):
+        client = FakeClient(fail_urls={SONG_URL})
+
+        result = analyze(client, cache, monkeypatch)
+
+        assert client.uploads == [song]
+        assert client.input_urls == [SONG_URL, "https://musicai.example.com/uploads/1"]
+        assert result["BPM"] == "120"
+
+
+    def test_already_analyzed_audio_skips_waiting_for_musicai(self, downloads, song, cache, monkeypatch):
+        monkeypatch.setattr(analyzer.music, "get_client", lambda: FakeClient())
+        monkeypatch.setattr(analyzer.music, "get_job_tracker", lambda: None)
+        with open_local_audio(song) as audio:
+            first = analyze_audio(audio, "", 1, cache, pitch_tier="fast", beat_backend="librosa")
+        tracker = PendingTracker()
+        monkeypatch.setattr(analyzer.music, "get_job_tracker", lambda: tracker)
+
+        result = analyze_url(SONG_URL, "", 2, cache, pitch_tier="fast", beat_backend="librosa")
+
+        assert result == first
+        assert downloads == [SONG_URL]
+        assert not any(future.done() for future in tracker.futures)
+        assert cache.lookup(2) == cache.lookup(1)
+        assert cache.lookup_url(SONG_URL) == audio.sha256
+
+
+class FakeDB:
+    def __init__(self):
+        self.music_vis = {}
+
+    def replace_music_vis(self, music_id, vis_data):
+        self.music_vis[music_id] = vis_data
+
+
+class TestAnalyzeUpload:
+    def test_uploaded_file_is_analyzed_without_download_and_removed(self, downloads, song, cache, monkeypatch):
+        client = FakeClient()
+        monkeypatch.setattr(analyzer.music, "get_client", lambda: client)
+        monkeypatch.setattr(analyzer.music, "get_job_tracker", lambda: None)
+        db = FakeDB()
+        with open(song, "rb") as f:
+            audio = spool(iter(lambda: f.read(4096), b""), suffix=".wav")
+
+        result = analyze_upload_and_store(audio, "", 7, db, cache, pitch_tier="fast", beat_backend="librosa")
+
+        assert downloads == []
+        assert client.uploads == [audio.path]
+        assert not os.path.exists(audio.path)
+        assert result["BPM"] == "120"
+        assert "LOD" in db.music_vis[7]
+        assert cache.lookup(7) is not None
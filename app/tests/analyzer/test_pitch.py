@@ -0,0 +1,67 @@
+import os
+import sys
+
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.audio import AudioBuffer
+from analyzer.pitch import PITCH_TIERS, check_pitch_tier, extract_pitch_track, pitch_records, pitch_track_from_piptrack
+from utils.util import hz_to_midi
+
+
+def per_frame_pitches(pitches, magnitudes, sr):
+    """벡터화 이전의 프레임 단위 구현"""
+    midi_pitches = []
+    for t in range(pitches.shape[1]):
+        pitch = pitches[magnitudes[:, t].argmax(), t]
+        midi_pitches.append(hz_to_midi(pitch) if pitch > 0 else 0)
+    times = librosa.times_like(np.array(midi_pitches), sr=sr)
+    return [{"time": t, "pitch": p} for t, p in zip(times, midi_pitches)]
+
+
+class TestPitchTrack:
+    def test_same_as_per_frame_loop(self):
+        sr = 22050
+        t = np.arange(sr * 2) / sr
+        y = np.concatenate([np.sin(2 * np.pi * 220 * t), np.zeros(sr // 2), np.sin(2 * np.pi * 330 * t)]).astype(np.float32)
+        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
+
+        times, midi = pitch_track_from_piptrack(pitches, magnitudes, sr)
+
+        assert pitch_records(times, midi) == per_frame_pitches(pitches, magnitudes, sr)
+        assert {57, 64} <= set(midi.tolist())
+        assert 0 in midi
+
+
+@pytest.fixture(scope="module")
+def tone(tmp_path_factory):
+    sr = 44100
+    t = np.arange(sr * 3) / sr
+    path = tmp_path_factory.mktemp("audio") / "tone.wav"
+    sf.write(path, 0.5 * np.sin(2 * np.pi * 220 * t), sr)
+    return AudioBuffer(str(path))
+
+
+class TestPitchTiers:
+    @pytest.mark.parametrize("tier", list(PITCH_TIERS))
+    def test_every_tier_finds_the_tone(self, tone, tier):
+        times, midi = extract_pitch_track(tone, tier)
+        voiced = midi[midi > 0]
+
+        assert len(times) == len(midi)
+        assert np.bincount(voiced).argmax() == 57  # A3 = 220 Hz
+
+    def test_cheaper_tiers_produce_fewer_frames(self, tone):
+        counts = [len(extract_pitch_track(tone, tier)[0]) for tier in ("full", "fast", "preview")]
+
+        assert counts[0] > counts[1] > counts[2]
+
+    def test_unknown_tier(self):
+        assert check_pitch_tier(None) in PITCH_TIERS
+        with pytest.raises(ValueError, match="Unknown pitch tier"):
+            check_pitch_tier("ultra")
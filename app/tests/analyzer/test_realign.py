@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.cache import AnalysisCache
+from analyzer.music import ANALYZER_VERSION, MusicAnalyzer
+from analyzer.pipeline import AnalysisNotCachedError, realign_and_store
+
+# MusicAI 전사 결과: "몽구리 귀여워 / 웃으며 뛰어놀지"
+ARTIFACTS = {
+    "bpm": "105",
+    "metadata": {"instrumentTags": ["piano"], "moodTags": ["happy"]},
+    "lyrics": [
+        {"word": "몽구리", "start": 0.0, "end": 1.0},
+        {"word": "귀여워", "start": 1.0, "end": 2.0},
+        {"word": "웃으며", "start": 3.0, "end": 4.0},
+        {"word": "뛰어놀지", "start": 4.0, "end": 5.0},
+    ],
+    "vocal_pitch": [
+        {"note_name": "C4", "midi_note": 60, "start": 0.2, "end": 0.8},
+        {"note_name": "E4", "midi_note": 64, "start": 3.1, "end": 3.5},
+    ],
+    "audio_sha256": "abc",
+    "pitch_tier": "fast",
+    "beat_backend": "madmom",
+}
+BEATS = [{"time": 0.5, "amplitude": 1.0}]
+PITCH = [{"time": 0.0, "pitch": 60}]
+
+
+class FakeDBManager:
+    def __init__(self):
+        self.music_vis = {}
+
+    def replace_music_vis(self, music_id, vis_data):
+        self.music_vis[music_id] = vis_data
+
+
+def analyzed(lyrics):
+    """전체 분석을 거친 것과 같은 결과"""
+    la = MusicAnalyzer(None, lyrics, pitch_tier="fast", client=object())
+    result = {"BPM": "105", "Instruments": ["piano"], "Emotions": ["happy"], "Lyrics": [], "Beat_amplitude": BEATS, "Pitch": PITCH}
+    return la.realign(ARTIFACTS, result)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"), max_bytes=10 * 1024**2)
+    key = AnalysisCache.make_key("abc", "몽구리 귀여워\n웃으며 뛰어놀지", ANALYZER_VERSION, pitch_tier="fast", beat_backend="madmom")
+    cache.put(key, analyzed("몽구리 귀여워\n웃으며 뛰어놀지"), artifacts=ARTIFACTS)
+    cache.link(1, key)
+    return cache
+
+
+class TestRealign:
+    def test_realign_updates_lyrics_only(self, cache: AnalysisCache):
+        db = FakeDBManager()
+
+        result = realign_and_store(1, "몽구리 귀여워\n웃으며 신나게 뛰어놀지", db_manager=db, cache=cache)
+
+        assert [lyric["word"] for lyric in result["Lyrics"]] == ["몽구리", "귀여워", "웃으며", "신나게뛰어놀지"]
+        assert result["Lyrics"][0]["pitch"][0]["midi_note"] == 60
+        assert result["Lyrics"][3]["phase"] == 1
+        assert result["Beat_amplitude"] == BEATS
+        assert result["Pitch"] == PITCH
+        assert 1 in db.music_vis
+
+    def test_realigned_result_is_cached_under_new_lyrics(self, cache: AnalysisCache):
+        lyrics = "몽구리 귀여워\n뛰어놀지"
+        result = realign_and_store(1, lyrics, db_manager=FakeDBManager(), cache=cache)
+
+        key = AnalysisCache.make_key("abc", lyrics, ANALYZER_VERSION, pitch_tier="fast", beat_backend="madmom")
+        assert cache.lookup(1) == key
+        assert cache.get(key) == result
+        assert result == analyzed(lyrics)
+
+    def test_unknown_music_needs_full_analysis(self, cache: AnalysisCache):
+        with pytest.raises(AnalysisNotCachedError):
+            realign_and_store(2, "몽구리", db_manager=FakeDBManager(), cache=cache)
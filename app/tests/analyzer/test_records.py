@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.music import MusicAnalyzer
+from analyzer.records import AlignedWord, TranscriptWord, VocalNote, beat_records, to_dicts
+
+
+class TestRecords:
+    def test_aligned_word_serializes_to_the_vis_data_shape(self):
+        note = VocalNote.from_dict({"note_name": "C4", "midi_note": 60, "start": 0.2, "end": 0.8})
+        word = AlignedWord("몽구리", 0.0, 1.0, 0)
+        word.pitch.append(note)
+
+        assert to_dicts([word]) == [{
+            "word": "몽구리",
+            "start": 0.0,
+            "end": 1.0,
+            "phase": 0,
+            "pitch": [{"note_name": "C4", "midi_note": 60, "start": 0.2, "end": 0.8}],
+        }]
+        assert list(word.to_dict()) == ["word", "start", "end", "phase", "pitch"]
+
+    def test_records_have_no_instance_dict(self):
+        assert not hasattr(TranscriptWord("a", 0.0, 1.0), "__dict__")
+
+    def test_beat_records_are_plain_floats(self):
+        records = beat_records(np.array([0.5, 1.0]), np.array([0.25, 1.0], dtype=np.float32))
+
+        assert records == [{"time": 0.5, "amplitude": 0.25}, {"time": 1.0, "amplitude": 1.0}]
+        assert type(records[0]["amplitude"]) is float
+
+
+class TestAlignment:
+    def test_dash_in_lyrics_is_a_word_not_a_gap(self):
+        la = MusicAnalyzer(None, "몽구리 - 귀여워", client=object())
+        artifacts = {
+            "bpm": "105",
+            "metadata": {},
+            "lyrics": [{"word": "몽구리", "start": 0.0, "end": 1.0}, {"word": "-", "start": 1.0, "end": 1.5},
+                       {"word": "귀여워", "start": 1.5, "end": 2.0}],
+            "vocal_pitch": [],
+        }
+
+        lyrics = la.realign(artifacts, {})["Lyrics"]
+
+        assert [(w["word"], w["start"], w["end"]) for w in lyrics] == [("몽구리", 0.0, 1.0), ("-", 1.0, 1.5), ("귀여워", 1.5, 2.0)]
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.audio import AudioBuffer
+from analyzer.beats import ONSET_SR, onset_envelope
+from analyzer.pitch import PITCH_TIERS, extract_pitch_track
+from analyzer.streaming import AudioStream, should_stream, stream_beat_activations, stream_onset_envelope, stream_pitch_track, windows
+
+
+@pytest.fixture
+def stereo_wav(tmp_path):
+    """글리산도 + 노이즈, 스테레오 44.1 kHz 13.3초 (블록 경계가 hop에 맞지 않는 길이)"""
+    sr = 44100
+    t = np.arange(int(sr * 13.3)) / sr
+    rng = np.random.default_rng(0)
+    y = (0.3 * np.sin(2 * np.pi * (220 + 60 * np.sin(t)) * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    path = tmp_path / "song.wav"
+    sf.write(path, np.stack([y, 0.5 * y], axis=1), sr, subtype="FLOAT")
+    return str(path)
+
+
+def frame_energy(samples, hop=441):
+    """프레임 단위 분석을 흉내 내는 가짜 beat RNN: hop마다 평균 에너지"""
+    n = int(np.ceil(len(samples) / hop))
+    padded = np.pad(samples, (0, n * hop - len(samples)))
+    return (padded.reshape(n, hop) ** 2).mean(axis=1)
+
+
+class TestAudioStream:
+    def test_blocks_match_audio_buffer(self, stereo_wav):
+        audio = AudioBuffer(stereo_wav)
+        stream = AudioStream(stereo_wav, block_seconds=2)
+
+        assert np.array_equal(np.concatenate(list(stream.blocks())), audio.y)
+        assert np.array_equal(np.concatenate(list(stream.blocks(22050))), audio.resampled(22050))
+
+    def test_samples_at(self, stereo_wav):
+        audio = AudioBuffer(stereo_wav)
+        positions = [0, 1234, len(audio.y) - 1]
+
+        assert np.allclose(AudioStream(stereo_wav).samples_at(positions), audio.y[positions])
+
+    def test_should_stream(self, stereo_wav, tmp_path):
+        assert should_stream(stereo_wav, min_seconds=10)
+        assert not should_stream(stereo_wav, min_seconds=60)
+
+        not_audio = tmp_path / "lyrics.txt"
+        not_audio.write_text("몽구리 귀여워")
+        assert not should_stream(str(not_audio), min_seconds=0)
+
+
+class TestWindows:
+    def test_windows_cover_signal_with_bounded_buffer(self):
+        y = np.arange(1000, dtype=np.float32)
+        blocks = (y[i:i + 70] for i in range(0, len(y), 70))
+
+        cores = []
+        for start, window, left, last in windows(blocks, core=100, margin=30):
+            assert len(window) <= 100 + 2 * 30
+            assert window[0] == start - left
+            cores.append(window[left:left + 100])
+
+        assert last
+        assert np.array_equal(np.concatenate(cores), y)
+
+
+class TestStreamingAnalysis:
+    @pytest.mark.parametrize("tier", list(PITCH_TIERS))
+    def test_pitch_track_matches_whole_file(self, stereo_wav, tier):
+        times, midi = extract_pitch_track(AudioBuffer(stereo_wav), tier)
+
+        stream_times, stream_midi = stream_pitch_track(AudioStream(stereo_wav, block_seconds=3), tier)
+        assert np.array_equal(stream_midi, midi)
+        assert np.allclose(stream_times, times)
+
+    def test_beat_activations_match_whole_file(self, stereo_wav):
+        expected = frame_energy(AudioBuffer(stereo_wav).y)
+
+        act = stream_beat_activations(AudioStream(stereo_wav, block_seconds=2), frame_energy)
+
+        assert np.allclose(act, expected)
+
+    def test_onset_envelope_matches_whole_file(self, stereo_wav):
+        expected = onset_envelope(AudioBuffer(stereo_wav).resampled(ONSET_SR))
+
+        envelope = stream_onset_envelope(AudioStream(stereo_wav, block_seconds=3))
+
+        assert envelope.shape == expected.shape
+        assert np.allclose(envelope, expected, atol=1e-4)
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.timing import StageTimer
+
+
+class TestStageTimer:
+    def test_records_wall_and_cpu_time_per_stage(self):
+        timer = StageTimer()
+        with timer.stage("remote_job"):
+            time.sleep(0.05)
+        with timer.stage("pitch"):
+            sum(i * i for i in range(200000))
+
+        stages = timer.summary()["stages"]
+        assert stages["remote_job"]["wall_seconds"] >= 0.05
+        # 기다리기만 하는 단계는 CPU 시간이 거의 없습니다.
+        assert stages["remote_job"]["cpu_seconds"] < stages["remote_job"]["wall_seconds"]
+        assert stages["pitch"]["cpu_seconds"] > 0
+        assert stages["pitch"]["peak_rss_mb"] > 0
+
+    def test_repeated_stage_accumulates(self):
+        timer = StageTimer()
+        for _ in range(2):
+            timer.record("fetch", wall_seconds=0.5, cpu_seconds=0.1, peak_rss_mb=100, rss_growth_mb=3)
+        timer.record("fetch", peak_rss_mb=80, rss_growth_mb=1)
+
+        assert timer.summary()["stages"]["fetch"] == {
+            "wall_seconds": 1.0,
+            "cpu_seconds": 0.2,
+            "peak_rss_mb": 100,
+            "rss_growth_mb": 3,
+        }
+
+    def test_stage_is_recorded_when_it_raises(self):
+        timer = StageTimer()
+        try:
+            with timer.stage("upload"):
+                raise RuntimeError("MusicAI upload failed")
+        except RuntimeError:
+            pass
+
+        assert "upload" in timer.summary()["stages"]
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.vis_codec import VIS_FORMAT, VIS_FORMAT_VERSION, decode_vis_data, encode_vis_data, is_compact
+
+RESULT_JSON = os.path.join(os.path.dirname(__file__), "../../src/analyzer/result.json")
+
+
+@pytest.fixture(scope="module")
+def result():
+    with open(RESULT_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def assert_records_close(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a.keys() == e.keys()
+        for key, value in e.items():
+            if isinstance(value, float):
+                assert a[key] == pytest.approx(value, abs=1e-4)
+            elif isinstance(value, list):
+                assert_records_close(a[key], value)
+            else:
+                assert a[key] == value
+
+
+class TestVisCodec:
+    def test_round_trip(self, result):
+        compact = encode_vis_data(result)
+        decoded = decode_vis_data(compact)
+
+        assert compact["format"] == VIS_FORMAT
+        assert compact["version"] == VIS_FORMAT_VERSION
+        assert decoded["BPM"] == result["BPM"]
+        assert decoded["Instruments"] == result["Instruments"]
+        assert decoded["Emotions"] == result["Emotions"]
+        assert_records_close(decoded["Lyrics"], result["Lyrics"])
+        assert_records_close(decoded["Beat_amplitude"], result["Beat_amplitude"])
+        assert_records_close(decoded["Pitch"], result["Pitch"])
+
+    def test_compact_is_an_order_of_magnitude_smaller(self, result):
+        assert len(json.dumps(encode_vis_data(result))) * 10 < len(json.dumps(result))
+
+    def test_legacy_and_compact_inputs_pass_through(self, result):
+        compact = encode_vis_data(result)
+
+        assert decode_vis_data(result) is result
+        assert encode_vis_data(compact) is compact
+        assert decode_vis_data(None) is None
+        assert not is_compact(result)
+
+    def test_empty_result(self):
+        empty = {"BPM": None, "Instruments": [], "Emotions": [], "Lyrics": [], "Beat_amplitude": [], "Pitch": []}
+
+        assert decode_vis_data(encode_vis_data(empty)) == empty
@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.vis_codec import decode_vis_data, encode_vis_data
+from analyzer.vis_lod import build_lod, query_window, with_lod
+
+RESULT_JSON = os.path.join(os.path.dirname(__file__), "../../src/analyzer/result.json")
+
+
+@pytest.fixture(scope="module")
+def result():
+    with open(RESULT_JSON, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def stored(result):
+    return with_lod(encode_vis_data(result))
+
+
+class TestBuildLod:
+    def test_levels_grow_by_factor_and_keep_voiced_extremes(self, result, stored):
+        lod = stored["LOD"]
+        steps = [level["step"] for level in lod["levels"]]
+
+        assert steps == pytest.approx([lod["base_step"] * lod["factor"] ** k for k in range(1, len(steps) + 1)])
+        coarsest = query_window(stored, 0, 200, resolution=steps[-1])["Pitch"]
+        voiced = [frame["pitch"] for frame in result["Pitch"] if frame["pitch"] > 0]
+        assert min(p for p in coarsest["min"] if p > 0) == min(voiced)
+        assert max(coarsest["max"]) == max(voiced)
+
+    def test_lod_is_not_part_of_the_decoded_result(self, result, stored):
+        assert decode_vis_data(stored).keys() == result.keys()
+
+    def test_with_lod_leaves_legacy_and_existing_lod_alone(self, result, stored):
+        assert with_lod(result) is result
+        assert with_lod(stored) is stored
+        assert with_lod(None) is None
+
+    def test_empty_result(self):
+        empty = encode_vis_data({"BPM": None, "Instruments": [], "Emotions": [], "Lyrics": [], "Beat_amplitude": [], "Pitch": []})
+
+        assert build_lod(empty)["levels"] == []
+        assert query_window(empty, 0, 10)["Pitch"] == {"time": [], "pitch": []}
+
+
+class TestQueryWindow:
+    def test_fine_resolution_returns_raw_frames_in_window(self, result, stored):
+        window = query_window(stored, 10, 20, resolution=0.001)
+
+        expected = [frame for frame in result["Pitch"] if 10 <= frame["time"] < 20]
+        assert window["level"] == 0
+        assert window["Pitch"]["pitch"] == [frame["pitch"] for frame in expected]
+        assert window["Beat_amplitude"]["time"] == pytest.approx([b["time"] for b in result["Beat_amplitude"] if 10 <= b["time"] < 20], abs=1e-4)
+        assert [lyric["word"] for lyric in window["Lyrics"]] == [l["word"] for l in result["Lyrics"] if l["start"] < 20 and l["end"] > 10]
+        assert all("pitch" in lyric for lyric in window["Lyrics"])
+
+    def test_coarse_resolution_uses_pyramid_bins(self, stored):
+        window = query_window(stored, 0, 100, resolution=2.0)
+        step = window["step"]
+
+        assert window["level"] > 0 and step <= 2.0
+        assert np.all(np.diff(window["Pitch"]["time"]) == pytest.approx(step, abs=1e-4))
+        assert all(lo <= mean <= hi for lo, mean, hi in zip(window["Pitch"]["min"], window["Pitch"]["mean"], window["Pitch"]["max"]) if hi > 0)
+        assert all("pitch" not in lyric for lyric in window["Lyrics"])
+
+    def test_picks_the_coarsest_level_not_coarser_than_the_resolution(self, stored):
+        steps = [level["step"] for level in stored["LOD"]["levels"]]
+
+        assert query_window(stored, 0, 100, resolution=steps[0] * 0.99)["level"] == 0
+        assert query_window(stored, 0, 100, resolution=steps[0])["level"] == 1
+        assert query_window(stored, 0, 100, resolution=steps[1] * 0.99)["level"] == 1
+        assert query_window(stored, 0, 100, resolution=steps[1])["level"] == 2
+        assert query_window(stored, 0, 100, resolution=steps[-1] * 10)["level"] == len(steps)
+        # result.json: level 1 = 0.093초, level 2 = 0.37초
+        assert query_window(stored, 0, 100, resolution=0.3)["step"] == pytest.approx(steps[0])
+
+    def test_zoomed_window_is_a_few_kb(self, result, stored):
+        assert len(json.dumps(query_window(stored, 30, 40, resolution=0.1))) < 5000 < len(json.dumps(result))
+
+    def test_legacy_rows_without_lod(self, result, stored):
+        assert query_window(result, 0, 100, resolution=2.0) == query_window(stored, 0, 100, resolution=2.0)
+
+    @pytest.mark.parametrize("start, end, resolution", [(10, 5, None), (-1, 5, None), (0, 5, -0.1)])
+    def test_invalid_windows(self, stored, start, end, resolution):
+        with pytest.raises(ValueError):
+            query_window(stored, start, end, resolution)
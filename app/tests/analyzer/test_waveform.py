@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from analyzer.audio import AudioBuffer
+from analyzer.streaming import AudioStream
+from analyzer.waveform import WAVEFORM_FACTOR, WAVEFORM_MIN_POINTS, WaveformEnvelope, waveform_levels
+
+SR = 22050
+
+
+def swell(seconds):
+    """0에서 1까지 커지는 사인파"""
+    t = np.arange(int(SR * seconds)) / SR
+    return (np.sin(2 * np.pi * 220 * t) * t / t[-1]).astype(np.float32)
+
+
+def envelope(chunks):
+    env = WaveformEnvelope(SR)
+    for chunk in chunks:
+        env.add(chunk)
+    return env.finish()
+
+
+class TestWaveformEnvelope:
+    def test_peak_and_rms_follow_the_signal(self):
+        y = swell(30.01)
+        times, peak, rms = waveform_levels(envelope([y]))[0]
+
+        assert len(times) == int(np.ceil(len(y) / round(SR * 0.04)))
+        assert peak[0] < 0.01 and peak[-1] == pytest.approx(1.0, abs=0.01)
+        assert rms[-1] == pytest.approx(1 / np.sqrt(2), abs=0.01)
+        assert np.all(rms <= peak + 1 / 255)
+
+    def test_chunked_input_matches_whole_signal(self):
+        y = swell(12.3)
+
+        assert envelope([y[i:i + 7919] for i in range(0, len(y), 7919)]) == envelope([y])
+
+    def test_levels_are_coarser_by_factor_with_the_same_peak(self):
+        levels = waveform_levels(envelope([swell(60)]))
+
+        assert len(levels) > 1
+        assert all(len(levels[k + 1][0]) == -(-len(levels[k][0]) // WAVEFORM_FACTOR) for k in range(len(levels) - 1))
+        assert len(levels[-1][0]) >= WAVEFORM_MIN_POINTS
+        assert all(levels[k][1].max() == levels[0][1].max() for k in range(len(levels)))
+
+    def test_empty_signal(self):
+        waveform = envelope([])
+
+        assert [level["count"] for level in waveform["levels"]] == [0]
+
+    def test_streamed_file_matches_decoded_file(self, tmp_path):
+        path = str(tmp_path / "song.wav")
+        sf.write(path, swell(20), SR, subtype="FLOAT")
+
+        assert envelope(AudioStream(path, block_seconds=3.3).blocks()) == envelope([AudioBuffer(path).y])
@@ -42,6 +42,30 @@ class TestDBManager:
         fake_db_manager.insert_diary(user_id)
         fake_db_manager._insert.assert_called_once_with("diary", {"user_id": user_id})  # Table, {reference_key: value}
 
+    def test_search_latest_music_by_session_spans_all_lyrics(self, fake_db_manager: DBManager):
+        fake_db_manager.search_latest_music_by_session("sid")
+
+        query = fake_db_manager.supabase.table.return_value.select.return_value
+        fake_db_manager.supabase.table.assert_called_once_with("music")
+        query.eq.assert_called_once_with("lyrics.session_id", "sid")
+        query.eq.return_value.order.assert_called_once_with("created_at", desc=True)
+
+    def test_replace_music_vis_deletes_existing_rows_first(self, fake_db_manager: DBManager):
+        table = fake_db_manager.supabase.table.return_value
+
+        fake_db_manager.replace_music_vis("m1", {"Lyrics": []})
+
+        table.delete.return_value.eq.assert_called_once_with("music_id", "m1")
+        assert table.method_calls.index(("delete", (), {})) < table.method_calls.index(("insert", ({"music_id": "m1", "vis_data": {"Lyrics": []}},), {}))
+
+    def test_replace_music_vis_many_is_one_delete_and_one_insert(self, fake_db_manager: DBManager):
+        table = fake_db_manager.supabase.table.return_value
+
+        fake_db_manager.replace_music_vis_many([("a", {"v": 1}), ("b", {"v": 2}), ("a", {"v": 3})])
+
+        table.delete.return_value.in_.assert_called_once_with("music_id", ["a", "b"])
+        table.insert.assert_called_once_with([{"music_id": "a", "vis_data": {"v": 3}}, {"music_id": "b", "vis_data": {"v": 2}}])
+
     def test_search_with_invalid_reference(self, fake_db_manager: DBManager):
         with pytest.raises(ValueError) as excinfo:
             fake_db_manager.search(table="diary", reference="invalid_reference_key", ref_id="invalid_reference_value", search_option=SEARCH_OPTION.ALL)
@@ -0,0 +1,152 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from analyzer.cache import AnalysisCache
+from analyzer.music import ANALYZER_VERSION, MusicAnalyzer
+
+JWT_SECRET = "test-secret-with-at-least-32-bytes!"
+USER_ID = "user-1"
+AUTH = {"Authorization": "Bearer " + jwt.encode({"sub": USER_ID, "aud": "authenticated"}, JWT_SECRET, algorithm="HS256")}
+
+M4A = b"\x00\x00\x00\x20ftypM4A \x00\x00\x00\x00M4A isom" + bytes(range(256)) * 100
+OLD_LYRICS = "몽구리 귀여워\n웃으며 뛰어놀지"
+NEW_LYRICS = "몽구리 귀여워\n웃으며 신나게 뛰어놀지"
+ARTIFACTS = {
+    "bpm": "105",
+    "metadata": {"instrumentTags": ["piano"], "moodTags": ["happy"]},
+    "lyrics": [
+        {"word": "몽구리", "start": 0.0, "end": 1.0},
+        {"word": "귀여워", "start": 1.0, "end": 2.0},
+        {"word": "웃으며", "start": 3.0, "end": 4.0},
+        {"word": "뛰어놀지", "start": 4.0, "end": 5.0},
+    ],
+    "vocal_pitch": [{"note_name": "C4", "midi_note": 60, "start": 0.2, "end": 0.8}],
+    "audio_sha256": "abc",
+    "pitch_tier": "fast",
+    "beat_backend": "madmom",
+}
+
+
+class FakeSessionDB:
+    """diary → lyrics → music 테이블을 행 목록으로 흉내 냅니다 (나중에 넣은 행이 최신)."""
+
+    def __init__(self):
+        self.diary = [{"session_id": "s1", "user_id": USER_ID}]
+        self.lyrics = [{"lyrics_id": 1, "session_id": "s1", "lyrics": OLD_LYRICS}]
+        self.music = [{"music_id": 10, "lyrics_id": 1}]
+        self.keywords = [{"session_id": "s1", "keywords": {"lyrics": OLD_LYRICS}}]
+        self.music_vis = [{"music_id": 10, "vis_data": {"Lyrics": "old"}}]
+
+    def search(self, table, reference, ref_id, search_option, **kwargs):
+        return SimpleNamespace(data=[row for row in getattr(self, table) if row[reference] == ref_id][-1:])
+
+    def search_latest_music_by_session(self, session_id):
+        lyrics_ids = {row["lyrics_id"] for row in self.lyrics if row["session_id"] == session_id}
+        return SimpleNamespace(data=[row for row in self.music if row["lyrics_id"] in lyrics_ids][-1:])
+
+    def insert_lyrics(self, session_id, chat_id, lyrics):
+        self.lyrics.append({"lyrics_id": len(self.lyrics) + 1, "session_id": session_id, "lyrics": lyrics})
+
+    def insert_keywords(self, session_id, keywords):
+        self.keywords.append({"session_id": session_id, "keywords": keywords})
+
+    def insert_music_vis(self, music_id, vis_data):
+        self.music_vis.append({"music_id": music_id, "vis_data": vis_data})
+
+    def replace_music_vis(self, music_id, vis_data):
+        self.music_vis = [row for row in self.music_vis if row["music_id"] != music_id]
+        self.insert_music_vis(music_id, vis_data)
+
+
+@pytest.fixture(scope="module")
+def main_module(tmp_path_factory):
+    pytest.importorskip("langchain")
+    pytest.importorskip("langchain_openai")
+    import database.manager
+
+    env = {
+        "SUPABASE_URL": "http://test.supabase.co",
+        "SUPABASE_KEY": "test-key",
+        "SUPABASE_JWT_SECRET": JWT_SECRET,
+        "OPENAI_API_KEY": "sk-test",
+        "BEAT_POOL_PROCESSES": "0",
+        "ANALYSIS_CACHE_DIR": str(tmp_path_factory.mktemp("cache")),
+    }
+    with patch.dict("os.environ", env), patch.object(database.manager, "create_client", MagicMock()):
+        import main
+    return main
+
+
+@pytest.fixture
+def db(main_module, monkeypatch):
+    db = FakeSessionDB()
+    monkeypatch.setattr(main_module, "db_manager", db)
+    return db
+
+
+@pytest.fixture
+def cache(main_module, tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path / "cache"), max_bytes=10 * 1024**2)
+    result = {"BPM": "105", "Instruments": ["piano"], "Emotions": ["happy"], "Lyrics": [],
+              "Beat_amplitude": [{"time": 0.5, "amplitude": 1.0}], "Pitch": [{"time": 0.0, "pitch": 60}]}
+    result = MusicAnalyzer(None, OLD_LYRICS, pitch_tier="fast", client=object()).realign(ARTIFACTS, result)
+    key = AnalysisCache.make_key("abc", OLD_LYRICS, ANALYZER_VERSION, pitch_tier="fast", beat_backend="madmom")
+    cache.put(key, result, artifacts=ARTIFACTS)
+    cache.link(10, key)
+    monkeypatch.setattr(main_module, "analysis_cache", cache)
+    return cache
+
+
+class TestRealignEndpoint:
+    def test_realign_after_saving_lyrics(self, main_module, db, cache):
+        client = main_module.app.test_client()
+
+        saved = client.post("/lyrics/save?sid=s1", json={"lyrics": NEW_LYRICS}, headers=AUTH)
+        response = client.post("/analysis/realign?sid=s1", json={"lyrics": NEW_LYRICS}, headers=AUTH)
+
+        assert saved.status_code == 200
+        assert response.status_code == 200
+        assert [lyric["word"] for lyric in response.get_json()["Lyrics"]] == ["몽구리", "귀여워", "웃으며", "신나게뛰어놀지"]
+        # 조회 쪽이 읽는 musicVis 첫 행이 새 가사로 바뀌어야 합니다.
+        assert [row["music_id"] for row in db.music_vis] == [10]
+        assert db.music_vis[0]["vis_data"] != {"Lyrics": "old"}
+
+    def test_realign_without_music_is_rejected(self, main_module, db, cache):
+        db.music.clear()
+
+        response = main_module.app.test_client().post("/analysis/realign?sid=s1", json={"lyrics": NEW_LYRICS}, headers=AUTH)
+
+        assert response.status_code == 400
+        assert "No music" in response.get_json()["error"]
+
+
+class TestUploadEndpoint:
+    @pytest.mark.parametrize("content_type", ["audio/mp4", "audio/x-m4a", "audio/aac"])
+    def test_raw_m4a_body_is_readable_by_the_decoder_subprocess(self, main_module, db, monkeypatch, content_type):
+        def fake_analyze(audio, lyrics, music_id, **kwargs):
+            # m4a/aac는 audioread가 ffmpeg 하위 프로세스에 경로를 넘겨 디코딩하므로 같은 방식으로 읽어 봅니다.
+            with audio:
+                reader = "import sys; sys.stdout.buffer.write(open(sys.argv[1], 'rb').read())"
+                data = subprocess.run([sys.executable, "-c", reader, audio.path], capture_output=True, check=True).stdout
+            assert data == M4A
+            return {"BPM": "105", "Instruments": [], "Emotions": [], "Lyrics": [], "Beat_amplitude": [], "Pitch": [],
+                    "music_id": music_id, "in_memory": audio.in_memory}
+
+        monkeypatch.setattr(main_module, "analyze_upload_and_store", fake_analyze)
+
+        response = main_module.app.test_client().post("/analysis/upload", query_string={"sid": "s1", "lyrics": OLD_LYRICS},
+                                                      data=M4A, content_type=content_type, headers=AUTH)
+
+        assert response.status_code == 200, response.get_json()
+        assert response.get_json()["music_id"] == 10
+        # 16MiB 이하의 Content-Length가 있는 본문은 memfd로 받습니다.
+        assert response.get_json()["in_memory"] is True
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# src 경로를 sys.path에 추가하여 모듈을 찾을 수 있도록
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src")))
+
+from utils.util import fetch_json_many, hz_to_midi, hz_to_midi_array
+
+ARTIFACTS = {
+    "/metadata.json": {"instrumentTags": ["piano"], "moodTags": ["happy"]},
+    "/lyrics.json": [{"words": [{"word": "몽구리", "start": 9.0, "end": 10.6}]}],
+    "/pitch.json": [{"note_name": "C#4", "midi_note": 61, "start": 8.83, "end": 9.77}],
+}
+DELAY = 0.3
+
+
+class ArtifactHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(DELAY)
+        if self.path not in ARTIFACTS:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps(ARTIFACTS[self.path]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def artifact_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ArtifactHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class TestFetchJsonMany:
+    def test_fetches_concurrently(self, artifact_server):
+        urls = {"Music metadata": "/metadata.json", "Lyrics": "/lyrics.json", "Vocal pitch": "/pitch.json"}
+
+        start = time.perf_counter()
+        results, timings = fetch_json_many({name: artifact_server + path for name, path in urls.items()})
+        elapsed = time.perf_counter() - start
+
+        assert results == {name: ARTIFACTS[path] for name, path in urls.items()}
+        assert set(timings) == set(urls)
+        assert elapsed < DELAY * len(urls)
+
+    def test_missing_artifact_is_none(self, artifact_server):
+        results, _ = fetch_json_many({"Lyrics": artifact_server + "/missing.json"})
+
+        assert results == {"Lyrics": None}
+
+
+class TestHzToMidi:
+    def test_array_matches_scalar(self):
+        hz = [0.0, 110.0, 261.63, 440.0, 466.16, 1000.0]
+
+        assert hz_to_midi_array(hz).tolist() == [0] + [hz_to_midi(h) for h in hz[1:]]